@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the benchmark pipeline.
+
+Usage: python3 scripts/bench.py [--profile[=DIR]] <command> [args...]
+Example: python3 scripts/bench.py evaluate run_2026-01-14-v3 --live
+
+Each command forwards its arguments to the underlying script, which is only
+imported when its command runs, so `--help` and the local commands start
+without loading the Anthropic SDK or other heavy dependencies. All paths are
+resolved from the repository root (see paths.py; override with
+REVIEW_BENCH_ROOT).
+
+With --profile, the command runs under cProfile, tracemalloc and a stack
+sampler; see profiling.py for the report files and the timing history.
+"""
+
+import importlib
+import sys
+
+# command -> (module, leading args, summary)
+COMMANDS = {
+    "trigger": ("fetch_comments", ["trigger"], "Comment '@droid review' on the droid-sentry PRs"),
+    "fetch": ("fetch_comments", ["fetch"], "Download Droid PR comments into results/<run>/"),
+    "transform": ("fetch_comments", ["transform"], "Build raw_comments/ evaluation inputs for a run"),
+    "evaluate": ("evaluate_sentry_run", [], "Judge Droid comments against golden comments (API)"),
+    "report": ("generate_results_markdown", [], "Generate RESULTS.md and README.md for a run"),
+    "site": ("report_site", [], "Render all runs into a static HTML report site"),
+    "draft": ("generate_v2_draft", [], "Generate Golden Comments v2 draft files"),
+    "finalize": ("finalize_v2", [], "Finalize golden_comments_v2.json from revalidation"),
+    "export": ("create_golden_comments_repo", [], "Export golden comments v2 formats + changelog"),
+    "subset": ("pr_subset", [], "Pick a predictive PR subset; --smoke runs only that subset"),
+    "snapshots": ("snapshots", [], "Manage repo mirrors and worktrees at manifest SHAs"),
+    "validate": ("validate_ground_truth", [], "Schema-check the ground-truth validation tree"),
+    "watch": ("watch_v2", [], "Rebuild drafts/summaries/golden v2 incrementally as files change"),
+    "search": ("comment_search", ["search"], "Full-text search over golden, droid and validation comments"),
+    "clusters": ("error_clusters", [], "Cluster false positives and misses across all eval runs"),
+    "timings": ("review_timings", [], "Per-PR review latency/throughput from the Actions API"),
+    "profiles": ("profiling", ["history"], "Profiled stage timings across commits"),
+    "scale": ("scale_corpus", [], "Synthetic large validation tree + draft/finalize benchmark"),
+}
+
+
+def usage() -> str:
+    lines = [__doc__.strip().splitlines()[2], "", "Commands:"]
+    lines += [f"  {name:<10} {summary}" for name, (_, _, summary) in COMMANDS.items()]
+    lines += ["", "Run `bench.py <command> --help` for command options; add --profile to profile a command."]
+    return "\n".join(lines)
+
+
+def main():
+    argv, profile_dir = sys.argv[1:], None
+    if any(a == "--profile" or a.startswith("--profile=") for a in argv):
+        from profiling import split_profile_args
+        argv, profile_dir = split_profile_args(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        sys.exit(0 if argv else 2)
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n\n{usage()}", file=sys.stderr)
+        sys.exit(2)
+
+    module_name, leading, _ = COMMANDS[command]
+    sys.argv = ["bench.py" if leading else f"bench.py {command}", *leading, *rest]
+    if profile_dir is None:
+        importlib.import_module(module_name).main()
+        return
+    from profiling import profile_stage
+    with profile_stage(command, profile_dir):
+        importlib.import_module(module_name).main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Columnar bug table over golden and validation data.
+
+Every ground-truth bug (plus revalidation additions and golden false positives)
+becomes one row. String columns are dictionary-encoded into compact integer
+arrays so that filters and group-bys run as a single pass over small arrays.
+
+Usage:
+  python3 scripts/bug_table.py count [--where col=value ...]
+  python3 scripts/bug_table.py group <col> [<col> ...] [--where col=value ...]
+  python3 scripts/bug_table.py rows [--where col=value ...] [--limit N]
+
+Examples:
+  python3 scripts/bug_table.py group repo found_by
+  python3 scripts/bug_table.py group severity --where verdict=confirmed
+  python3 scripts/bug_table.py rows --where repo=sentry --where bug_type=security
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterator, Mapping, Sequence
+
+from paths import BASE_DIR
+
+VALIDATION_DIR = BASE_DIR / "results" / "ground_truth_validation" / "run_2026-01-15"
+
+REPOS = ["sentry", "grafana", "keycloak", "discourse", "cal_dot_com"]
+
+# Dictionary-encoded string columns
+CATEGORICAL_COLUMNS = ("repo", "file", "severity", "bug_type", "found_by", "verdict", "origin")
+# Plain integer columns (None is stored as MISSING)
+INTEGER_COLUMNS = ("pr", "bug_id", "line")
+COLUMNS = ("repo", "pr", "bug_id", "file", "line", "severity", "bug_type", "found_by", "verdict", "origin")
+
+MISSING = -1
+
+# Verdicts whose rows end up in golden_comments_v2.json
+GOLDEN_V2_VERDICTS = ("confirmed", "modified", "newly_discovered", "actually_real_bug")
+
+
+class BugTable:
+    """Array-backed bug table with dictionary-encoded categorical columns."""
+
+    def __init__(self):
+        self._codes: dict[str, array] = {name: array("I") for name in CATEGORICAL_COLUMNS}
+        self._values: dict[str, list[str]] = {name: [] for name in CATEGORICAL_COLUMNS}
+        self._lookup: dict[str, dict[str, int]] = {name: {} for name in CATEGORICAL_COLUMNS}
+        self._ints: dict[str, array] = {name: array("q") for name in INTEGER_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self._ints["pr"])
+
+    def _encode(self, column: str, value: Any) -> int:
+        value = "" if value is None else str(value)
+        lookup = self._lookup[column]
+        code = lookup.get(value)
+        if code is None:
+            code = len(self._values[column])
+            lookup[value] = code
+            self._values[column].append(value)
+        return code
+
+    def append(self, **row: Any) -> None:
+        """Append one row; unknown columns are rejected, missing ones are blank."""
+        unknown = set(row) - set(COLUMNS)
+        if unknown:
+            raise KeyError(f"Unknown bug table column(s): {sorted(unknown)}")
+        for name in CATEGORICAL_COLUMNS:
+            self._codes[name].append(self._encode(name, row.get(name)))
+        for name in INTEGER_COLUMNS:
+            value = row.get(name)
+            self._ints[name].append(value if isinstance(value, int) else MISSING)
+
+    def column(self, name: str) -> list:
+        """Decode a full column."""
+        if name in INTEGER_COLUMNS:
+            return [None if v == MISSING else v for v in self._ints[name]]
+        values = self._values[name]
+        return [values[c] for c in self._codes[name]]
+
+    def _raw(self, name: str) -> array:
+        if name in CATEGORICAL_COLUMNS:
+            return self._codes[name]
+        if name in INTEGER_COLUMNS:
+            return self._ints[name]
+        raise KeyError(f"Unknown bug table column: {name}")
+
+    def _decode(self, name: str, raw: int) -> Any:
+        if name in CATEGORICAL_COLUMNS:
+            return self._values[name][raw]
+        return None if raw == MISSING else raw
+
+    def _mask(self, where: Mapping[str, Any] | None) -> Iterator[int] | range:
+        """Row indices matching every condition (value or collection of values)."""
+        if not where:
+            return range(len(self))
+        conditions = []
+        for name, wanted in where.items():
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                wanted_values = wanted
+            else:
+                wanted_values = (wanted,)
+            if name in CATEGORICAL_COLUMNS:
+                lookup = self._lookup[name]
+                codes = {lookup[str(v)] for v in wanted_values if str(v) in lookup}
+            else:
+                codes = {MISSING if v is None else int(v) for v in wanted_values}
+            if not codes:
+                return range(0)
+            conditions.append((self._raw(name), codes))
+        return (i for i in range(len(self)) if all(col[i] in codes for col, codes in conditions))
+
+    def count(self, where: Mapping[str, Any] | None = None) -> int:
+        return sum(1 for _ in self._mask(where))
+
+    def group_count(self, by: str | Sequence[str], where: Mapping[str, Any] | None = None) -> dict:
+        """Count rows per group in a single pass.
+
+        Keys are plain values for a single column and tuples for several.
+        Groups appear in order of first occurrence.
+        """
+        names = (by,) if isinstance(by, str) else tuple(by)
+        cols = [self._raw(name) for name in names]
+        counts: Counter = Counter()
+        if len(cols) == 1:
+            col = cols[0]
+            for i in self._mask(where):
+                counts[col[i]] += 1
+            return {self._decode(names[0], k): v for k, v in counts.items()}
+        for i in self._mask(where):
+            counts[tuple(col[i] for col in cols)] += 1
+        return {
+            tuple(self._decode(n, raw) for n, raw in zip(names, key)): v
+            for key, v in counts.items()
+        }
+
+    def rows(self, where: Mapping[str, Any] | None = None) -> Iterator[dict[str, Any]]:
+        for i in self._mask(where):
+            yield {name: self._decode(name, self._raw(name)[i]) for name in COLUMNS}
+
+    def nbytes(self) -> int:
+        """Approximate in-memory size of the column arrays."""
+        arrays = list(self._codes.values()) + list(self._ints.values())
+        return sum(a.itemsize * len(a) for a in arrays)
+
+
+def resolve_found_by(bug: dict, droid_found: set, golden_found: set) -> str:
+    """Attribute a completeness bug to droid, golden or both."""
+    if bug.get("found_by"):
+        return bug["found_by"]
+    bug_id = bug.get("id")
+    in_droid = bug_id in droid_found
+    in_golden = bug_id in golden_found
+    if in_droid and in_golden:
+        return "both"
+    if in_droid:
+        return "droid_only"
+    if in_golden:
+        return "golden_only"
+    return "unknown"
+
+
+def _load_json(path: Path) -> Any:
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _pr_numbers(repo_dir: Path) -> list[int]:
+    numbers = set()
+    for path in repo_dir.glob("pr_*_*.json"):
+        part = path.name.split("_")[1]
+        if part.isdigit():
+            numbers.add(int(part))
+    return sorted(numbers)
+
+
+def load_bug_table(validation_dir: Path = VALIDATION_DIR, repos: Sequence[str] = REPOS) -> BugTable:
+    """Build the bug table from completeness and revalidation files."""
+    table = BugTable()
+
+    for repo in repos:
+        repo_dir = validation_dir / repo
+        for pr_number in _pr_numbers(repo_dir):
+            completeness = _load_json(repo_dir / f"pr_{pr_number}_completeness.json") or {}
+            reval = _load_json(repo_dir / f"pr_{pr_number}_revalidation.json") or {}
+
+            droid_found = set(completeness.get("droid_metrics", {}).get("bugs_found", []))
+            golden_found = set(completeness.get("golden_metrics", {}).get("bugs_found", []))
+            verdicts = {v.get("bug_id"): v for v in reval.get("bug_verdicts", [])}
+
+            for bug in completeness.get("ground_truth_bugs", []):
+                verdict = verdicts.pop(bug.get("id"), {})
+                table.append(
+                    repo=repo,
+                    pr=pr_number,
+                    bug_id=bug.get("id"),
+                    file=verdict.get("verified_file") or bug.get("file"),
+                    line=verdict.get("verified_line") or bug.get("line"),
+                    severity=verdict.get("verified_severity") or bug.get("severity", "medium"),
+                    bug_type=verdict.get("verified_bug_type") or bug.get("bug_type") or bug.get("type", "unknown"),
+                    found_by=resolve_found_by(bug, droid_found, golden_found),
+                    verdict=verdict.get("verdict", "pending"),
+                    origin="completeness",
+                )
+
+            # Verdicts for bugs that are not in the completeness file
+            for bug_id, verdict in verdicts.items():
+                table.append(
+                    repo=repo,
+                    pr=pr_number,
+                    bug_id=bug_id,
+                    file=verdict.get("verified_file") or verdict.get("file"),
+                    line=verdict.get("verified_line") or verdict.get("line"),
+                    severity=verdict.get("verified_severity") or verdict.get("original_severity", "medium"),
+                    bug_type=verdict.get("verified_bug_type") or verdict.get("original_bug_type", "unknown"),
+                    found_by=verdict.get("original_found_by") or verdict.get("original_source", "unknown"),
+                    verdict=verdict.get("verdict", ""),
+                    origin="revalidation",
+                )
+
+            for new_bug in reval.get("newly_discovered_bugs", []):
+                table.append(
+                    repo=repo,
+                    pr=pr_number,
+                    file=new_bug.get("file"),
+                    line=new_bug.get("line"),
+                    severity=new_bug.get("severity", "medium"),
+                    bug_type=new_bug.get("bug_type", "unknown"),
+                    found_by="revalidation",
+                    verdict="newly_discovered",
+                    origin="newly_discovered",
+                )
+
+            for fp in reval.get("false_positive_verdicts", []):
+                table.append(
+                    repo=repo,
+                    pr=pr_number,
+                    file=fp.get("file", ""),
+                    line=fp.get("line"),
+                    severity=fp.get("severity", "medium"),
+                    bug_type=fp.get("bug_type", "unknown"),
+                    found_by="golden_only",
+                    verdict=fp.get("verdict", ""),
+                    origin="golden_false_positive",
+                )
+
+    return table
+
+
+def parse_where(conditions: Sequence[str]) -> dict[str, Any]:
+    """Parse ``col=value`` (or ``col=a,b``) arguments into a where mapping."""
+    where: dict[str, Any] = {}
+    for condition in conditions:
+        if "=" not in condition:
+            raise ValueError(f"Expected col=value, got: {condition}")
+        name, value = condition.split("=", 1)
+        if name not in COLUMNS:
+            raise ValueError(f"Unknown column '{name}'. Columns: {', '.join(COLUMNS)}")
+        values = value.split(",")
+        if name in INTEGER_COLUMNS:
+            values = [None if v in ("", "none", "null") else int(v) for v in values]
+        where[name] = values
+    return where
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the columnar bug table.")
+    parser.add_argument("command", choices=["count", "group", "rows"])
+    parser.add_argument("columns", nargs="*", help="Group-by columns (for 'group')")
+    parser.add_argument("--where", action="append", default=[], metavar="COL=VALUE",
+                        help="Filter rows; repeat for AND, use commas for OR")
+    parser.add_argument("--limit", type=int, default=50, help="Max rows to print (for 'rows')")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    args = parser.parse_args()
+
+    try:
+        where = parse_where(args.where)
+    except ValueError as e:
+        parser.error(str(e))
+
+    table = load_bug_table()
+
+    if args.command == "count":
+        count = table.count(where)
+        print(json.dumps({"count": count}) if args.json else count)
+        return
+
+    if args.command == "group":
+        if not args.columns:
+            parser.error("'group' needs at least one column")
+        for name in args.columns:
+            if name not in COLUMNS:
+                parser.error(f"Unknown column '{name}'. Columns: {', '.join(COLUMNS)}")
+        groups = sorted(table.group_count(args.columns, where).items(), key=lambda x: -x[1])
+        if args.json:
+            print(json.dumps([
+                {**dict(zip(args.columns, key if isinstance(key, tuple) else (key,))), "count": count}
+                for key, count in groups
+            ], indent=2))
+            return
+        for key, count in groups:
+            label = " | ".join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+            print(f"{count:6d}  {label}")
+        print(f"{sum(c for _, c in groups):6d}  TOTAL")
+        return
+
+    rows = list(table.rows(where))
+    if args.json:
+        print(json.dumps(rows[:args.limit], indent=2))
+    else:
+        for row in rows[:args.limit]:
+            print("  ".join(f"{name}={row[name]}" for name in COLUMNS))
+    if len(rows) > args.limit:
+        print(f"... {len(rows) - args.limit} more rows", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
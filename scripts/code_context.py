@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Code-context enrichment for judge prompts.
+
+Reads source from local checkouts (see snapshots.py) through memory-mapped
+files with per-file line-offset indexes, so a line-range lookup is a pair of
+array reads and one slice. Snippets around droid comment and v2 golden bug
+locations are merged per file (overlapping ranges are emitted once) and
+packed into a per-prompt token budget, droid locations first.
+
+Usage: python3 scripts/code_context.py <checkout_dir> [--lookups 20000]
+Example: python3 scripts/code_context.py repos/snapshots/worktrees/sentry/<sha>
+"""
+
+import argparse
+import mmap
+import os
+import random
+import time
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+CONTEXT_LINES = 6
+TOKEN_BUDGET = 1500
+MAX_LINE_CHARS = 200
+# Rough chars-per-token for code; only used to stay within the budget
+CHARS_PER_TOKEN = 3.5
+MAX_OPEN_FILES = 256
+
+
+class LineIndex:
+    """A memory-mapped file plus the byte offset of every line start."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self.offsets = array("Q", [0])
+        if self._mm is not None:
+            find = self._mm.find
+            pos = find(b"\n")
+            while pos != -1:
+                self.offsets.append(pos + 1)
+                pos = find(b"\n", pos + 1)
+            if self.offsets[-1] != size:
+                self.offsets.append(size)
+        self.line_count = len(self.offsets) - 1
+
+    def lines(self, start: int, end: int) -> list[str]:
+        """Lines start..end (1-based, inclusive), clamped to the file."""
+        start, end = max(start, 1), min(end, self.line_count)
+        if self._mm is None or start > end:
+            return []
+        chunk = self._mm[self.offsets[start - 1]:self.offsets[end]]
+        return chunk.decode("utf-8", errors="replace").splitlines()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+
+class LineIndexCache:
+    """LRU of open LineIndex objects, keyed by absolute path."""
+
+    def __init__(self, max_open: int = MAX_OPEN_FILES):
+        self.max_open = max_open
+        self._indexes: OrderedDict[str, LineIndex | None] = OrderedDict()
+
+    def get(self, path: str | Path) -> LineIndex | None:
+        key = str(path)
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key]
+        try:
+            index = LineIndex(key)
+        except (FileNotFoundError, IsADirectoryError, PermissionError):
+            index = None
+        self._indexes[key] = index
+        if len(self._indexes) > self.max_open:
+            _, evicted = self._indexes.popitem(last=False)
+            if evicted is not None:
+                evicted.close()
+        return index
+
+    def close(self) -> None:
+        for index in self._indexes.values():
+            if index is not None:
+                index.close()
+        self._indexes.clear()
+
+
+_default_cache = LineIndexCache()
+
+
+def read_lines(path: str | Path, start: int, end: int, cache: LineIndexCache = _default_cache) -> list[str]:
+    index = cache.get(path)
+    return index.lines(start, end) if index else []
+
+
+@dataclass
+class Location:
+    path: str
+    line: int
+    label: str
+    # Lower sorts first when packing the budget
+    priority: int = 0
+
+
+@dataclass
+class Snippet:
+    path: str
+    start: int
+    end: int
+    labels: list[str]
+    lines: list[str]
+
+    def render(self) -> str:
+        width = len(str(self.end))
+        body = "\n".join(
+            f"{self.start + i:>{width}}  {text[:MAX_LINE_CHARS]}" for i, text in enumerate(self.lines)
+        )
+        return f"--- {self.path}:{self.start}-{self.end} ({'; '.join(self.labels)})\n{body}"
+
+
+def estimate_tokens(text: str) -> int:
+    return int(len(text) / CHARS_PER_TOKEN) + 1
+
+
+class ContextBuilder:
+    """Builds a token-budgeted CODE CONTEXT block from one checkout."""
+
+    def __init__(self, root: str | Path, resolve_path: Callable[[str], str | None] | None = None,
+                 context_lines: int = CONTEXT_LINES, token_budget: int = TOKEN_BUDGET,
+                 cache: LineIndexCache = _default_cache):
+        self.root = Path(root)
+        self.resolve_path = resolve_path or (lambda p: p)
+        self.context_lines = context_lines
+        self.token_budget = token_budget
+        self.cache = cache
+
+    def snippets(self, locations: Iterable[Location]) -> list[Snippet]:
+        """Merge overlapping ranges per file; ordered by best priority, then position."""
+        ranges: dict[str, list[list]] = {}
+        for loc in locations:
+            if not loc.path or not isinstance(loc.line, int) or loc.line < 1:
+                continue
+            path = self.resolve_path(loc.path)
+            if path is None:
+                continue
+            start, end = loc.line - self.context_lines, loc.line + self.context_lines
+            ranges.setdefault(path, []).append([max(start, 1), end, loc.priority, [loc.label]])
+
+        snippets = []
+        for path, spans in ranges.items():
+            index = self.cache.get(self.root / path)
+            if index is None:
+                continue
+            spans.sort()
+            merged = [spans[0]]
+            for span in spans[1:]:
+                last = merged[-1]
+                if span[0] <= last[1] + 1:
+                    last[1] = max(last[1], span[1])
+                    last[2] = min(last[2], span[2])
+                    last[3].extend(l for l in span[3] if l not in last[3])
+                else:
+                    merged.append(span)
+            for start, end, priority, labels in merged:
+                lines = index.lines(start, end)
+                if lines:
+                    snippets.append((priority, path, start,
+                                     Snippet(path, start, start + len(lines) - 1, labels, lines)))
+        return [s for *_, s in sorted(snippets, key=lambda t: t[:3])]
+
+    def build(self, locations: Iterable[Location]) -> str:
+        """Render snippets until the token budget is spent; trims the last one to fit."""
+        parts, used = [], 0
+        for snippet in self.snippets(locations):
+            text = snippet.render()
+            cost = estimate_tokens(text)
+            if used + cost > self.token_budget:
+                remaining = self.token_budget - used
+                # Keep the centre of the snippet if at least a few lines fit
+                keep = int(len(snippet.lines) * remaining / cost)
+                if keep >= 3:
+                    cut = (len(snippet.lines) - keep) // 2
+                    trimmed = Snippet(snippet.path, snippet.start + cut, snippet.start + cut + keep - 1,
+                                      snippet.labels, snippet.lines[cut:cut + keep])
+                    parts.append(trimmed.render())
+                break
+            parts.append(text)
+            used += cost
+        return "\n\n".join(parts)
+
+
+def benchmark(root: Path, n_lookups: int = 20000, seed: int = 0) -> dict[str, float]:
+    """Index build and random line-range lookup cost over files under ``root``."""
+    files = [p for p in root.rglob("*") if p.is_file() and ".git" not in p.parts][:2000]
+    cache = LineIndexCache(max_open=len(files) + 1)
+    start = time.perf_counter()
+    indexes = [i for i in (cache.get(p) for p in files) if i is not None and i.line_count]
+    build_s = time.perf_counter() - start
+    rng = random.Random(seed)
+    picks = [(index, rng.randint(1, index.line_count)) for index in (rng.choice(indexes) for _ in range(n_lookups))]
+    start = time.perf_counter()
+    for index, line in picks:
+        index.lines(line - CONTEXT_LINES, line + CONTEXT_LINES)
+    lookup_s = time.perf_counter() - start
+    cache.close()
+    return {
+        "files": len(indexes),
+        "lines": sum(i.line_count for i in indexes),
+        "index_build_ms": round(build_s * 1000, 1),
+        "lookups": n_lookups,
+        "lookup_us": round(lookup_s / n_lookups * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory-mapped line lookups over a checkout.")
+    parser.add_argument("root", type=Path, help="Checkout (e.g. a snapshots.py worktree)")
+    parser.add_argument("--lookups", type=int, default=20000)
+    args = parser.parse_args()
+
+    stats = benchmark(args.root, args.lookups)
+    print(f"Indexed {stats['files']} files ({stats['lines']} lines) in {stats['index_build_ms']} ms")
+    print(f"{stats['lookups']} lookups of {2 * CONTEXT_LINES + 1} lines: {stats['lookup_us']} us each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Near-duplicate clustering of droid review comments within a PR.
+
+Droid often posts the same finding more than once (re-worded, or on adjacent
+lines). Comments are clustered before judging so that only one representative
+per cluster is sent to the LLM; the others inherit its verdict.
+
+Two comments are linked when their word shingles are similar enough and they
+are close in the code:
+  - same file, within LINE_WINDOW lines, and Jaccard >= NEAR_SIMILARITY, or
+  - same file and Jaccard >= SAME_FILE_SIMILARITY (near-identical text).
+Distinct bugs of the same kind at different locations (e.g. the same negative
+slicing bug in two paginators) therefore stay separate.
+"""
+
+from typing import Any, Sequence
+
+from minhash import LSHIndex, MinHasher, estimate_jaccard, shingles, tokenize
+
+LINE_WINDOW = 30
+NEAR_SIMILARITY = 0.3
+SAME_FILE_SIMILARITY = 0.7
+SHINGLE_SIZE = 1
+
+
+def _find(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def _lines_close(a: Any, b: Any, window: int) -> bool:
+    return isinstance(a, int) and isinstance(b, int) and abs(a - b) <= window
+
+
+def cluster_comments(
+    comments: Sequence[dict],
+    line_window: int = LINE_WINDOW,
+    near_similarity: float = NEAR_SIMILARITY,
+    same_file_similarity: float = SAME_FILE_SIMILARITY,
+) -> list[list[int]]:
+    """Group comment indices into near-duplicate clusters.
+
+    Each cluster is sorted, so its first index is the representative (the
+    earliest comment). Clusters are ordered by representative.
+    """
+    n = len(comments)
+    if n < 2:
+        return [[i] for i in range(n)]
+
+    hasher = MinHasher()
+    index = LSHIndex()
+    signatures = []
+    for i, comment in enumerate(comments):
+        signature = hasher.signature(shingles(tokenize(comment.get("body", "")), SHINGLE_SIZE))
+        signatures.append(signature)
+        index.add(i, signature)
+
+    parent = list(range(n))
+    for i, comment in enumerate(comments):
+        candidates = index.query(signatures[i])
+        # Same-location comments are always compared, even without a band hit
+        candidates.update(
+            j for j in range(n)
+            if comments[j].get("path") == comment.get("path")
+            and _lines_close(comments[j].get("line"), comment.get("line"), line_window)
+        )
+        for j in candidates:
+            if j <= i or comments[j].get("path") != comment.get("path"):
+                continue
+            similarity = estimate_jaccard(signatures[i], signatures[j])
+            near = _lines_close(comments[j].get("line"), comment.get("line"), line_window)
+            if (near and similarity >= near_similarity) or similarity >= same_file_similarity:
+                root_i, root_j = _find(parent, i), _find(parent, j)
+                if root_i != root_j:
+                    parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(n):
+        clusters.setdefault(_find(parent, i), []).append(i)
+    return sorted(clusters.values())
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Full-text search over golden, droid and validation comments.
+
+Indexed documents:
+
+  golden_v1   v1 golden comments (verdict from the golden audits)
+  golden_v2   golden_comments_v2.json bugs (verdict from revalidation)
+  droid       Droid review comments from every results/<run>/ (verdict from
+              the run's eval output, else from droid_validations)
+  validation  reasoning + code_evidence of droid_validations and golden_audits,
+              and the notes of each revalidation verdict
+
+The index is an SQLite FTS5 table (an inverted index ranked with BM25) at
+.cache/comment_search.sqlite. Text is tokenized like the rest of the repo
+(minhash.tokenize: camelCase parts, light plural folding), so "paginator"
+finds OptimizedCursorPaginator. Each source file group is re-indexed only
+when one of its files changes, so a search after a new run lands only
+indexes that run.
+
+Query syntax: words are ANDed (--any for OR), "quoted phrases" match in order,
+a trailing * matches a prefix, and field:value filters (comma-separated values)
+narrow the results: source, kind, repo, pr, run, severity, bug_type, verdict.
+
+Usage: python3 scripts/comment_search.py search <query> [--limit 20] [--any] [--json] [--no-update]
+       python3 scripts/comment_search.py index [--rebuild]
+Example: python3 scripts/comment_search.py search '"negative slicing"' source:droid verdict:false_positive
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from fetch_comments import BOT_LOGIN
+from golden_alignment import find_v1_path
+from minhash import tokenize
+from paths import BASE_DIR, RESULTS_DIR
+
+INDEX_PATH = BASE_DIR / ".cache" / "comment_search.sqlite"
+# Bump when the document layout or tokenization changes; older indexes are rebuilt
+INDEX_VERSION = 1
+MANIFEST_PATH = BASE_DIR / "manifest.json"
+VALIDATION_ROOT = RESULTS_DIR / "ground_truth_validation"
+GOLDEN_V2_PATH = RESULTS_DIR / "golden_comments_v2.json"
+
+FILTERS = ("source", "kind", "repo", "pr", "run", "severity", "bug_type", "verdict")
+DOC_COLUMNS = ("source", "kind", "run", "repo", "pr", "severity", "bug_type", "verdict",
+               "file", "line", "ref", "text", "origin")
+SNIPPET_CHARS = 200
+
+QUERY_PART_RE = re.compile(r'(\w+):("[^"]*"|\S+)|"([^"]*)"|(\S+)')
+WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*|\d+")
+COMMENTS_FILE_RE = re.compile(r"^pr_(\d+)_comments\.json$")
+VALIDATION_FILE_RE = re.compile(r"^pr_(\d+)_(droid_validations|golden_audits|revalidation)\.json$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS units (key TEXT PRIMARY KEY, signature TEXT);
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY, unit TEXT, source TEXT, kind TEXT, run TEXT, repo TEXT, pr INTEGER,
+    severity TEXT, bug_type TEXT, verdict TEXT, file TEXT, line INTEGER, ref TEXT, text TEXT, origin TEXT
+);
+CREATE INDEX IF NOT EXISTS docs_unit ON docs(unit);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(terms);
+"""
+
+
+@dataclass
+class Unit:
+    """A group of documents rebuilt together whenever one of ``deps`` changes."""
+    key: str
+    deps: list[Path]
+    build: Callable[["Loader"], list[dict]]
+
+
+class Loader:
+    """JSON reads shared by the units of one update (golden v2 serves every repo)."""
+
+    def __init__(self):
+        self._cache: dict[Path, Any] = {}
+
+    def __call__(self, path: Path) -> Any:
+        if path not in self._cache:
+            with open(path) as f:
+                self._cache[path] = json.load(f)
+        return self._cache[path]
+
+
+def _lower(value: Any) -> str | None:
+    return value.lower() if isinstance(value, str) and value else None
+
+
+def _origin(path: Path) -> str:
+    try:
+        return str(path.relative_to(BASE_DIR))
+    except ValueError:
+        return str(path)
+
+
+def _doc(source: str, kind: str, text: str, origin: Path, **fields: Any) -> dict:
+    doc = dict.fromkeys(DOC_COLUMNS)
+    doc.update(source=source, kind=kind, text=text, origin=_origin(origin), **fields)
+    for field in ("severity", "bug_type", "verdict"):
+        doc[field] = _lower(doc[field])
+    if doc["ref"] is not None:
+        doc["ref"] = str(doc["ref"])
+    return doc
+
+
+def _join(*parts: Any) -> str:
+    return "\n\n".join(p for p in parts if isinstance(p, str) and p.strip())
+
+
+# ---------------------------------------------------------------------------
+# Document builders
+# ---------------------------------------------------------------------------
+
+def pr_numbers_by_title(load: Loader, reval_paths: list[Path], manifest_titles: dict[str, int]) -> dict[str, int]:
+    """Normalized PR title -> PR number as the validation tree numbers PRs (the manifest can differ)."""
+    titles = {}
+    for reval_path in reval_paths:
+        reval = load(reval_path)
+        titles[" ".join(reval.get("pr_title", "").lower().split())] = reval.get("pr_number")
+    for title, pr_number in manifest_titles.items():
+        titles.setdefault(title, pr_number)
+    return titles
+
+
+def golden_v1_docs(load: Loader, repo: str, path: Path, audit_paths: list[Path], titles: dict[str, int]) -> list[dict]:
+    verdicts = {}
+    for audit_path in audit_paths:
+        pr_number = int(VALIDATION_FILE_RE.match(audit_path.name).group(1))
+        for entry in load(audit_path):
+            is_real = entry.get("audit", {}).get("is_real_bug")
+            verdicts[(pr_number, entry.get("golden_comment"))] = "real_bug" if is_real else "false_positive"
+    docs = []
+    for pr in load(path):
+        pr_number = titles.get(" ".join(pr.get("pr_title", "").lower().split()))
+        for comment in pr.get("comments", []):
+            docs.append(_doc("golden_v1", "golden_comment", comment.get("comment", ""), path, repo=repo, pr=pr_number,
+                             severity=comment.get("severity"),
+                             verdict=verdicts.get((pr_number, comment.get("comment")))))
+    return docs
+
+
+def golden_v2_docs(load: Loader, repo: str, reval_paths: list[Path]) -> list[dict]:
+    verdicts = {}
+    for reval_path in reval_paths:
+        pr_number = int(VALIDATION_FILE_RE.match(reval_path.name).group(1))
+        for bug in load(reval_path).get("bug_verdicts", []):
+            verdicts[(pr_number, bug.get("bug_id"))] = bug.get("verdict")
+    docs = []
+    for pr in load(GOLDEN_V2_PATH).get("repos", {}).get(repo, {}).get("prs", []):
+        for bug in pr.get("bugs", []):
+            if bug.get("newly_discovered"):
+                verdict = "newly_discovered"
+            elif bug.get("from_reversed_false_positive"):
+                verdict = "actually_real_bug"
+            else:
+                verdict = verdicts.get((pr["pr_number"], bug.get("id")), "confirmed")
+            docs.append(_doc("golden_v2", "golden_bug", bug.get("description") or "", GOLDEN_V2_PATH, repo=repo,
+                             pr=pr["pr_number"], severity=bug.get("severity"), bug_type=bug.get("bug_type"),
+                             verdict=verdict, file=bug.get("file"), line=bug.get("line"), ref=bug.get("id")))
+    return docs
+
+
+def eval_verdicts(load: Loader, eval_paths: list[Path]) -> dict[int, str]:
+    """comment_id -> true_positive / false_positive / duplicate from a run's eval outputs."""
+    # Imported here: only needed for runs that have been evaluated
+    from eval_format import expand
+
+    verdicts: dict[int, str] = {}
+    for path in eval_paths:
+        for pr in expand(load(path)).get("prs", []):
+            for field, verdict in (("true_positives", "true_positive"), ("false_positives", "false_positive"),
+                                   ("duplicates", "duplicate")):
+                for evaluation in pr.get(field, []):
+                    verdicts.setdefault(evaluation.get("comment_id"), verdict)
+    return verdicts
+
+
+def validation_verdicts(load: Loader, paths: list[Path]) -> dict[int, dict]:
+    """comment_id -> the droid_validations entry's validation block."""
+    validations = {}
+    for path in paths:
+        for entry in load(path):
+            validations[entry.get("comment_id")] = entry.get("validation", {})
+    return validations
+
+
+def droid_docs(load: Loader, run: str, repo: str, path: Path, pr_number: int | None,
+               eval_paths: list[Path], validation_paths: list[Path]) -> list[dict]:
+    """Droid comments from pr_N_comments.json (GitHub API shape) or raw_comments/droid-<repo>.json."""
+    data = load(path)
+    if pr_number is not None:
+        comments = [(pr_number, c) for c in data if c.get("user", {}).get("login", BOT_LOGIN) == BOT_LOGIN]
+    else:
+        comments = [(pr["number"], c) for pr in data.get("prs", []) for c in pr.get("review_comments", [])]
+    run_verdicts = eval_verdicts(load, eval_paths) if eval_paths else {}
+    validations = validation_verdicts(load, validation_paths)
+    docs = []
+    for number, comment in comments:
+        validation = validations.get(comment.get("id"), {})
+        verdict = run_verdicts.get(comment.get("id"))
+        if verdict is None and "is_valid_bug" in validation:
+            verdict = "valid_bug" if validation["is_valid_bug"] else "not_a_bug"
+        docs.append(_doc("droid", "droid_comment", comment.get("body") or "", path, run=run, repo=repo, pr=number,
+                         severity=validation.get("severity"), bug_type=validation.get("bug_type"), verdict=verdict,
+                         file=comment.get("path"), line=comment.get("line"), ref=comment.get("id")))
+    return docs
+
+
+def validation_docs(load: Loader, run: str, repo: str, pr_number: int, kind: str, path: Path) -> list[dict]:
+    data = load(path)
+    common = {"run": run, "repo": repo, "pr": pr_number}
+    docs = []
+    if kind == "droid_validations":
+        for entry in data:
+            v = entry.get("validation", {})
+            docs.append(_doc("validation", "droid_validation", _join(v.get("reasoning"), v.get("code_evidence")), path,
+                             severity=v.get("severity"), bug_type=v.get("bug_type"),
+                             verdict="valid_bug" if v.get("is_valid_bug") else "not_a_bug",
+                             file=entry.get("file"), line=entry.get("line"), ref=entry.get("comment_id"), **common))
+    elif kind == "golden_audits":
+        for entry in data:
+            audit = entry.get("audit", {})
+            location = audit.get("bug_location") or {}
+            if isinstance(location, list):
+                # Bugs spanning several places list each one; index the first
+                location = location[0] if location else {}
+            docs.append(_doc("validation", "golden_audit", _join(audit.get("reasoning"), audit.get("code_evidence")),
+                             path, severity=entry.get("severity"),
+                             verdict="real_bug" if audit.get("is_real_bug") else "false_positive",
+                             file=location.get("file"), line=location.get("line"), **common))
+    else:
+        for bug in data.get("bug_verdicts", []):
+            docs.append(_doc("validation", "revalidation",
+                             _join(bug.get("notes"), bug.get("verified_description") or bug.get("original_description")),
+                             path, severity=bug.get("verified_severity") or bug.get("original_severity"),
+                             bug_type=bug.get("verified_bug_type") or bug.get("original_bug_type"),
+                             verdict=bug.get("verdict"), file=bug.get("verified_file") or bug.get("file"),
+                             line=bug.get("verified_line") or bug.get("line"), ref=bug.get("bug_id"), **common))
+        for fp in data.get("false_positive_verdicts", []):
+            docs.append(_doc("validation", "revalidation", _join(fp.get("notes"), fp.get("original_reasoning")), path,
+                             severity=fp.get("severity"), bug_type=fp.get("bug_type"), verdict=fp.get("verdict"),
+                             file=fp.get("file"), line=fp.get("line"), **common))
+    return [d for d in docs if d["text"]]
+
+
+# ---------------------------------------------------------------------------
+# Source discovery
+# ---------------------------------------------------------------------------
+
+def _pr_files(directory: Path, pattern: re.Pattern) -> list[tuple[int, str, Path]]:
+    if not directory.is_dir():
+        return []
+    found = []
+    for entry in os.scandir(directory):
+        match = pattern.match(entry.name)
+        if match:
+            found.append((int(match.group(1)), match.group(2) if pattern.groups > 1 else "", Path(entry.path)))
+    return sorted(found)
+
+
+def discover_units(results_dir: Path = RESULTS_DIR, manifest_path: Path = MANIFEST_PATH) -> list[Unit]:
+    with open(manifest_path) as f:
+        projects = json.load(f)["projects"]
+    repos = list(projects)
+    titles = {repo: {" ".join(pr["title"].lower().split()): pr["number"] for pr in project["prs"]}
+              for repo, project in projects.items()}
+    units: list[Unit] = []
+
+    # Validation files, grouped by kind per repo for the golden/droid verdict lookups
+    by_kind: dict[tuple[str, str], list[Path]] = {}
+    validation_runs = sorted(p for p in VALIDATION_ROOT.iterdir() if p.is_dir()) if VALIDATION_ROOT.is_dir() else []
+    for run_path in validation_runs:
+        for repo in repos:
+            for pr_number, kind, path in _pr_files(run_path / repo, VALIDATION_FILE_RE):
+                by_kind.setdefault((repo, kind), []).append(path)
+                units.append(Unit(f"validation/{run_path.name}/{repo}/{path.name}", [path],
+                                  lambda load, r=run_path.name, repo=repo, n=pr_number, k=kind, p=path:
+                                  validation_docs(load, r, repo, n, k, p)))
+
+    for repo in repos:
+        v1_path = find_v1_path(repo)
+        audits = by_kind.get((repo, "golden_audits"), [])
+        revals = by_kind.get((repo, "revalidation"), [])
+        if v1_path:
+            units.append(Unit(f"golden_v1/{repo}", [v1_path, *audits, *revals],
+                              lambda load, repo=repo, p=v1_path, a=audits, r=revals:
+                              golden_v1_docs(load, repo, p, a, pr_numbers_by_title(load, r, titles[repo]))))
+        if GOLDEN_V2_PATH.exists():
+            units.append(Unit(f"golden_v2/{repo}", [GOLDEN_V2_PATH, *revals],
+                              lambda load, repo=repo, r=revals: golden_v2_docs(load, repo, r)))
+
+    # Droid comments: results/<run>/pr_N_comments.json (sentry runs), results/<run>/<repo>/pr_N_comments.json,
+    # or only raw_comments/droid-<repo>.json when the per-PR files were not kept
+    validation_by_pr: dict[tuple[str, int], list[Path]] = {}
+    for (repo, kind), paths in by_kind.items():
+        if kind == "droid_validations":
+            for path in paths:
+                validation_by_pr.setdefault((repo, int(VALIDATION_FILE_RE.match(path.name).group(1))), []).append(path)
+    for run_path in sorted(p for p in results_dir.iterdir() if p.is_dir() and p != VALIDATION_ROOT):
+        evals = sorted(run_path.glob("*_eval*.json"))
+        sources = [("sentry", n, p) for n, _, p in _pr_files(run_path, COMMENTS_FILE_RE)]
+        for repo in repos:
+            sources += [(repo, n, p) for n, _, p in _pr_files(run_path / repo, COMMENTS_FILE_RE)]
+        if not sources:
+            raw_dir = run_path / "raw_comments"
+            sources = [(repo, None, raw_dir / f"droid-{repo}.json") for repo in repos
+                       if (raw_dir / f"droid-{repo}.json").exists()]
+        for repo, pr_number, path in sources:
+            validations = (validation_by_pr.get((repo, pr_number), []) if pr_number is not None else
+                           [p for (r, _), paths in validation_by_pr.items() if r == repo for p in paths])
+            run_evals = [e for e in evals if e.name.startswith(f"{repo}_")]
+            units.append(Unit(f"droid/{run_path.name}/{_origin(path)}", [path, *run_evals, *validations],
+                              lambda load, run=run_path.name, repo=repo, p=path, n=pr_number, e=run_evals,
+                              v=validations: droid_docs(load, run, repo, p, n, e, v)))
+    return units
+
+
+def signature(paths: list[Path]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        try:
+            st = path.stat()
+            digest.update(f"{path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        except FileNotFoundError:
+            digest.update(f"{path}\0-\n".encode())
+    return digest.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+
+def open_index(path: Path = INDEX_PATH, rebuild: bool = False) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if rebuild and path.exists():
+        path.unlink()
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    if row is None or int(row["value"]) != INDEX_VERSION:
+        conn.executescript("DELETE FROM units; DELETE FROM docs; DELETE FROM fts;")
+        conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+        conn.commit()
+    return conn
+
+
+def _remove_unit(conn: sqlite3.Connection, key: str) -> None:
+    conn.execute("DELETE FROM fts WHERE rowid IN (SELECT id FROM docs WHERE unit = ?)", (key,))
+    conn.execute("DELETE FROM docs WHERE unit = ?", (key,))
+    conn.execute("DELETE FROM units WHERE key = ?", (key,))
+
+
+def update_index(conn: sqlite3.Connection, units: list[Unit]) -> dict[str, int]:
+    """Re-index units whose files changed and drop units that disappeared."""
+    stored = dict(conn.execute("SELECT key, signature FROM units").fetchall())
+    current = {unit.key for unit in units}
+    load = Loader()
+    stats = {"units": len(units), "reindexed": 0, "removed": 0, "docs_added": 0, "errors": 0}
+    with conn:
+        for key in stored.keys() - current:
+            _remove_unit(conn, key)
+            stats["removed"] += 1
+        for unit in units:
+            sig = signature(unit.deps)
+            if stored.get(unit.key) == sig:
+                continue
+            try:
+                docs = unit.build(load)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+                # Leave the previous documents in place; retried on the next update
+                print(f"  Warning: could not index {unit.key}: {e}", file=sys.stderr)
+                stats["errors"] += 1
+                continue
+            _remove_unit(conn, unit.key)
+            for doc in docs:
+                cursor = conn.execute(
+                    f"INSERT INTO docs (unit, {', '.join(DOC_COLUMNS)}) VALUES (?{', ?' * len(DOC_COLUMNS)})",
+                    (unit.key, *(doc[c] for c in DOC_COLUMNS)))
+                conn.execute("INSERT INTO fts (rowid, terms) VALUES (?, ?)", (cursor.lastrowid, " ".join(tokenize(doc["text"]))))
+            conn.execute("INSERT INTO units VALUES (?, ?)", (unit.key, sig))
+            stats["reindexed"] += 1
+            stats["docs_added"] += len(docs)
+    stats["docs"] = conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def parse_query(query: str) -> tuple[list[str], dict[str, list[str]], set[str]]:
+    """(FTS5 match clauses, field filters, query tokens for highlighting)."""
+    clauses, filters, tokens = [], {}, set()
+    for field, value, phrase, word in QUERY_PART_RE.findall(query):
+        if field and field.lower() in FILTERS:
+            filters.setdefault(field.lower(), []).extend(v for v in value.strip('"').split(",") if v)
+            continue
+        if field:
+            word = f"{field}:{value}"
+        text = phrase or word
+        prefix = bool(word) and word.endswith("*")
+        terms = tokenize(text.rstrip("*"))
+        if not terms:
+            continue
+        tokens.update(terms)
+        clause = '"' + " ".join(terms) + '"'
+        clauses.append(clause + " *" if prefix else clause)
+    return clauses, filters, tokens
+
+
+def search(conn: sqlite3.Connection, query: str, limit: int = 20, any_term: bool = False) -> list[dict]:
+    clauses, filters, _ = parse_query(query)
+    where, params = [], []
+    for field, values in filters.items():
+        if field == "pr":
+            values = [int(v) for v in values]
+        where.append(f"d.{field} IN ({', '.join('?' * len(values))})" + (" COLLATE NOCASE" if field != "pr" else ""))
+        params.extend(values)
+    if clauses:
+        sql = ("SELECT d.*, -bm25(fts) AS score FROM fts JOIN docs d ON d.id = fts.rowid WHERE fts MATCH ?"
+               + "".join(f" AND {w}" for w in where) + " ORDER BY bm25(fts) LIMIT ?")
+        params = [(" OR " if any_term else " AND ").join(clauses), *params, limit]
+    else:
+        sql = ("SELECT d.*, NULL AS score FROM docs d" + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY d.source, d.repo, d.pr, d.id LIMIT ?")
+        params = [*params, limit]
+    return [dict(row) for row in conn.execute(sql, params)]
+
+
+def snippet(text: str, tokens: set[str], width: int = SNIPPET_CHARS) -> str:
+    """The part of ``text`` around the first query match, with matched words in **bold**."""
+    matches = [m for m in WORD_RE.finditer(text) if tokens & set(tokenize(m.group()))]
+    start = max(0, matches[0].start() - width // 3) if matches else 0
+    end = min(len(text), start + width)
+    out, pos = [], start
+    for m in matches:
+        if m.start() < start or m.end() > end:
+            continue
+        out += [text[pos:m.start()], f"**{m.group()}**"]
+        pos = m.end()
+    out.append(text[pos:end])
+    body = " ".join("".join(out).split())
+    return ("..." if start > 0 else "") + body + ("..." if end < len(text) else "")
+
+
+def print_results(results: list[dict], tokens: set[str]) -> None:
+    for i, r in enumerate(results, 1):
+        where = " ".join(str(x) for x in (r["repo"], f"PR {r['pr']}" if r["pr"] is not None else None, r["run"]) if x)
+        labels = " ".join(x for x in (r["severity"], r["bug_type"], r["verdict"]) if x)
+        score = f"{r['score']:6.2f}" if r["score"] is not None else "     -"
+        print(f"{i:3}. {score}  {r['source']}/{r['kind']}  {where}  {labels}")
+        if r["file"]:
+            print(f"             {r['file']}{':' + str(r['line']) if r['line'] else ''}")
+        print(f"             {snippet(r['text'], tokens)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search golden, droid and validation comments.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    search_parser = sub.add_parser("search", help="Ranked full-text search (updates the index first)")
+    search_parser.add_argument("query", nargs="+", help='Words, "phrases", prefix*, field:value filters')
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.add_argument("--any", action="store_true", help="Match any word instead of all")
+    search_parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    search_parser.add_argument("--no-update", action="store_true", help="Search the index as is")
+    index_parser = sub.add_parser("index", help="Bring the index up to date and show its size")
+    index_parser.add_argument("--rebuild", action="store_true", help="Discard the index and rebuild it")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    conn = open_index(rebuild=getattr(args, "rebuild", False))
+    if args.command == "index" or not args.no_update:
+        stats = update_index(conn, discover_units())
+        if args.command == "index" or stats["reindexed"] or stats["removed"]:
+            print(f"Index: {stats['reindexed']} of {stats['units']} source groups re-indexed, {stats['removed']} removed, "
+                  f"{stats['docs']} documents ({(time.perf_counter() - start) * 1000:.0f} ms) -> {_origin(INDEX_PATH)}",
+                  file=sys.stderr)
+    if args.command == "index":
+        for source, count in conn.execute("SELECT source, COUNT(*) FROM docs GROUP BY source ORDER BY source"):
+            print(f"  {source:<11} {count}")
+        return
+
+    query = " ".join(args.query)
+    try:
+        search_start = time.perf_counter()
+        results = search(conn, query, args.limit, args.any)
+    except (sqlite3.OperationalError, ValueError) as e:
+        raise SystemExit(f"Bad query {query!r}: {e}")
+    elapsed_ms = (time.perf_counter() - search_start) * 1000
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print_results(results, parse_query(query)[2])
+    print(f"\n{len(results)} result(s) in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,30 +5,53 @@ Create v2 golden comments in multiple formats for droid-golden_comments repo.
 Generates:
 1. v2/code_review_benchmarks/{repo}.json - Compatible format (same as v1)
 2. v2/detailed/{repo}.json - Extended format with file/line info
+3. v2/golden_comments.parquet (or v2/golden_comments.jsonl.gz without pyarrow) -
+   compact flat table with one row per bug across all repos
+4. v2/MANIFEST.json - sha256/size of every generated file
+
+All formats are built in a single pass over the v2 data, and a file is only
+rewritten when its content changed.
+
+Usage: python3 scripts/create_golden_comments_repo.py [--benchmark]
 """
 
+import argparse
+import gzip
+import hashlib
+import io
 import json
+import time
 from pathlib import Path
+from typing import Any
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from golden_alignment import build_alignment
+from paths import BASE_DIR
 
-BASE_DIR = Path(__file__).parent.parent
 INPUT_PATH = BASE_DIR / "results" / "golden_comments_v2.json"
 OUTPUT_DIR = BASE_DIR / "work" / "droid-golden_comments"
 V1_DIR = BASE_DIR / "repos" / "golden_comments" / "code_review_benchmarks"
 
 REPOS = ["sentry", "grafana", "keycloak", "discourse", "cal_dot_com"]
 
+# Columns of the flat per-bug artifact, in order
+COLUMNS = ["repo", "pr_number", "pr_title", "id", "file", "line", "description", "severity", "bug_type"]
+PARQUET_NAME = "golden_comments.parquet"
+JSONL_NAME = "golden_comments.jsonl.gz"
+MANIFEST_NAME = "MANIFEST.json"
+
 
 def load_golden_v2():
     with open(INPUT_PATH) as f:
         return json.load(f)
 
 
-def load_v1_repo(repo: str):
-    filepath = V1_DIR / f"{repo}.json"
-    with open(filepath) as f:
-        return json.load(f)
-
-
 def severity_to_title_case(severity: str) -> str:
     """Convert 'high' to 'High', 'medium' to 'Medium', etc."""
     if severity.lower() == "critical":
@@ -42,54 +65,214 @@ def severity_to_title_case(severity: str) -> str:
     return severity.title()
 
 
-def create_compatible_format(repo_data: dict) -> list:
-    """Create v1-compatible format (pr_title + comments with comment/severity)."""
-    output = []
+def build_repo_formats(repo: str, repo_data: dict, rows: list[dict]) -> tuple[list, list]:
+    """Build compatible and detailed formats for a repo in one pass.
+
+    Flat per-bug rows for the columnar artifact are appended to ``rows``.
+    """
+    compatible = []
+    detailed = []
     
     for pr in repo_data.get("prs", []):
         comments = []
+        bugs = []
         for bug in pr.get("bugs", []):
+            severity = bug.get("severity", "medium")
             comments.append({
                 "comment": bug["description"],
-                "severity": severity_to_title_case(bug.get("severity", "Medium"))
+                "severity": severity_to_title_case(severity)
             })
-        
-        output.append({
-            "pr_title": pr["pr_title"],
-            "comments": comments
-        })
-    
-    return output
-
-
-def create_detailed_format(repo_data: dict) -> list:
-    """Create detailed format with file/line/bug_type info."""
-    output = []
-    
-    for pr in repo_data.get("prs", []):
-        bugs = []
-        for bug in pr.get("bugs", []):
-            bugs.append({
+            detailed_bug = {
                 "id": bug.get("id"),
                 "file": bug.get("file", ""),
                 "line": bug.get("line"),
                 "description": bug["description"],
-                "severity": bug.get("severity", "medium"),
+                "severity": severity,
                 "bug_type": bug.get("bug_type", "unknown")
+            }
+            bugs.append(detailed_bug)
+            rows.append({
+                "repo": repo,
+                "pr_number": pr["pr_number"],
+                "pr_title": pr["pr_title"],
+                **detailed_bug,
+                # Mixed int/str ids ("new_1", "fp_reversed_3") need one column type
+                "id": str(detailed_bug["id"]),
             })
         
-        output.append({
+        compatible.append({
+            "pr_title": pr["pr_title"],
+            "comments": comments
+        })
+        detailed.append({
             "pr_number": pr["pr_number"],
             "pr_title": pr["pr_title"],
             "bug_count": len(bugs),
             "bugs": bugs
         })
     
-    return output
+    return compatible, detailed
+
+
+def encode_json(data: Any) -> bytes:
+    return json.dumps(data, indent=2).encode()
+
+
+def encode_jsonl_gz(rows: list[dict]) -> bytes:
+    """Gzip JSONL; mtime is pinned so identical rows give identical bytes."""
+    payload = "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows).encode()
+    return gzip.compress(payload, compresslevel=9, mtime=0)
+
+
+def encode_parquet(rows: list[dict]) -> bytes:
+    table = pa.Table.from_pydict(
+        {name: [row[name] for row in rows] for name in COLUMNS},
+        schema=pa.schema([
+            ("repo", pa.dictionary(pa.int8(), pa.string())),
+            ("pr_number", pa.int32()),
+            ("pr_title", pa.dictionary(pa.int16(), pa.string())),
+            ("id", pa.string()),
+            ("file", pa.string()),
+            ("line", pa.int32()),
+            ("description", pa.string()),
+            ("severity", pa.dictionary(pa.int8(), pa.string())),
+            ("bug_type", pa.dictionary(pa.int8(), pa.string())),
+        ]),
+    )
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+
+def build_exports(v2_data: dict, changelog: str) -> dict[str, bytes]:
+    """Build every exported file (relative path -> bytes) in a single pass.
+
+    The manifest is built last so it covers every other file, CHANGELOG.md
+    included.
+    """
+    files = {"CHANGELOG.md": changelog.encode()}
+    rows: list[dict] = []
+    
+    for repo in REPOS:
+        compatible, detailed = build_repo_formats(repo, v2_data["repos"][repo], rows)
+        files[f"v2/code_review_benchmarks/{repo}.json"] = encode_json(compatible)
+        files[f"v2/detailed/{repo}.json"] = encode_json(detailed)
+    
+    if pa is not None:
+        files[f"v2/{PARQUET_NAME}"] = encode_parquet(rows)
+    else:
+        files[f"v2/{JSONL_NAME}"] = encode_jsonl_gz(rows)
+    
+    files[f"v2/{MANIFEST_NAME}"] = encode_json(build_manifest(v2_data, files, len(rows)))
+    return files
 
 
-def generate_changelog(v2_data: dict) -> str:
-    """Generate changelog comparing v1 and v2."""
+def build_manifest(v2_data: dict, files: dict[str, bytes], row_count: int) -> dict:
+    """Content manifest: hashes of the source and of every generated file."""
+    with open(INPUT_PATH, "rb") as f:
+        source_hash = hashlib.sha256(f.read()).hexdigest()
+    return {
+        "version": v2_data["version"],
+        "source": {
+            "path": "results/golden_comments_v2.json",
+            "sha256": source_hash,
+            "generated_date": v2_data["generated_date"],
+        },
+        "total_bugs": row_count,
+        "files": {
+            path: {"sha256": hashlib.sha256(data).hexdigest(), "bytes": len(data)}
+            for path, data in sorted(files.items())
+        },
+    }
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Write ``data`` to ``path`` unless the file already has that content."""
+    if path.exists() and path.stat().st_size == len(data):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    tmp_path.replace(path)
+    return True
+
+
+def load_columnar_jsonl(path: Path) -> list[dict]:
+    # One json.loads over the whole payload beats a loads() per line;
+    # newlines never occur inside encoded JSON values
+    with open(path, "rb") as f:
+        payload = gzip.decompress(f.read())
+    return json.loads(b"[" + payload.rstrip(b"\n").replace(b"\n", b",") + b"]")
+
+
+def load_columnar(v2_dir: Path) -> list[dict]:
+    """Load the flat per-bug artifact (Parquet if present, else gzip JSONL)."""
+    parquet_path = v2_dir / PARQUET_NAME
+    if pq is not None and parquet_path.exists():
+        return pq.read_table(parquet_path).to_pylist()
+    return load_columnar_jsonl(v2_dir / JSONL_NAME)
+
+
+def benchmark_loads(v2_dir: Path, repeats: int = 20) -> list[tuple[str, int, float]]:
+    """Time loading the full golden set from each exported format.
+
+    Returns (format, total bytes on disk, best-of-N milliseconds) per format.
+    """
+    def load_json_dir(subdir: str):
+        return [json.loads((v2_dir / subdir / f"{repo}.json").read_bytes()) for repo in REPOS]
+    
+    candidates = [
+        ("source golden_comments_v2.json", [INPUT_PATH], lambda: json.loads(INPUT_PATH.read_bytes())),
+        ("code_review_benchmarks/*.json", [v2_dir / "code_review_benchmarks" / f"{r}.json" for r in REPOS],
+         lambda: load_json_dir("code_review_benchmarks")),
+        ("detailed/*.json", [v2_dir / "detailed" / f"{r}.json" for r in REPOS],
+         lambda: load_json_dir("detailed")),
+        (JSONL_NAME, [v2_dir / JSONL_NAME], lambda: load_columnar_jsonl(v2_dir / JSONL_NAME)),
+    ]
+    if pq is not None:
+        candidates.append((PARQUET_NAME, [v2_dir / PARQUET_NAME], lambda: pq.read_table(v2_dir / PARQUET_NAME)))
+    
+    results = []
+    for name, paths, loader in candidates:
+        if not all(p.exists() for p in paths):
+            continue
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            loader()
+            best = min(best, time.perf_counter() - start)
+        results.append((name, sum(p.stat().st_size for p in paths), best * 1000))
+    return results
+
+
+def v1_source_note(alignment: dict) -> list[str]:
+    """Changelog lines naming the files the v1 counts were read from."""
+    # One entry per path pattern rather than per repo
+    sources = sorted({path.replace(repo, "<repo>") for repo, path in alignment["v1_sources"].items()})
+    lines = ["v1 comments were read from " + ", ".join(f"`{s}`" for s in sources) + "."]
+    if alignment["v1_fallback"]:
+        lines += [
+            "The original v1 files were not available, so these are the copies taken",
+            "with the evaluation run; their count can differ from the original v1",
+            "release quoted in README.md.",
+        ]
+    return lines
+
+
+def generate_changelog(v2_data: dict, alignment: dict) -> str:
+    """Generate changelog comparing v1 and v2 from the v1->v2 alignment."""
+    by_repo = alignment["by_repo"]
+    v1_total = sum(r["v1_comments"] for r in by_repo.values())
+    v2_total = v2_data["stats"]["total_bugs"]
+    kept = sum(r["kept"] for r in by_repo.values())
+    false_positives = sum(r["false_positive"] for r in by_repo.values())
+    rejected = sum(r["rejected"] for r in by_repo.values())
+    removed = sum(r["removed"] for r in by_repo.values())
+    added = len(alignment["v2_added"])
+    
     lines = [
         "# Changelog: v1 to v2",
         "",
@@ -97,45 +280,59 @@ def generate_changelog(v2_data: dict) -> str:
         "",
         "## Summary",
         "",
-    ]
-    
-    # Load v1 stats
-    v1_total = 0
-    v1_by_repo = {}
-    for repo in REPOS:
-        v1_data = load_v1_repo(repo)
-        count = sum(len(pr.get("comments", [])) for pr in v1_data)
-        v1_by_repo[repo] = count
-        v1_total += count
-    
-    v2_total = v2_data["stats"]["total_bugs"]
-    
-    lines.extend([
-        f"| Metric | v1 (Original) | v2 (Validated) |",
+        f"| Metric | v1 ({'Run Copy' if alignment['v1_fallback'] else 'Original'}) | v2 (Validated) |",
         f"|--------|---------------|----------------|",
         f"| Total Comments/Bugs | {v1_total} | {v2_total} |",
-        f"| False Positives Removed | - | ~{v1_total - v2_total + 19} |",
-        f"| Bugs Rejected During Revalidation | - | 19 |",
+        f"| Carried Over to a v2 Bug | - | {kept} |",
+        f"| False Positives Removed | - | {false_positives} |",
+        f"| Bugs Rejected During Revalidation | - | {rejected} |",
+        f"| Removed Without a v2 Match | - | {removed} |",
+        f"| Bugs Added (no v1 comment) | - | {added} |",
         f"| Has File/Line Info | No | Yes |",
         f"| Has Bug Type | No | Yes |",
         f"| Manually Validated | No | Yes |",
         "",
+        "Counts come from aligning every v1 comment to the v2 bug it became",
+        "(see `scripts/golden_alignment.py`).",
+        "",
+        *v1_source_note(alignment),
+        "",
         "## Changes by Repository",
         "",
-    ])
+    ]
+    
+    records_by_repo = {}
+    for record in alignment["alignments"]:
+        records_by_repo.setdefault(record["repo"], []).append(record)
     
     for repo in REPOS:
-        v1_count = v1_by_repo[repo]
-        v2_count = v2_data["repos"][repo]["bug_count"]
-        diff = v2_count - v1_count
+        counts = by_repo[repo]
+        diff = counts["v2_bugs"] - counts["v1_comments"]
         sign = "+" if diff > 0 else ""
         
         lines.extend([
             f"### {repo}",
-            f"- v1: {v1_count} comments",
-            f"- v2: {v2_count} bugs ({sign}{diff})",
+            f"- v1: {counts['v1_comments']} comments",
+            f"- v2: {counts['v2_bugs']} bugs ({sign}{diff})",
+            f"- Kept: {counts['kept']}, false positives: {counts['false_positive']}, "
+            f"rejected: {counts['rejected']}, unmatched: {counts['removed']}, added: {counts['v2_added']}",
             "",
+            "| PR | v1 Comment | v2 |",
+            "|----|------------|----|",
         ])
+        for record in records_by_repo.get(repo, []):
+            comment = record["v1_comment"].replace("|", "\\|").replace("\n", " ")
+            if len(comment) > 80:
+                comment = comment[:77] + "..."
+            if record["status"] == "kept":
+                outcome = f"bug `{record['v2_bug_id']}`"
+            else:
+                outcome = record["status"].replace("_", " ")
+            if record["v2_pr_number"] is not None and record["v2_pr_number"] != record["pr_number"]:
+                outcome += f" (PR {record['v2_pr_number']})"
+            pr_number = record["pr_number"] if record["pr_number"] is not None else "?"
+            lines.append(f"| {pr_number} | {comment} | {outcome} |")
+        lines.append("")
     
     lines.extend([
         "## Validation Process",
@@ -170,36 +367,41 @@ def generate_changelog(v2_data: dict) -> str:
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Create v2 golden comments formats.")
+    parser.add_argument("--benchmark", action="store_true", help="Compare load times of the exported formats")
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args()
+    
     print("Creating v2 golden comments formats...")
+    if pa is None:
+        print("  pyarrow not installed; writing gzip JSONL instead of Parquet")
     
     v2_data = load_golden_v2()
     
-    # Generate per-repo files
-    for repo in REPOS:
-        print(f"\nProcessing {repo}...")
-        repo_data = v2_data["repos"][repo]
-        
-        # Compatible format
-        compatible = create_compatible_format(repo_data)
-        compatible_path = OUTPUT_DIR / "v2" / "code_review_benchmarks" / f"{repo}.json"
-        with open(compatible_path, "w") as f:
-            json.dump(compatible, f, indent=2)
-        print(f"  Created {compatible_path}")
-        
-        # Detailed format
-        detailed = create_detailed_format(repo_data)
-        detailed_path = OUTPUT_DIR / "v2" / "detailed" / f"{repo}.json"
-        with open(detailed_path, "w") as f:
-            json.dump(detailed, f, indent=2)
-        print(f"  Created {detailed_path}")
-    
-    # Generate changelog
-    print("\nGenerating CHANGELOG.md...")
-    changelog = generate_changelog(v2_data)
-    changelog_path = OUTPUT_DIR / "CHANGELOG.md"
-    with open(changelog_path, "w") as f:
-        f.write(changelog)
-    print(f"  Created {changelog_path}")
+    # Generate changelog from the v1->v2 alignment
+    alignment = build_alignment(v2_data, V1_DIR, REPOS)
+    files = build_exports(v2_data, generate_changelog(v2_data, alignment))
+    
+    written = 0
+    for rel_path, data in files.items():
+        path = args.output_dir / rel_path
+        if write_if_changed(path, data):
+            written += 1
+            print(f"  Wrote {path}")
+    print(f"\n{written} written, {len(files) - written} unchanged")
+    
+    # Only one columnar format is exported; drop the other one left by a
+    # run with (or without) pyarrow so readers never pick up stale rows
+    stale = args.output_dir / "v2" / (JSONL_NAME if pa is not None else PARQUET_NAME)
+    if stale.exists():
+        stale.unlink()
+        print(f"  Removed stale {stale}")
+    
+    if args.benchmark:
+        print("\nLoad-time benchmark (best of 20):")
+        print(f"  {'Format':<34} {'Bytes':>9} {'ms':>8}")
+        for name, size, ms in benchmark_loads(args.output_dir / "v2"):
+            print(f"  {name:<34} {size:>9} {ms:>8.3f}")
     
     print("\nDone!")
 
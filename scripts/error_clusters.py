@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Cluster false positives and missed bugs across every evaluation run.
+
+Every false positive (droid comment) and false negative (golden comment)
+in ``results/<run>/*_eval*.json`` becomes one item. Identical texts across
+runs are vectorized once:
+
+  - TF-IDF over minhash.tokenize tokens (sublinear tf, smoothed idf)
+  - one-hot bug_type, file extension and severity blocks, each weighted
+    by CATEGORICAL_WEIGHT
+    - FP bug_type/severity come from droid_validations (by comment_id),
+      else from the [P0]-[P3] tag
+    - FN bug_type/file come from the golden v2 bug each comment aligns to
+
+False positives and false negatives are clustered separately, by spherical
+k-means (default) or average-linkage agglomerative clustering on cosine
+similarity. Each cluster gets:
+  - a label from its centroid's top terms
+  - its dominant bug types, extensions and severities
+  - the examples closest to the centroid
+  - a count per run
+
+This is the machine-made counterpart of docs/analysis/FALSE_POSITIVES.md
+and MISSED_ISSUES.md. Needs NumPy.
+
+Usage: python3 scripts/error_clusters.py [--kind fp|fn|both] [--method kmeans|agglomerative] [--k N] [--out PATH]
+       python3 scripts/error_clusters.py --synthetic RUNS [--per-run 40]
+Example: python3 scripts/error_clusters.py --kind fp --k 8
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from eval_format import load_eval
+from minhash import tokenize
+from paths import BASE_DIR, RESULTS_DIR
+from report_site import discover_reports
+
+VALIDATION_ROOT = RESULTS_DIR / "ground_truth_validation"
+GOLDEN_V2_PATH = RESULTS_DIR / "golden_comments_v2.json"
+OUTPUT_PATH = RESULTS_DIR / "error_clusters.json"
+
+KINDS = {"fp": "false_positive", "fn": "false_negative"}
+MAX_FEATURES = 3000
+# Share of the vector given to each categorical block (text block has norm 1)
+CATEGORICAL_WEIGHT = 0.35
+# Average linkage keeps an n x n similarity matrix; past this use k-means
+MAX_AGGLOMERATIVE = 6000
+TOP_TERMS = 6
+EXAMPLES = 3
+# Review boilerplate that says nothing about the error, plus minhash.tokenize's
+# plural folding of stopwords ("this" -> "thi")
+EXTRA_STOPWORDS = frozenset("""
+thi doe use used using consider code line value function method call check issue
+ensure make could should instead here now current currently p0 p1 p2 p3
+""".split())
+PRIORITY_RE = re.compile(r"\[P([0-3])\]")
+PRIORITY_SEVERITY = {"0": "critical", "1": "high", "2": "medium", "3": "low"}
+
+
+@dataclass
+class Item:
+    """One false positive or false negative in one report."""
+    kind: str
+    report: str
+    repo: str
+    pr_number: int | None
+    text: str
+    severity: str = "unknown"
+    bug_type: str = "unknown"
+    file: str | None = None
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.file)[1].lower() or "none" if self.file else "none"
+
+
+# ---------------------------------------------------------------------------
+# Items
+# ---------------------------------------------------------------------------
+
+def _load_json(path: Path) -> Any:
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_validation_labels() -> dict[int, tuple[str, str]]:
+    """comment_id -> (severity, bug_type) from every droid_validations file."""
+    labels = {}
+    for path in VALIDATION_ROOT.glob("*/*/pr_*_droid_validations.json"):
+        for entry in _load_json(path):
+            v = entry.get("validation", {})
+            labels[entry.get("comment_id")] = (v.get("severity") or "unknown", v.get("bug_type") or "unknown")
+    return labels
+
+
+def load_golden_labels() -> dict[tuple[str, str], tuple[str, str | None]]:
+    """(repo, v1 comment) -> (bug_type, file) of the golden v2 bug it aligns to."""
+    # Imported here: alignment needs the v1 files, which not every checkout has
+    from golden_alignment import build_alignment
+
+    try:
+        v2 = _load_json(GOLDEN_V2_PATH)
+        alignment = build_alignment(v2)
+    except (OSError, KeyError, ValueError):
+        return {}
+    bugs = {(repo, pr["pr_number"], bug.get("id")): bug
+            for repo, data in v2["repos"].items() for pr in data["prs"] for bug in pr["bugs"]}
+    labels = {}
+    for record in alignment["alignments"]:
+        bug = bugs.get((record["repo"], record["v2_pr_number"], record["v2_bug_id"]))
+        if bug:
+            labels[(record["repo"], record["v1_comment"])] = (bug.get("bug_type") or "unknown", bug.get("file"))
+    return labels
+
+
+def load_items(results_dir: Path = RESULTS_DIR, kinds: tuple[str, ...] = tuple(KINDS.values())) -> list[Item]:
+    validation = load_validation_labels() if "false_positive" in kinds else {}
+    golden = load_golden_labels() if "false_negative" in kinds else {}
+    items = []
+    for report, path in discover_reports(results_dir).items():
+        repo = path.stem.split("_eval")[0]
+        for pr in load_eval(path).get("prs", []):
+            if "false_positive" in kinds:
+                for e in pr.get("false_positives", []):
+                    text = e.get("droid_comment") or ""
+                    severity, bug_type = validation.get(e.get("comment_id"), (None, "unknown"))
+                    if severity is None:
+                        priority = PRIORITY_RE.search(text)
+                        severity = PRIORITY_SEVERITY[priority.group(1)] if priority else "unknown"
+                    items.append(Item("false_positive", report, repo, pr.get("pr_number"), text,
+                                      severity.lower(), bug_type.lower(), e.get("file")))
+            if "false_negative" in kinds:
+                for fn in pr.get("false_negatives", []):
+                    text = fn.get("golden_comment") or ""
+                    bug_type, file = golden.get((repo, text), ("unknown", None))
+                    items.append(Item("false_negative", report, repo, pr.get("pr_number"), text,
+                                      (fn.get("severity") or "unknown").lower(), bug_type.lower(), file))
+    return items
+
+
+# ---------------------------------------------------------------------------
+# Vectors
+# ---------------------------------------------------------------------------
+
+def _one_hot(values: list[str]) -> tuple["np.ndarray", list[str]]:
+    names = sorted(set(values))
+    index = {v: i for i, v in enumerate(names)}
+    block = np.zeros((len(values), len(names)), dtype=np.float32)
+    block[np.arange(len(values)), [index[v] for v in values]] = CATEGORICAL_WEIGHT
+    return block, names
+
+
+def vectorize(items: list[Item], max_features: int = MAX_FEATURES) -> tuple["np.ndarray", list[str]]:
+    """Unit-length rows: TF-IDF text block + weighted categorical blocks. Returns (X, vocabulary)."""
+    docs = [[t for t in tokenize(item.text) if t not in EXTRA_STOPWORDS] for item in items]
+    df = Counter(term for tokens in docs for term in set(tokens))
+    # Terms in a single document cannot group anything; keep them only for tiny inputs
+    min_df = 2 if len(docs) >= 20 else 1
+    vocab = [t for t, n in sorted(df.items(), key=lambda x: (-x[1], x[0])) if n >= min_df][:max_features]
+    column = {t: i for i, t in enumerate(vocab)}
+
+    rows, cols = [], []
+    for i, tokens in enumerate(docs):
+        for term in tokens:
+            j = column.get(term)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+    tf = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+    np.add.at(tf, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)), 1.0)
+    nonzero = tf > 0
+    tf[nonzero] = 1.0 + np.log(tf[nonzero])
+    idf = np.log((1.0 + len(docs)) / (1.0 + np.array([df[t] for t in vocab], dtype=np.float32))) + 1.0
+    text = tf * idf
+    text /= np.maximum(np.linalg.norm(text, axis=1, keepdims=True), 1e-12)
+
+    blocks = [text]
+    for values in ([i.bug_type for i in items], [i.extension for i in items], [i.severity for i in items]):
+        blocks.append(_one_hot(values)[0])
+    X = np.hstack(blocks)
+    X /= np.maximum(np.linalg.norm(X, axis=1, keepdims=True), 1e-12)
+    return X, vocab
+
+
+# ---------------------------------------------------------------------------
+# Clustering
+# ---------------------------------------------------------------------------
+
+def default_k(n: int) -> int:
+    return max(2, min(40, round(math.sqrt(n / 2))))
+
+
+def _normalize_rows(C: "np.ndarray") -> "np.ndarray":
+    return C / np.maximum(np.linalg.norm(C, axis=1, keepdims=True), 1e-12)
+
+
+def kmeans(X: "np.ndarray", k: int, seed: int = 0, n_init: int = 4, max_iter: int = 100,
+           weights: "np.ndarray | None" = None) -> "np.ndarray":
+    """Spherical k-means (cosine) with k-means++ seeding; best of ``n_init`` runs. Returns labels."""
+    n = X.shape[0]
+    k = min(k, n)
+    weights = np.ones(n, dtype=np.float32) if weights is None else weights.astype(np.float32)
+    rng = np.random.default_rng(seed)
+    best_labels, best_score = None, -np.inf
+    for _ in range(n_init):
+        centers = [rng.choice(n, p=weights / weights.sum())]
+        closest = X @ X[centers[0]]
+        for _ in range(1, k):
+            dist = np.maximum(1.0 - closest, 0.0) ** 2 * weights
+            total = dist.sum()
+            nxt = rng.choice(n, p=dist / total) if total > 0 else rng.integers(n)
+            centers.append(nxt)
+            closest = np.maximum(closest, X @ X[nxt])
+        C = X[centers].copy()
+        labels = np.full(n, -1)
+        for _ in range(max_iter):
+            sims = X @ C.T
+            new_labels = sims.argmax(axis=1)
+            if np.array_equal(new_labels, labels):
+                break
+            labels = new_labels
+            one_hot = np.zeros((n, k), dtype=np.float32)
+            one_hot[np.arange(n), labels] = weights
+            C = one_hot.T @ X
+            empty = np.flatnonzero(one_hot.sum(axis=0) == 0)
+            if len(empty):
+                # Re-seed empty clusters with the worst-fitting points
+                worst = np.argsort(sims[np.arange(n), labels])[:len(empty)]
+                C[empty] = X[worst]
+            C = _normalize_rows(C)
+        score = float((weights * (X @ C.T)[np.arange(n), labels]).sum())
+        if score > best_score:
+            best_labels, best_score = labels, score
+    return best_labels
+
+
+def agglomerative(X: "np.ndarray", k: int, weights: "np.ndarray | None" = None) -> "np.ndarray":
+    """Average-linkage clustering on cosine similarity down to ``k`` clusters. Returns labels."""
+    n = X.shape[0]
+    if n > MAX_AGGLOMERATIVE:
+        raise ValueError(f"{n} unique items is too many for agglomerative clustering (max {MAX_AGGLOMERATIVE}); use kmeans")
+    sizes = np.ones(n) if weights is None else weights.astype(np.float64)
+    S = (X @ X.T).astype(np.float64)
+    np.fill_diagonal(S, -np.inf)
+    best = S.argmax(axis=1)
+    best_sim = S[np.arange(n), best]
+    parent = np.arange(n)
+    for _ in range(n - min(k, n)):
+        i = int(best_sim.argmax())
+        j = int(best[i])
+        # Lance-Williams update for average linkage: merge j into i
+        merged = (sizes[i] * S[i] + sizes[j] * S[j]) / (sizes[i] + sizes[j])
+        S[i], S[:, i] = merged, merged
+        S[i, i] = -np.inf
+        S[j], S[:, j] = -np.inf, -np.inf
+        sizes[i] += sizes[j]
+        parent[parent == j] = i
+        best_sim[j] = -np.inf
+        # Rows whose nearest cluster was i or j need a rescan; others can only improve via i
+        stale = np.flatnonzero((best == i) | (best == j))
+        stale = stale[np.isfinite(best_sim[stale])] if len(stale) else stale
+        stale = np.union1d(stale, [i])
+        best[stale] = S[stale].argmax(axis=1)
+        best_sim[stale] = S[stale, best[stale]]
+        better = S[:, i] > best_sim
+        best[better], best_sim[better] = i, S[better, i]
+    _, labels = np.unique(parent, return_inverse=True)
+    return labels
+
+
+# ---------------------------------------------------------------------------
+# Summaries
+# ---------------------------------------------------------------------------
+
+def _shares(counter: Counter, total: int, top: int = 3) -> list[dict]:
+    return [{"value": v, "share": round(c / total, 2)} for v, c in counter.most_common(top)]
+
+
+def summarize(items: list[Item], unique: list[Item], members: list[list[int]], X: "np.ndarray",
+              labels: "np.ndarray", vocab: list[str]) -> list[dict]:
+    """One summary per cluster, largest first. ``members[u]`` indexes ``items`` for unique item u."""
+    clusters = []
+    for c in np.unique(labels):
+        idx = np.flatnonzero(labels == c)
+        occurrences = [items[m] for u in idx for m in members[u]]
+        weights = np.array([len(members[u]) for u in idx], dtype=np.float32)
+        centroid = _normalize_rows((weights[:, None] * X[idx]).sum(axis=0, keepdims=True))[0]
+        sims = X[idx] @ centroid
+        text_weights = centroid[:len(vocab)]
+        top = [vocab[t] for t in np.argsort(-text_weights)[:TOP_TERMS] if text_weights[t] > 0]
+        bug_types = Counter(i.bug_type for i in occurrences)
+        # Droid validations tag rejected comments "false_positive"; that says nothing about an FP cluster
+        dominant = [v for v, _ in bug_types.most_common() if v not in ("unknown", occurrences[0].kind)][:1]
+        examples = []
+        for u in idx[np.argsort(-sims)[:EXAMPLES]]:
+            item = unique[u]
+            examples.append({"repo": item.repo, "pr_number": item.pr_number, "file": item.file,
+                             "text": " ".join(item.text.split())[:300], "occurrences": len(members[u])})
+        clusters.append({
+            "label": " / ".join(top[:3]) + (f" ({dominant[0]})" if dominant else ""),
+            "size": len(occurrences),
+            "unique": len(idx),
+            "cohesion": round(float(sims.mean()), 3),
+            "top_terms": top,
+            "bug_types": _shares(bug_types, len(occurrences)),
+            "extensions": _shares(Counter(i.extension for i in occurrences), len(occurrences)),
+            "severities": _shares(Counter(i.severity for i in occurrences), len(occurrences)),
+            "examples": examples,
+            "by_report": dict(sorted(Counter(i.report for i in occurrences).items())),
+        })
+    clusters.sort(key=lambda c: (-c["size"], c["label"]))
+    for n, cluster in enumerate(clusters, 1):
+        cluster["id"] = n
+    return [{"id": c.pop("id"), **c} for c in clusters]
+
+
+def cluster_kind(items: list[Item], method: str, k: int | None, seed: int,
+                 max_features: int = MAX_FEATURES) -> dict[str, Any]:
+    """Vectorize and cluster one kind of item; dedupes identical (repo, text) first."""
+    timings = {}
+    start = time.perf_counter()
+    index: dict[tuple[str, str], int] = {}
+    unique: list[Item] = []
+    members: list[list[int]] = []
+    for i, item in enumerate(items):
+        key = (item.repo, " ".join(item.text.split()))
+        if key not in index:
+            index[key] = len(unique)
+            unique.append(item)
+            members.append([])
+        members[index[key]].append(i)
+    X, vocab = vectorize(unique, max_features)
+    timings["vectorize_s"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    k = min(k or default_k(len(unique)), len(unique))
+    weights = np.array([len(m) for m in members], dtype=np.float32)
+    labels = (agglomerative(X, k, weights) if method == "agglomerative" else kmeans(X, k, seed, weights=weights))
+    timings["cluster_s"] = round(time.perf_counter() - start, 3)
+
+    start = time.perf_counter()
+    clusters = summarize(items, unique, members, X, labels, vocab)
+    timings["summarize_s"] = round(time.perf_counter() - start, 3)
+    return {"items": len(items), "unique": len(unique), "features": X.shape[1], "k": k,
+            "clusters": clusters, "timings": timings}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic benchmark
+# ---------------------------------------------------------------------------
+
+def synthetic_items(n_reports: int, per_report: int, seed: int = 0) -> list[Item]:
+    """Items drawn from the validation tree's droid and golden comments, lightly perturbed per report."""
+    rng = random.Random(seed)
+    pool = {"false_positive": [], "false_negative": []}
+    for path in VALIDATION_ROOT.glob("*/*/pr_*_droid_validations.json"):
+        for e in _load_json(path):
+            v = e.get("validation", {})
+            pool["false_positive"].append(Item("false_positive", "", path.parent.name, None, e.get("droid_comment", ""),
+                                               v.get("severity") or "unknown", v.get("bug_type") or "unknown", e.get("file")))
+    for path in VALIDATION_ROOT.glob("*/*/pr_*_golden_audits.json"):
+        for e in _load_json(path):
+            pool["false_negative"].append(Item("false_negative", "", path.parent.name, None, e.get("golden_comment", ""),
+                                               (e.get("severity") or "unknown").lower()))
+    items = []
+    for r in range(n_reports):
+        report = f"synthetic_run_{r:04d}/sentry_eval"
+        for kind, candidates in pool.items():
+            for base in rng.sample(candidates, min(per_report // 2, len(candidates))):
+                words = base.text.split()
+                if kind == "false_positive":
+                    # Droid rewrites its comments every run; golden comments repeat verbatim
+                    words = [w for w in words if rng.random() > 0.15]
+                items.append(Item(kind, report, base.repo, rng.randint(1, 10), " ".join(words),
+                                  base.severity, base.bug_type, base.file))
+    return items
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_summary(kind: str, result: dict[str, Any], max_reports: int = 8) -> None:
+    print(f"\n{kind.replace('_', ' ').title()}s: {result['items']} items ({result['unique']} unique), "
+          f"{len(result['clusters'])} clusters, {result['features']} features")
+    reports = sorted({r for c in result["clusters"] for r in c["by_report"]})
+    shown = reports[-max_reports:]
+    header = "".join(f"{f'R{n}':>6}" for n in range(1, len(shown) + 1))
+    print(f"  {'#':>3} {'size':>5} {'coh':>5}  {'label':<48}{header}")
+    for c in result["clusters"]:
+        counts = "".join(f"{c['by_report'].get(r, 0):>6}" for r in shown)
+        print(f"  {c['id']:>3} {c['size']:>5} {c['cohesion']:>5}  {c['label'][:47]:<48}{counts}")
+    print("  " + ", ".join(f"R{n}={r}" for n, r in enumerate(shown, 1)))
+    if len(reports) > len(shown):
+        print(f"  (per-run counts for the latest {len(shown)} of {len(reports)} reports; all in the JSON output)")
+    t = result["timings"]
+    print(f"  vectorize {t['vectorize_s']}s, cluster {t['cluster_s']}s, summarize {t['summarize_s']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster false positives and false negatives across eval runs.")
+    parser.add_argument("--kind", choices=["fp", "fn", "both"], default="both")
+    parser.add_argument("--method", choices=["kmeans", "agglomerative"], default="kmeans")
+    parser.add_argument("--k", type=int, help="Clusters per kind (default: sqrt(unique items / 2))")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-features", type=int, default=MAX_FEATURES, help="TF-IDF vocabulary size")
+    parser.add_argument("--out", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--synthetic", type=int, metavar="RUNS", help="Benchmark on RUNS synthetic reports instead")
+    parser.add_argument("--per-run", type=int, default=40, help="Items per synthetic report")
+    args = parser.parse_args()
+
+    if np is None:
+        raise SystemExit("error_clusters.py needs NumPy: pip install numpy")
+
+    kinds = tuple(KINDS.values()) if args.kind == "both" else (KINDS[args.kind],)
+    start = time.perf_counter()
+    if args.synthetic:
+        items = [i for i in synthetic_items(args.synthetic, args.per_run, args.seed) if i.kind in kinds]
+    else:
+        items = load_items(kinds=kinds)
+    load_s = round(time.perf_counter() - start, 3)
+    reports = sorted({i.report for i in items})
+    print(f"Loaded {len(items)} items from {len(reports)} reports in {load_s}s")
+    if not items:
+        print("Nothing to cluster (no *_eval*.json with false positives or negatives under results/)")
+        return
+
+    output = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "method": args.method,
+        "reports": reports,
+        "load_s": load_s,
+    }
+    for kind in kinds:
+        kind_items = [i for i in items if i.kind == kind]
+        if len({(i.repo, i.text) for i in kind_items}) < 2:
+            continue
+        output[kind] = cluster_kind(kind_items, args.method, args.k, args.seed, args.max_features)
+        print_summary(kind, output[kind])
+    print(f"\nTotal {time.perf_counter() - start:.2f}s")
+
+    if args.synthetic:
+        return
+    with open(args.out, "w") as f:
+        json.dump(output, f, indent=2)
+    try:
+        shown = args.out.resolve().relative_to(BASE_DIR)
+    except ValueError:
+        shown = args.out
+    print(f"Saved to: {shown}")
+
+
+if __name__ == "__main__":
+    main()
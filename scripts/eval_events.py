@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Live event stream for evaluation runs.
+
+Every judgment is appended to a JSONL file as it lands, with running
+TP/FP/FN, precision, recall, F-score, throughput and ETA, so a regressed run
+can be spotted (and aborted) long before the last PR. With ``live`` a
+one-line status view is redrawn on stderr.
+
+Running FN counts golden comments of every PR started so far that have not
+been matched yet, so it is provisional for the PR in flight and final once
+``pr_complete`` is emitted.
+
+Comments that end up unjudged (budget stop, failed judge call or batch
+request) emit ``skipped`` instead of ``judgment``, so judged + skipped
+reaches the total and the ETA reaches zero.
+
+Event types: run_start, pr_start, judgment, skipped, pr_complete, run_end,
+run_aborted.
+
+Usage: python3 scripts/eval_events.py <events.jsonl> [--follow]
+Example: python3 scripts/eval_events.py results/run_2026-01-14-v3/eval_events.jsonl --follow
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, TextIO
+
+
+def prf(tp: int, fp: int, fn: int) -> tuple[float, float, float]:
+    """Precision, recall and F-score as percentages, rounded like the eval JSON."""
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f_score = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return round(precision * 100, 1), round(recall * 100, 1), round(f_score * 100, 1)
+
+
+def format_status(event: dict) -> str:
+    eta = event.get("eta_s")
+    eta_text = f"{eta // 60:.0f}m{eta % 60:02.0f}s" if eta is not None else "--"
+    done = event["judged"] + event.get("skipped", 0)
+    skipped = f" skipped={event['skipped']}" if event.get("skipped") else ""
+    return (f"[{done}/{event['total']}]{skipped} PR #{event.get('pr_number', '-')} "
+            f"TP={event['tp']} FP={event['fp']} FN={event['fn']} "
+            f"P={event['precision']}% R={event['recall']}% F={event['f_score']}% "
+            f"{event['rate_per_min']:.1f}/min ETA {eta_text}")
+
+
+class EventStream:
+    """Appends evaluation events to a JSONL file and keeps running metrics."""
+
+    def __init__(self, path: str | Path, total_judgments: int, live: bool = False,
+                 terminal: TextIO | None = None, **run_info):
+        self.path = Path(path)
+        self.total = total_judgments
+        self.live = live
+        self.terminal = terminal or sys.stderr
+        self.tp = self.fp = self.fn = self.duplicates = self.judged = self.skipped = 0
+        self._started = time.monotonic()
+        self._file = open(self.path, "w", buffering=1)
+        self.emit("run_start", total=total_judgments, **run_info)
+
+    def _running(self) -> dict[str, Any]:
+        elapsed = time.monotonic() - self._started
+        rate = self.judged / elapsed if elapsed > 0 else 0.0
+        # Skipped comments take no time, so they shorten the ETA but not the rate
+        remaining = self.total - self.judged - self.skipped
+        precision, recall, f_score = prf(self.tp, self.fp, self.fn)
+        return {
+            "judged": self.judged,
+            "skipped": self.skipped,
+            "total": self.total,
+            "tp": self.tp,
+            "fp": self.fp,
+            "fn": self.fn,
+            "duplicates": self.duplicates,
+            "precision": precision,
+            "recall": recall,
+            "f_score": f_score,
+            "elapsed_s": round(elapsed, 1),
+            "rate_per_min": round(rate * 60, 2),
+            "eta_s": round(remaining / rate, 1) if rate > 0 else None,
+        }
+
+    def emit(self, event_type: str, **fields) -> dict:
+        event = {"event": event_type, "ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds")}
+        event.update(fields)
+        event.update(self._running())
+        self._file.write(json.dumps(event) + "\n")
+        if self.live and event_type in ("judgment", "skipped", "pr_complete"):
+            self.terminal.write("\r\033[K" + format_status(event))
+            self.terminal.flush()
+        return event
+
+    def pr_start(self, pr_number: int, golden_count: int, droid_count: int) -> None:
+        # Every golden comment counts as missed until a judgment matches it
+        self.fn += golden_count
+        self.emit("pr_start", pr_number=pr_number, golden_count=golden_count, droid_count=droid_count)
+
+    def judgment(self, pr_number: int, evaluation: dict, classification: str) -> None:
+        """Record one classified droid comment ("tp", "fp", "duplicate" or "unmatched")."""
+        self.judged += 1
+        if classification == "tp":
+            self.tp += 1
+            self.fn -= 1
+        elif classification == "fp":
+            self.fp += 1
+        elif classification == "duplicate":
+            self.duplicates += 1
+        self.emit(
+            "judgment",
+            pr_number=pr_number,
+            classification=classification,
+            file=evaluation.get("file"),
+            line=evaluation.get("line"),
+            matches=evaluation.get("matches"),
+            confidence=evaluation.get("confidence"),
+            judge_model=evaluation.get("judge_model"),
+            clustered=("clustered_with" in evaluation),
+        )
+
+    def skip(self, pr_number: int, comment: dict, reason: str) -> None:
+        """Record a droid comment that will not be judged in this run."""
+        self.skipped += 1
+        self.emit("skipped", pr_number=pr_number, file=comment.get("file"), line=comment.get("line"), reason=reason)
+
+    def pr_complete(self, pr_number: int, metrics: dict) -> None:
+        self.emit("pr_complete", pr_number=pr_number, pr_metrics=metrics)
+
+    def close(self, aborted: bool = False) -> None:
+        if self._file.closed:
+            return
+        self.emit("run_aborted" if aborted else "run_end")
+        if self.live:
+            self.terminal.write("\n")
+        self._file.close()
+
+
+def follow(path: Path, poll: float = 0.5) -> None:
+    """Print a status line for each event, tailing the file until run_end.
+
+    Waits for the file if the run has not created it yet, and only parses
+    lines once their trailing newline has been written.
+    """
+    while not path.exists():
+        time.sleep(poll)
+    with open(path) as f:
+        pending = ""
+        while True:
+            pending += f.readline()
+            if not pending.endswith("\n"):
+                if path.stat().st_size < f.tell():
+                    # The run restarted and truncated the file
+                    f.seek(0)
+                    pending = ""
+                time.sleep(poll)
+                continue
+            line, pending = pending, ""
+            event = json.loads(line)
+            if event["event"] in ("judgment", "skipped", "pr_complete"):
+                print(format_status(event), flush=True)
+            elif event["event"] in ("run_end", "run_aborted"):
+                print(f"{event['event']}: " + format_status(event))
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the running status of an evaluation event stream.")
+    parser.add_argument("events", type=Path, help="eval_events.jsonl written by an evaluation run")
+    parser.add_argument("--follow", action="store_true", help="Keep tailing until the run ends")
+    args = parser.parse_args()
+
+    if args.follow:
+        follow(args.events)
+        return
+    last = None
+    with open(args.events) as f:
+        for line in f:
+            last = json.loads(line)
+    if last is None:
+        print("No events yet")
+    else:
+        print(f"{last['event']} at {last['ts']}: " + format_status(last))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Normalized storage format for evaluation outputs (sentry_eval*.json).
+
+The legacy shape repeats every judgment: each evaluation appears in
+``evaluations`` and again in ``true_positives`` / ``false_positives`` /
+``duplicates``, and near-duplicate cluster members carry a full copy of
+their representative's verdict. The normalized shape stores:
+
+  strings   every droid comment body, golden comment and reasoning once
+  verdicts  each distinct verdict once (shared by a cluster)
+  prs[].evaluations  per-comment fields plus a ``verdict`` id
+  prs[].true_positives / false_positives / duplicates  indexes into the PR's evaluations
+
+String fields (``droid_comment``, ``reasoning``, ``matched_golden_comment``,
+``golden_comment``) hold ids into ``strings``. ``load_eval`` reads either
+shape and always returns the legacy one, so consumers never see the
+difference.
+
+Usage: python3 scripts/eval_format.py stats <eval.json>...
+       python3 scripts/eval_format.py convert <eval.json>... [--legacy]
+Example: python3 scripts/eval_format.py stats results/run_2026-01-14-v3/sentry_eval.json
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any
+
+FORMAT = "eval-normalized/1"
+INTERNED_FIELDS = ("droid_comment", "reasoning", "matched_golden_comment", "golden_comment")
+# Per-comment fields; everything else on an evaluation is the (shareable) verdict
+COMMENT_FIELDS = ("clustered_with", "comment_id", "droid_comment", "file", "line")
+CLASSIFICATION_LISTS = ("true_positives", "false_positives", "duplicates")
+
+
+class _Strings:
+    def __init__(self):
+        self.table: list[str] = []
+        self._ids: dict[str, int] = {}
+
+    def intern(self, record: dict) -> dict:
+        out = dict(record)
+        for field in INTERNED_FIELDS:
+            value = out.get(field)
+            if isinstance(value, str):
+                if value not in self._ids:
+                    self._ids[value] = len(self.table)
+                    self.table.append(value)
+                out[field] = self._ids[value]
+        return out
+
+
+def _key(record: dict) -> str:
+    return json.dumps(record, sort_keys=True)
+
+
+def is_normalized(data: dict) -> bool:
+    return data.get("format") == FORMAT
+
+
+def normalize(data: dict) -> dict:
+    """Legacy eval output -> normalized shape (already normalized data is returned as is)."""
+    if is_normalized(data):
+        return data
+    strings = _Strings()
+    verdicts: list[dict] = []
+    verdict_ids: dict[str, int] = {}
+    prs = []
+    for pr in data.get("prs", []):
+        evaluations, positions = [], {}
+        for position, evaluation in enumerate(pr.get("evaluations", [])):
+            positions.setdefault(_key(evaluation), position)
+            verdict = strings.intern({k: v for k, v in evaluation.items() if k not in COMMENT_FIELDS})
+            verdict_key = _key(verdict)
+            if verdict_key not in verdict_ids:
+                verdict_ids[verdict_key] = len(verdicts)
+                verdicts.append(verdict)
+            comment = strings.intern({k: evaluation[k] for k in COMMENT_FIELDS if k in evaluation})
+            evaluations.append({"verdict": verdict_ids[verdict_key], **comment})
+        out = {}
+        for field, value in pr.items():
+            if field == "evaluations":
+                out[field] = evaluations
+            elif field in CLASSIFICATION_LISTS:
+                out[field] = [positions[_key(e)] for e in value]
+            elif field == "false_negatives":
+                out[field] = [strings.intern(fn) for fn in value]
+            else:
+                out[field] = value
+        prs.append(out)
+
+    normalized = {"format": FORMAT}
+    for field, value in data.items():
+        normalized[field] = prs if field == "prs" else value
+    normalized["strings"] = strings.table
+    normalized["verdicts"] = verdicts
+    return normalized
+
+
+def expand(data: dict) -> dict:
+    """Normalized shape -> legacy eval output (legacy data is returned as is)."""
+    if not is_normalized(data):
+        return data
+    strings = data["strings"]
+
+    def resolve(record: dict) -> dict:
+        return {k: strings[v] if k in INTERNED_FIELDS and isinstance(v, int) else v for k, v in record.items()}
+
+    verdicts = [resolve(v) for v in data["verdicts"]]
+    prs = []
+    for pr in data.get("prs", []):
+        evaluations = []
+        for evaluation in pr.get("evaluations", []):
+            comment = resolve({k: v for k, v in evaluation.items() if k != "verdict"})
+            evaluations.append({**verdicts[evaluation["verdict"]], **comment})
+        out = {}
+        for field, value in pr.items():
+            if field == "evaluations":
+                out[field] = evaluations
+            elif field in CLASSIFICATION_LISTS:
+                out[field] = [evaluations[i] for i in value]
+            elif field == "false_negatives":
+                out[field] = [resolve(fn) for fn in value]
+            else:
+                out[field] = value
+        prs.append(out)
+    return {k: (prs if k == "prs" else v) for k, v in data.items() if k not in ("format", "strings", "verdicts")}
+
+
+def load_eval(path: str | Path) -> dict:
+    """Read an eval output in either format; always returns the legacy shape."""
+    with open(path) as f:
+        return expand(json.load(f))
+
+
+def dump_eval(data: dict, path: str | Path, legacy: bool = False) -> None:
+    with open(path, "w") as f:
+        json.dump(expand(data) if legacy else normalize(data), f, indent=2)
+
+
+def measure(path: Path, repeat: int = 20) -> dict[str, Any]:
+    """Size and parse time of one eval file in both formats."""
+    legacy = load_eval(path)
+    legacy_text = json.dumps(legacy, indent=2)
+    normalized_text = json.dumps(normalize(legacy), indent=2)
+    assert expand(json.loads(normalized_text)) == json.loads(legacy_text), f"{path}: round trip mismatch"
+
+    def best_of(fn) -> float:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times) * 1000
+
+    legacy_ms = best_of(lambda: json.loads(legacy_text))
+    parse_ms = best_of(lambda: json.loads(normalized_text))
+    expand_ms = best_of(lambda: expand(json.loads(normalized_text)))
+    return {
+        "file": str(path),
+        "legacy_bytes": len(legacy_text.encode()),
+        "normalized_bytes": len(normalized_text.encode()),
+        "size_saved_pct": round(100 * (1 - len(normalized_text) / len(legacy_text)), 1),
+        "legacy_parse_ms": round(legacy_ms, 2),
+        "normalized_parse_ms": round(parse_ms, 2),
+        "normalized_parse_expand_ms": round(expand_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure or convert eval output formats.")
+    parser.add_argument("command", choices=["stats", "convert"])
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--legacy", action="store_true", help="convert: write the legacy shape instead")
+    args = parser.parse_args()
+
+    for path in args.paths:
+        if args.command == "convert":
+            dump_eval(load_eval(path), path, legacy=args.legacy)
+            print(f"{path}: written in {'legacy' if args.legacy else 'normalized'} format")
+            continue
+        s = measure(path)
+        print(f"{s['file']}")
+        print(f"  size:  {s['legacy_bytes']:,} -> {s['normalized_bytes']:,} bytes ({s['size_saved_pct']}% smaller)")
+        print(f"  parse: {s['legacy_parse_ms']} ms legacy, {s['normalized_parse_ms']} ms normalized "
+              f"({s['normalized_parse_expand_ms']} ms including expand)")
+
+
+if __name__ == "__main__":
+    main()
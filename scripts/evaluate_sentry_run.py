@@ -1,33 +1,106 @@
 #!/usr/bin/env python3
 """
 Evaluate Droid review comments against golden comments for droid-sentry.
-Usage: ANTHROPIC_API_KEY="sk-..." python3 scripts/evaluate_sentry_run.py <run_name>
+Usage: ANTHROPIC_API_KEY="sk-..." python3 scripts/evaluate_sentry_run.py <run_name> [--no-cluster] [--no-hedge] [--cascade] [--live] [--prs=6,9] [--code-context]
+       [--budget-usd=5 | --budget-tokens=200000] [--resume] [--legacy-output]
+       [--batch [--poll-interval=60]]
 Example: ANTHROPIC_API_KEY="sk-..." python3 scripts/evaluate_sentry_run.py run_2026-01-14-v3
+
+Near-duplicate droid comments are clustered per PR before judging; only one
+representative per cluster is sent to the judge (disable with --no-cluster).
+
+Judge calls go through judge_client.ResilientClient: transient errors are
+retried with backoff, slow calls are hedged (disable with --no-hedge) and a
+circuit breaker pauses dispatch during sustained API errors. A comment whose
+judge call still fails is left unjudged (with the error) and the run goes on;
+--resume judges it later.
+
+With --cascade (or --cascade-config=tiers.json) comments are judged by a cheap
+model first and only uncertain or positive verdicts escalate to the strong
+model; results go to sentry_eval_cascade.json for comparison with
+judge_cascade.py.
+
+Each judgment is streamed to eval_events.jsonl as it lands, with running
+precision/recall, throughput and ETA; --live also redraws a status line
+(or follow from another terminal with eval_events.py --follow). Budgeted
+judging streams a PR's judgments once its last judge call returns; with
+--batch every judgment arrives when the batch ends, so rate and ETA say
+nothing until then.
+
+With --code-context, each judge prompt also gets token-budgeted source
+snippets around the droid comment and the PR's v2 golden bug locations, read
+from snapshots.py worktrees at the PR head.
+
+With --budget-usd= / --budget-tokens=, judge calls are scheduled across all
+PRs (high-severity PRs and comments near known bug locations first) and stop
+cleanly at the budget; the output records partial metrics, coverage and the
+unjudged work, which --resume picks up in a later run.
+
+With --batch, all judge requests are submitted as one Message Batch (half
+price, no client-side concurrency limits) and polled until it ends; the
+batch state lives in judge_batch.json, so rerunning the same command after a
+restart resumes polling instead of resubmitting.
 """
 
+import argparse
 import json
 import os
 import sys
-from anthropic import Anthropic
+from collections import Counter
+from contextlib import ExitStack
+from typing import Callable
 
-client = Anthropic()
+from code_context import TOKEN_BUDGET as CONTEXT_TOKEN_BUDGET
+from code_context import ContextBuilder, Location, estimate_tokens
+from comment_clustering import cluster_comments
+from eval_events import EventStream
+from eval_format import dump_eval, load_eval
+from judge_batch import POLL_INTERVAL, BatchJob, custom_id
+from judge_budget import Budget, WorkItem, coverage, plan_work
+from judge_cascade import Tier, judge_cascade, load_tiers
+from judge_client import JudgeCallError, ResilientClient
+from paths import BASE_DIR, raw_comments_dir, run_dir
+
+JUDGE_MODEL = "claude-sonnet-4-20250514"
+JUDGE_MAX_TOKENS = 500
+GOLDEN_V2_PATH = BASE_DIR / "results" / "golden_comments_v2.json"
+
+_judge: ResilientClient | None = None
+
+
+def get_judge() -> ResilientClient:
+    """The shared judge client, created on first use.
+
+    The SDK is imported here rather than at module import so that importing
+    this module (e.g. from bench.py) is cheap and works without an API key.
+    """
+    global _judge
+    if _judge is None:
+        from anthropic import Anthropic
+        _judge = ResilientClient(Anthropic())
+    return _judge
+
+def build_judge_prompt(droid_comment: str, golden_comments: list[dict], code_context: str = "") -> str:
+    """The judge prompt for one droid comment against a PR's golden comments."""
 
-def evaluate_match(droid_comment: str, golden_comments: list[dict]) -> dict:
-    """Use Claude to determine if a Droid comment matches any golden comment."""
-    
     golden_list = "\n".join([
         f"- [{g['severity']}] {g['comment']}" 
         for g in golden_comments
     ])
     
-    prompt = f"""You are evaluating whether a code review comment from an AI reviewer matches any of the expected findings (golden comments) for a PR.
+    context_section = (
+        f"\nCODE CONTEXT (source at the PR head around the droid comment and known bug locations):\n{code_context}\n"
+        if code_context else ""
+    )
+    
+    return f"""You are evaluating whether a code review comment from an AI reviewer matches any of the expected findings (golden comments) for a PR.
 
 GOLDEN COMMENTS (expected findings):
 {golden_list}
 
 DROID'S COMMENT:
 {droid_comment}
-
+{context_section}
 Does Droid's comment match ANY of the golden comments? Two comments "match" if they describe the same bug/issue, even if worded differently.
 
 Respond in this exact JSON format:
@@ -41,25 +114,225 @@ Respond in this exact JSON format:
 
 Only output the JSON, nothing else."""
 
-    response = client.messages.create(
-        model="claude-sonnet-4-20250514",
-        max_tokens=500,
+
+def call_judge(prompt: str, model: str = JUDGE_MODEL) -> tuple[dict, dict]:
+    """Run the judge prompt on ``model``; returns (verdict, token usage)."""
+    response = get_judge().create(
+        model=model,
+        max_tokens=JUDGE_MAX_TOKENS,
         messages=[{"role": "user", "content": prompt}]
     )
-    
+    usage = getattr(response, "usage", None)
+    usage = {
+        "input_tokens": getattr(usage, "input_tokens", 0),
+        "output_tokens": getattr(usage, "output_tokens", 0),
+    }
+    return parse_verdict(response.content[0].text), usage
+
+
+def parse_verdict(text: str) -> dict:
+    """The judge's JSON verdict; an unparseable reply counts as a low-confidence non-match."""
     try:
-        return json.loads(response.content[0].text)
+        return json.loads(text)
     except json.JSONDecodeError:
         return {
             "matches": False,
             "matched_golden_comment": None,
             "matched_severity": None,
             "confidence": "low",
-            "reasoning": f"Failed to parse response: {response.content[0].text[:200]}"
+            "reasoning": f"Failed to parse response: {text[:200]}"
+        }
+
+
+def evaluate_match(droid_comment: str, golden_comments: list[dict], tiers: list[Tier] | None = None,
+                   code_context: str = "") -> dict:
+    """Use Claude to determine if a Droid comment matches any golden comment.
+
+    With ``tiers``, the comment is judged by the cascade (cheap model first,
+    escalating uncertain or positive verdicts); otherwise by JUDGE_MODEL.
+    """
+    prompt = build_judge_prompt(droid_comment, golden_comments, code_context)
+    return judge_cascade(prompt, tiers or [Tier(JUDGE_MODEL)], call_judge)
+
+def make_code_context(manager, stack: ExitStack, pr_title: str,
+                      golden_bugs: list[dict]) -> Callable[[dict], str] | None:
+    """Snippet builder for one PR, reading from a leased snapshot worktree."""
+    from snapshots import SnapshotError
+    try:
+        worktree = stack.enter_context(manager.checkout("sentry", f"title:{pr_title}"))
+    except SnapshotError as e:
+        print(f"    No code context: {e}")
+        return None
+    sha = worktree.name
+    builder = ContextBuilder(worktree, resolve_path=lambda path: manager.lookup_path("sentry", sha, path))
+    golden_locations = [
+        Location(bug.get("file"), bug.get("line"), f"golden bug {bug['id']}", priority=1) for bug in golden_bugs
+    ]
+    
+    def context_for(comment: dict) -> str:
+        droid_location = Location(comment.get("path"), comment.get("line"), "droid comment", priority=0)
+        return builder.build([droid_location] + golden_locations)
+    
+    return context_for
+
+def judge_within_budget(
+    prs: list[dict],
+    golden_by_title: dict[str, list[dict]],
+    golden_files_by_title: dict[str, set[str]],
+    budget: Budget,
+    cluster: bool = True,
+    tiers: list[Tier] | None = None,
+    previous: dict[tuple, dict] | None = None,
+    code_context_for: Callable[[dict], Callable[[dict], str] | None] | None = None,
+    on_pr_done: Callable[[int, dict[int, dict]], None] | None = None,
+) -> tuple[dict[int, dict[int, dict]], list[WorkItem]]:
+    """Judge cluster representatives across all PRs in priority order within ``budget``.
+    
+    ``previous`` maps (pr_number, comment_id) to verdicts from an earlier run
+    (--resume); those are reused without a judge call. Returns the verdicts
+    per PR (comment index -> verdict) and the work items left unjudged.
+    Ctrl-C stops judging like a budget stop (``budget.interrupted`` is set),
+    so the verdicts already paid for are kept.
+
+    Work items are ordered PR by PR, so ``on_pr_done(pr_number, verdicts)`` is
+    called as soon as a PR's last item has been judged, letting the caller
+    classify and stream that PR while the next one is judged.
+    """
+    previous = previous or {}
+    prs_by_number = {pr["number"]: pr for pr in prs}
+    clusters_by_pr = {}
+    judged: dict[int, dict[int, dict]] = {}
+    for pr in prs:
+        comments = pr.get("review_comments", [])
+        clusters_by_pr[pr["number"]] = cluster_comments(comments) if cluster else [[i] for i in range(len(comments))]
+        judged[pr["number"]] = {
+            i: previous[(pr["number"], c.get("id"))] for i, c in enumerate(comments) if (pr["number"], c.get("id")) in previous
         }
+    
+    items = plan_work(
+        prs, clusters_by_pr, golden_by_title, golden_files_by_title,
+        prompt_for=lambda pr, comment: build_judge_prompt(comment["body"], golden_by_title[pr["title"]]),
+        models=[tier.model for tier in tiers] if tiers else [JUDGE_MODEL],
+        max_output_tokens=JUDGE_MAX_TOKENS,
+        extra_input_tokens=CONTEXT_TOKEN_BUDGET if code_context_for else 0,
+        skip=lambda pr, comment: (pr["number"], comment.get("id")) in previous,
+    )
+    failed = []
+    for position, item in enumerate(items):
+        if not budget.fits(item.est_tokens, item.est_usd):
+            budget.stopped = f"budget reached with {len(items) - position} of {len(items)} judge calls left"
+            return judged, failed + items[position:]
+        pr = prs_by_number[item.pr_number]
+        comment = pr["review_comments"][item.comment_index]
+        try:
+            if on_pr_done and position and items[position - 1].pr_number != item.pr_number:
+                on_pr_done(items[position - 1].pr_number, judged[items[position - 1].pr_number])
+            context_fn = code_context_for(pr) if code_context_for else None
+            context = context_fn(comment) if context_fn else ""
+            verdict = evaluate_match(comment["body"], golden_by_title[pr["title"]], tiers, context)
+        except JudgeCallError as e:
+            item.error = str(e)
+            failed.append(item)
+            continue
+        except KeyboardInterrupt:
+            budget.stopped = f"interrupted with {len(items) - position} of {len(items)} judge calls left"
+            budget.interrupted = True
+            return judged, failed + items[position:]
+        if context:
+            verdict["code_context_tokens"] = estimate_tokens(context)
+        budget.charge(verdict.get("judge_usage", []))
+        judged[item.pr_number][item.comment_index] = verdict
+    if on_pr_done and items:
+        on_pr_done(items[-1].pr_number, judged[items[-1].pr_number])
+    return judged, failed
 
-def evaluate_pr(pr_data: dict, golden_comments: list[dict]) -> dict:
-    """Evaluate all Droid comments for a single PR."""
+def judge_in_batch(
+    prs: list[dict],
+    golden_by_title: dict[str, list[dict]],
+    job: BatchJob,
+    cluster: bool = True,
+    model: str = JUDGE_MODEL,
+    code_context_for: Callable[[dict], Callable[[dict], str] | None] | None = None,
+) -> tuple[dict[int, dict[int, dict]], dict[str, dict]]:
+    """Judge every cluster representative of ``prs`` in one Message Batch.
+    
+    Returns the verdicts per PR (comment index -> verdict) and the requests
+    that did not succeed (custom_id -> batch result), which stay unjudged.
+    """
+    prompts, meta, context_tokens = {}, {}, {}
+    for pr in prs:
+        comments = pr.get("review_comments", [])
+        clusters = cluster_comments(comments) if cluster else [[i] for i in range(len(comments))]
+        context_fn = code_context_for(pr) if code_context_for else None
+        for index in (c[0] for c in clusters):
+            comment = comments[index]
+            context = context_fn(comment) if context_fn else ""
+            request_id = custom_id(pr["number"], index)
+            prompts[request_id] = build_judge_prompt(comment["body"], golden_by_title[pr["title"]], context)
+            meta[request_id] = {"pr_number": pr["number"], "index": index, "comment_id": comment.get("id")}
+            if context:
+                context_tokens[request_id] = estimate_tokens(context)
+    
+    results = job.run(prompts, model, meta)
+    judged: dict[int, dict[int, dict]] = {pr["number"]: {} for pr in prs}
+    failed = {}
+    for request_id, info in meta.items():
+        result = results.get(request_id) or {"type": "missing"}
+        if result["type"] != "succeeded":
+            failed[request_id] = result
+            continue
+        verdict = parse_verdict(result["text"])
+        verdict["judge_model"] = model
+        verdict["judge_tier"] = 0
+        verdict["judge_usage"] = [{"model": model, **result["usage"], "matches": verdict.get("matches"),
+                                   "confidence": verdict.get("confidence"), "batch": True}]
+        if request_id in context_tokens:
+            verdict["code_context_tokens"] = context_tokens[request_id]
+        judged[info["pr_number"]][info["index"]] = verdict
+    return judged, failed
+
+def load_previous_verdicts(path: str) -> dict[tuple, dict]:
+    """Judged verdicts of an earlier run, keyed by (pr_number, comment_id)."""
+    if not os.path.exists(path):
+        return {}
+    data = load_eval(path)
+    previous = {}
+    for pr in data.get("prs", []):
+        for evaluation in pr.get("evaluations", []):
+            if "clustered_with" in evaluation or evaluation.get("comment_id") is None:
+                continue
+            previous[(pr["pr_number"], evaluation["comment_id"])] = {
+                k: v for k, v in evaluation.items() if k not in ("comment_id", "droid_comment", "file", "line")
+            }
+    return previous
+
+def evaluate_pr(pr_data: dict, golden_comments: list[dict], cluster: bool = True,
+                tiers: list[Tier] | None = None, events: EventStream | None = None,
+                code_context: Callable[[dict], str] | None = None,
+                judged: dict[int, dict] | None = None) -> dict:
+    """Evaluate all Droid comments for a single PR.
+    
+    With ``cluster``, near-duplicate comments share one judge call: the first
+    comment of each cluster is judged and the rest inherit its verdict, so a
+    matching member lands in ``duplicates`` and a non-matching one in
+    ``false_positives`` under the usual duplicate semantics.
+
+    With ``events``, each classified comment is streamed as it lands (and
+    each unjudged one as ``skipped``). With
+    ``code_context``, each judged comment's prompt gets the snippet it returns.
+
+    With ``judged`` (comment index -> verdict, from budgeted judging), no
+    judge calls are made: comments without a verdict are listed in
+    ``unjudged`` and left out of the metrics. Comments whose judge call fails
+    (JudgeCallError) are listed there too, with the error.
+    """
+    
+    review_comments = pr_data.get("review_comments", [])
+    if cluster:
+        clusters = cluster_comments(review_comments)
+    else:
+        clusters = [[i] for i in range(len(review_comments))]
+    representative_of = {member: c[0] for c in clusters for member in c[1:]}
     
     results = {
         "pr_number": pr_data["number"],
@@ -70,13 +343,54 @@ def evaluate_pr(pr_data: dict, golden_comments: list[dict]) -> dict:
         "true_positives": [],
         "false_positives": [],
         "false_negatives": [],
-        "duplicates": []
+        "duplicates": [],
+        "judge_calls": len(clusters),
+        "judge_calls_saved": len(representative_of)
     }
+    if judged is not None:
+        results["unjudged"] = []
+        results["judge_calls"] = sum(1 for c in clusters if c[0] in judged)
     
     matched_golden = set()
+    verdicts = {}
+    errors = {}
+    if events:
+        events.pr_start(results["pr_number"], results["golden_count"], results["droid_count"])
     
-    for comment in pr_data.get("review_comments", []):
-        eval_result = evaluate_match(comment["body"], golden_comments)
+    for index, comment in enumerate(review_comments):
+        unjudged = {"index": index, "comment_id": comment.get("id"),
+                    "file": comment.get("path"), "line": comment.get("line")}
+        if judged is not None and representative_of.get(index, index) not in judged:
+            results["unjudged"].append(unjudged)
+            if events:
+                events.skip(results["pr_number"], unjudged, "not judged")
+            continue
+        if representative_of.get(index, index) in errors:
+            results.setdefault("unjudged", []).append({**unjudged, "error": errors[representative_of[index]]})
+            if events:
+                events.skip(results["pr_number"], unjudged, "judge error")
+            continue
+        if index in representative_of:
+            representative = representative_of[index]
+            eval_result = dict(verdicts[representative])
+            eval_result["clustered_with"] = review_comments[representative].get("id", representative)
+        elif judged is not None:
+            eval_result = dict(judged[index])
+            verdicts[index] = dict(eval_result)
+        else:
+            context = code_context(comment) if code_context else ""
+            try:
+                eval_result = evaluate_match(comment["body"], golden_comments, tiers, context)
+            except JudgeCallError as e:
+                errors[index] = str(e)
+                results.setdefault("unjudged", []).append({**unjudged, "error": str(e)})
+                if events:
+                    events.skip(results["pr_number"], unjudged, "judge error")
+                continue
+            if context:
+                eval_result["code_context_tokens"] = estimate_tokens(context)
+            verdicts[index] = dict(eval_result)
+        eval_result["comment_id"] = comment.get("id")
         eval_result["droid_comment"] = comment["body"]
         eval_result["file"] = comment.get("path", "unknown")
         eval_result["line"] = comment.get("line", "unknown")
@@ -98,12 +412,19 @@ def evaluate_pr(pr_data: dict, golden_comments: list[dict]) -> dict:
             if matched_golden_key and matched_golden_key in matched_golden:
                 # This is a duplicate - same golden issue found by multiple droid comments
                 results["duplicates"].append(eval_result)
+                classification = "duplicate"
             elif matched_golden_key:
                 # First droid comment to match this golden issue
                 results["true_positives"].append(eval_result)
                 matched_golden.add(matched_golden_key)
+                classification = "tp"
+            else:
+                classification = "unmatched"
         else:
             results["false_positives"].append(eval_result)
+            classification = "fp"
+        if events:
+            events.judgment(results["pr_number"], eval_result, classification)
     
     for golden in golden_comments:
         if golden["comment"] not in matched_golden:
@@ -131,17 +452,59 @@ def evaluate_pr(pr_data: dict, golden_comments: list[dict]) -> dict:
         "recall": round(recall * 100, 1),
         "f_score": round(f_score * 100, 1)
     }
+    if events:
+        events.pr_complete(results["pr_number"], results["metrics"])
     
     return results
 
+def pr_list(value: str) -> set[int]:
+    try:
+        return {int(n) for n in value.split(",") if n}
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated PR numbers, got {value!r}")
+
+
 def main():
-    if len(sys.argv) < 2:
-        run_name = f"run_{os.popen('date +%Y-%m-%d').read().strip()}-v3"
-    else:
-        run_name = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Judge Droid comments against golden comments for droid-sentry.")
+    parser.add_argument("run_name", nargs="?", help="Run to evaluate (default: run_<today>-v3)")
+    parser.add_argument("--no-cluster", action="store_true", help="Judge every comment instead of one per near-duplicate cluster")
+    parser.add_argument("--no-hedge", action="store_true", help="Do not hedge slow judge calls")
+    parser.add_argument("--cascade", action="store_true", help="Judge with the cheap-first model cascade")
+    parser.add_argument("--cascade-config", help="Tiers JSON for the cascade (implies --cascade)")
+    parser.add_argument("--live", action="store_true", help="Redraw a live status line")
+    parser.add_argument("--prs", type=pr_list, help="Only these PR numbers, e.g. 6,9")
+    parser.add_argument("--code-context", action="store_true", help="Add source snippets from snapshot worktrees to prompts")
+    parser.add_argument("--budget-usd", type=float, help="Stop judging before this many dollars are spent")
+    parser.add_argument("--budget-tokens", type=int, help="Stop judging before this many tokens are spent")
+    parser.add_argument("--resume", action="store_true", help="Reuse verdicts already in the output file")
+    parser.add_argument("--legacy-output", action="store_true", help="Write the legacy (non-normalized) eval shape")
+    parser.add_argument("--batch", action="store_true", help="Submit all judge requests as one Message Batch")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL, help="Seconds between batch polls")
+    args = parser.parse_args()
+
+    cluster = not args.no_cluster
+    tiers = load_tiers(args.cascade_config) if args.cascade or args.cascade_config else None
+    output_name = "sentry_eval_cascade.json" if tiers else "sentry_eval.json"
+    live = args.live
+    only_prs = args.prs
+    budget_usd, budget_tokens, resume = args.budget_usd, args.budget_tokens, args.resume
+    scheduled = budget_usd is not None or budget_tokens is not None or resume
+    batch = args.batch
+    poll_interval = args.poll_interval
+    if batch and (tiers or scheduled):
+        parser.error("--batch cannot be combined with --cascade or budgeted judging")
+    judge = get_judge()
+    judge.hedge = not args.no_hedge
+    snapshot_manager = None
+    if args.code_context:
+        from snapshots import SnapshotManager
+        snapshot_manager = SnapshotManager()
+        with open(GOLDEN_V2_PATH) as f:
+            v2_bugs_by_title = {pr["pr_title"]: pr["bugs"] for pr in json.load(f)["repos"]["sentry"]["prs"]}
+    run_name = args.run_name or f"run_{os.popen('date +%Y-%m-%d').read().strip()}-v3"
     
-    base_path = os.path.expanduser(f"~/review-droid-benchmark/results/{run_name}/raw_comments")
-    output_path = os.path.expanduser(f"~/review-droid-benchmark/results/{run_name}")
+    base_path = raw_comments_dir(run_name)
+    output_path = run_dir(run_name)
     
     print(f"Evaluating run: {run_name}")
     
@@ -153,28 +516,116 @@ def main():
         golden_data = json.load(f)
     
     golden_by_title = {g["pr_title"]: g["comments"] for g in golden_data}
+    if only_prs:
+        droid_data["prs"] = [pr for pr in droid_data["prs"] if pr["number"] in only_prs]
     
     all_results = {
         "repo": "droid-sentry",
         "prs": [],
-        "summary": {"total_tp": 0, "total_fp": 0, "total_fn": 0}
+        "summary": {"total_tp": 0, "total_fp": 0, "total_fn": 0, "judge_calls": 0, "judge_calls_saved": 0}
     }
     
     print(f"\nEvaluating droid-sentry...")
     
-    for pr in droid_data["prs"]:
-        golden_comments = golden_by_title.get(pr["title"], [])
-        if not golden_comments:
-            print(f"  WARNING: No golden comments for PR #{pr['number']}: {pr['title']}")
-            continue
-        
-        print(f"  PR #{pr['number']}: {len(golden_comments)} golden, {len(pr.get('review_comments', []))} droid")
-        result = evaluate_pr(pr, golden_comments)
-        all_results["prs"].append(result)
-        
-        all_results["summary"]["total_tp"] += len(result["true_positives"])
-        all_results["summary"]["total_fp"] += len(result["false_positives"])
-        all_results["summary"]["total_fn"] += len(result["false_negatives"])
+    events_path = f"{output_path}/{output_name.replace('sentry_eval', 'eval_events').replace('.json', '.jsonl')}"
+    total_judgments = sum(
+        len(pr.get("review_comments", [])) for pr in droid_data["prs"] if golden_by_title.get(pr["title"])
+    )
+    events = EventStream(events_path, total_judgments, live=live, run_name=run_name, repo="droid-sentry")
+    print(f"Streaming judgments to {events_path}")
+    # Any exit before the normal close (errors, Ctrl-C) ends the stream with run_aborted,
+    # so --follow readers stop waiting; close() is a no-op once the run has ended
+    try:
+        judged_by_pr, remaining = {}, []
+        budget = Budget(max_usd=budget_usd, max_tokens=budget_tokens)
+        context_stack = ExitStack()
+        prs_to_judge = [pr for pr in droid_data["prs"] if golden_by_title.get(pr["title"])]
+        prs_by_number = {pr["number"]: pr for pr in prs_to_judge}
+        contexts = {}
+    
+        def code_context_for(pr):
+            if pr["number"] not in contexts:
+                contexts[pr["number"]] = make_code_context(
+                    snapshot_manager, context_stack, pr["title"], v2_bugs_by_title.get(pr["title"], [])
+                )
+            return contexts[pr["number"]]
+    
+        results_by_pr = {}
+    
+        def evaluate_one(pr, judged):
+            """Classify one PR (judging it unless verdicts were made up front) and stream its events."""
+            golden_comments = golden_by_title.get(pr["title"], [])
+            if not golden_comments:
+                print(f"  WARNING: No golden comments for PR #{pr['number']}: {pr['title']}")
+                return
+            if not live:
+                print(f"  PR #{pr['number']}: {len(golden_comments)} golden, {len(pr.get('review_comments', []))} droid")
+            with ExitStack() as stack:
+                code_context = None
+                if snapshot_manager and not (scheduled or batch):
+                    code_context = make_code_context(
+                        snapshot_manager, stack, pr["title"], v2_bugs_by_title.get(pr["title"], [])
+                    )
+                result = evaluate_pr(pr, golden_comments, cluster=cluster, tiers=tiers, events=events,
+                                     code_context=code_context, judged=judged if scheduled or batch else None)
+            results_by_pr[pr["number"]] = result
+            if result["judge_calls_saved"] and not live:
+                print(f"    {result['judge_calls_saved']} near-duplicate comment(s) share a verdict")
+    
+        failed_requests = {}
+        job = None
+        if batch:
+            job = BatchJob(get_judge().client, f"{output_path}/judge_batch.json", poll_interval=poll_interval)
+            try:
+                with context_stack:
+                    judged_by_pr, failed_requests = judge_in_batch(
+                        prs_to_judge, golden_by_title, job, cluster=cluster,
+                        code_context_for=code_context_for if snapshot_manager else None,
+                    )
+            except KeyboardInterrupt:
+                print(f"\nStopped polling; the batch keeps running. Rerun with --batch to resume "
+                      f"(state in {job.state_path})")
+                sys.exit(130)
+            if failed_requests:
+                print(f"{len(failed_requests)} batch request(s) did not succeed; those comments stay unjudged")
+        if scheduled:
+            golden_files_by_title = {}
+            if os.path.exists(GOLDEN_V2_PATH):
+                with open(GOLDEN_V2_PATH) as f:
+                    golden_files_by_title = {
+                        pr["pr_title"]: {b["file"] for b in pr["bugs"] if b.get("file")}
+                        for pr in json.load(f)["repos"]["sentry"]["prs"]
+                    }
+            previous = load_previous_verdicts(f"{output_path}/{output_name}") if resume else {}
+            print(f"Budget: {budget_usd if budget_usd is not None else '-'} USD, "
+                  f"{budget_tokens if budget_tokens is not None else '-'} tokens"
+                  f"{f'; reusing {len(previous)} verdicts' if previous else ''}")
+            with context_stack:
+                judged_by_pr, remaining = judge_within_budget(
+                    prs_to_judge, golden_by_title, golden_files_by_title, budget, cluster=cluster, tiers=tiers,
+                    previous=previous, code_context_for=code_context_for if snapshot_manager else None,
+                    on_pr_done=lambda number, judged: evaluate_one(prs_by_number[number], judged),
+                )
+            if budget.stopped:
+                print(f"Stopped: {budget.stopped}")
+    
+        try:
+            for pr in droid_data["prs"]:
+                if pr["number"] not in results_by_pr:
+                    evaluate_one(pr, judged_by_pr.get(pr["number"], {}))
+        except KeyboardInterrupt:
+            print(f"\nAborted; partial event stream in {events_path}")
+            sys.exit(130)
+        all_results["prs"] = [results_by_pr[pr["number"]] for pr in droid_data["prs"] if pr["number"] in results_by_pr]
+        for result in all_results["prs"]:
+            all_results["summary"]["total_tp"] += len(result["true_positives"])
+            all_results["summary"]["total_fp"] += len(result["false_positives"])
+            all_results["summary"]["total_fn"] += len(result["false_negatives"])
+            all_results["summary"]["judge_calls"] += result["judge_calls"]
+            all_results["summary"]["judge_calls_saved"] += result["judge_calls_saved"]
+        events.close(aborted=budget.interrupted)
+    finally:
+        events.close(aborted=True)
     
     tp, fp, fn = all_results["summary"]["total_tp"], all_results["summary"]["total_fp"], all_results["summary"]["total_fn"]
     precision = tp / (tp + fp) if (tp + fp) > 0 else 0
@@ -184,16 +635,101 @@ def main():
     all_results["summary"]["precision"] = round(precision * 100, 1)
     all_results["summary"]["recall"] = round(recall * 100, 1)
     all_results["summary"]["f_score"] = round(f_score * 100, 1)
+    all_results["summary"]["judge_client"] = judge.stats.summary()
+    judge_errors = [
+        {"pr_number": r["pr_number"], **u} for r in all_results["prs"] for u in r.get("unjudged", []) if "error" in u
+    ]
+    if judge_errors:
+        all_results["summary"]["judge_errors"] = len(judge_errors)
+    
+    if scheduled:
+        all_results["summary"]["budget"] = {
+            **budget.summary(),
+            "unjudged_judge_calls": len(remaining),
+            "estimated_remaining_usd": round(sum(item.est_usd for item in remaining), 4),
+        }
+        all_results["summary"]["coverage"] = coverage(prs_to_judge, {
+            r["pr_number"]: set(range(r["droid_count"])) - {u["index"] for u in r["unjudged"]}
+            for r in all_results["prs"]
+        })
+        # FNs of partially judged PRs are not final, so also report metrics over complete PRs only
+        complete = [r for r in all_results["prs"] if not r["unjudged"]]
+        c_tp = sum(len(r["true_positives"]) for r in complete)
+        c_fp = sum(len(r["false_positives"]) for r in complete)
+        c_fn = sum(len(r["false_negatives"]) for r in complete)
+        all_results["summary"]["complete_prs"] = {
+            "prs": len(complete),
+            "precision": round(100 * c_tp / (c_tp + c_fp), 1) if c_tp + c_fp else 0,
+            "recall": round(100 * c_tp / (c_tp + c_fn), 1) if c_tp + c_fn else 0,
+        }
+        all_results["unjudged"] = [
+            {"pr_number": item.pr_number, "comment_id": item.comment_id, "index": item.comment_index,
+             "cluster_members": item.members, "est_usd": round(item.est_usd, 5),
+             **({"error": item.error} if item.error else {})}
+            for item in remaining
+        ]
+    
+    if batch:
+        all_results["summary"]["batch"] = {
+            "batch_id": job.state["batch_id"],
+            "previous_batches": job.state.get("previous_batches", []),
+            "requests": len(job.state["requests"]),
+            "request_counts": job.state["request_counts"],
+            "failed_requests": failed_requests,
+            "unjudged_comments": sum(len(r["unjudged"]) for r in all_results["prs"]),
+        }
+    
+    if tiers:
+        final_tiers = Counter(
+            e["judge_model"] for pr in all_results["prs"] for e in pr["evaluations"] if "clustered_with" not in e
+        )
+        all_results["summary"]["cascade"] = {
+            "tiers": [vars(t) for t in tiers],
+            "verdicts_by_model": dict(final_tiers),
+        }
     
-    with open(f"{output_path}/sentry_eval.json", "w") as f:
-        json.dump(all_results, f, indent=2)
+    dump_eval(all_results, f"{output_path}/{output_name}", legacy=args.legacy_output)
     
     print(f"\n{'='*50}")
     print(f"RESULTS: TP={tp}, FP={fp}, FN={fn}")
     print(f"Precision: {all_results['summary']['precision']}%")
     print(f"Recall: {all_results['summary']['recall']}%")
     print(f"F-score: {all_results['summary']['f_score']}%")
-    print(f"\nResults saved to {output_path}/sentry_eval.json")
+    print(f"Judge calls: {all_results['summary']['judge_calls']} "
+          f"({all_results['summary']['judge_calls_saved']} saved by near-duplicate clustering)")
+    stats = all_results["summary"]["judge_client"]
+    print(f"Judge client: {stats['retries']} retries, {stats['hedges']} hedges ({stats['hedge_wins']} won), "
+          f"{judge.breaker.times_opened} breaker trips")
+    cut = stats["p99_reduction_pct"]
+    print(f"Judge latency p99: {stats['attempt_latency_p99']}s with hedging vs "
+          f"{stats['primary_latency_p99']}s primary-only "
+          f"({f'{cut}% cut' if cut is not None else 'n/a, no hedges sent'})")
+    if judge_errors:
+        print(f"WARNING: {len(judge_errors)} comment(s) left unjudged after judge errors "
+              f"(first: {judge_errors[0]['error']}); judge them with --resume")
+    if scheduled:
+        b, cov = all_results["summary"]["budget"], all_results["summary"]["coverage"]
+        print(f"Budget: spent ${b['spent_usd']:.4f} / {b['spent_tokens']} tokens over {b['judge_calls']} calls")
+        print(f"Coverage: {cov['comments_judged']}/{cov['comments_total']} comments "
+              f"({cov['comment_coverage_pct']}%), PRs complete/partial/untouched: "
+              f"{cov['prs_complete']}/{cov['prs_partial']}/{cov['prs_untouched']}")
+        c = all_results["summary"]["complete_prs"]
+        print(f"Complete PRs only ({c['prs']}): precision {c['precision']}%, recall {c['recall']}%")
+        if remaining:
+            print(f"{len(remaining)} judge calls left (~${b['estimated_remaining_usd']:.4f}); "
+                  f"finish with --resume and a new budget (metrics above are partial)")
+    if batch:
+        b = all_results["summary"]["batch"]
+        print(f"Batch {b['batch_id']}: {b['requests'] - len(b['failed_requests'])} of {b['requests']} requests succeeded, "
+              f"{len(b['failed_requests'])} failed, {b['unjudged_comments']} comments unjudged")
+    if tiers:
+        print(f"Cascade verdicts by model: {all_results['summary']['cascade']['verdicts_by_model']}")
+        print(f"Compare with a strong-only run: python3 scripts/judge_cascade.py "
+              f"{output_path}/{output_name} {output_path}/sentry_eval.json")
+    print(f"\nResults saved to {output_path}/{output_name}")
+    if budget.interrupted:
+        print("Interrupted: the verdicts judged so far are saved; finish with --resume")
+        sys.exit(130)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Trigger Droid reviews, fetch its PR comments and transform them into the
+evaluation input format (the steps 2, 5 and 6 of docs/EVALS.md). Fetching
+also records per-PR review timings from the Actions API (review_timings.py).
+
+Usage:
+  python3 scripts/fetch_comments.py trigger
+  python3 scripts/fetch_comments.py fetch <run_name> [--golden PATH]
+  python3 scripts/fetch_comments.py transform <run_name>
+Example: python3 scripts/fetch_comments.py fetch run_2026-01-14-v3
+
+Requires an authenticated `gh` CLI for trigger and fetch.
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from paths import BASE_DIR, raw_comments_dir, run_dir
+
+REPO = "droid-code-review-evals/droid-sentry"
+PRS = list(range(6, 16))
+BOT_LOGIN = "factory-droid[bot]"
+GOLDEN_SOURCE = BASE_DIR / "repos" / "golden_comments" / "code_review_benchmarks" / "sentry.json"
+
+PR_TITLES = {
+    6: "Enhanced Pagination Performance for High-Volume Audit Logs",
+    7: "Optimize spans buffer insertion with eviction during insert",
+    8: "feat(upsampling) - Support upsampled error count with performance optimizations",
+    9: "GitHub OAuth Security Enhancement",
+    10: "Replays Self-Serve Bulk Delete System",
+    11: "Span Buffer Multiprocess Enhancement with Health Monitoring",
+    12: "feat(ecosystem): Implement cross-system issue synchronization",
+    13: "ref(crons): Reorganize incident creation / issue occurrence logic",
+    14: "feat(uptime): Add ability to use queues to manage parallelism",
+    15: "feat(workflow_engine): Add in hook for producing occurrences from the stateful detector",
+}
+
+
+def trigger_reviews(repo: str = REPO, prs: list[int] = PRS, delay: float = 2.0) -> None:
+    """Comment "@droid review" on each PR."""
+    print(f"Triggering Droid reviews for {repo} PRs #{prs[0]}-{prs[-1]}...")
+    for pr in prs:
+        subprocess.run(["gh", "pr", "comment", str(pr), "--repo", repo, "--body", "@droid review"], check=True)
+        print(f"Triggered review on PR #{pr}")
+        time.sleep(delay)
+    print(f"\nAll reviews triggered. Monitor progress with:\n  gh run list --repo {repo} --limit 20")
+
+
+def fetch_comments(run_name: str, repo: str = REPO, prs: list[int] = PRS,
+                   golden_source: Path = GOLDEN_SOURCE) -> None:
+    """Save each PR's review comments to pr_N_comments.json and copy the golden file."""
+    out_dir = run_dir(run_name)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for pr in prs:
+        result = subprocess.run(
+            ["gh", "api", "--paginate", "--slurp", f"repos/{repo}/pulls/{pr}/comments"],
+            check=True, capture_output=True, text=True,
+        )
+        # --slurp wraps each page in an outer list
+        comments = [c for page in json.loads(result.stdout) for c in page]
+        with open(out_dir / f"pr_{pr}_comments.json", "w") as f:
+            json.dump(comments, f, indent=2)
+        print(f"  PR #{pr}: {len(comments)} comments")
+    shutil.copyfile(golden_source, out_dir / "golden_comments.json")
+    print(f"Saved to {out_dir}")
+
+    # Imported here: review_timings builds on this module's REPO and BOT_LOGIN
+    from review_timings import TIMINGS_FILE, TimingsError, collect_run
+    try:
+        collect_run(run_name, repo=repo)
+        print(f"Review timings saved to {out_dir / TIMINGS_FILE}")
+    except (TimingsError, OSError) as e:
+        print(f"Review timings skipped ({e}); retry with: python3 scripts/review_timings.py collect {run_name}")
+
+
+def transform_comments(run_name: str, prs: list[int] = PRS, titles: dict[int, str] = PR_TITLES) -> Path:
+    """Build raw_comments/droid-sentry.json and golden_sentry.json for evaluation."""
+    source_dir = run_dir(run_name)
+    result = {
+        "repo": "droid-sentry",
+        "fetched_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "prs": []
+    }
+    for pr_num in prs:
+        with open(source_dir / f"pr_{pr_num}_comments.json") as f:
+            comments = json.load(f)
+        review_comments = [
+            {
+                "body": c["body"],
+                "created_at": c["created_at"],
+                "html_url": c["html_url"],
+                "id": c["id"],
+                "line": c.get("line"),
+                "path": c["path"],
+                "side": c.get("side", "RIGHT")
+            }
+            for c in comments
+            if c["user"]["login"] == BOT_LOGIN
+        ]
+        result["prs"].append({
+            "number": pr_num,
+            "title": titles[pr_num],
+            "issue_comments": [],
+            "review_comments": review_comments,
+            "reviews": []
+        })
+
+    out_dir = raw_comments_dir(run_name)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / "droid-sentry.json", "w") as f:
+        json.dump(result, f, indent=2)
+    golden = source_dir / "golden_comments.json"
+    if golden.exists():
+        shutil.copyfile(golden, out_dir / "golden_sentry.json")
+    print(f"Transformed comments for {len(result['prs'])} PRs into {out_dir}")
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigger, fetch and transform Droid review comments.")
+    sub = parser.add_subparsers(dest="step", required=True)
+    trigger = sub.add_parser("trigger", help="Comment '@droid review' on each PR")
+    trigger.add_argument("--delay", type=float, default=2.0, help="Seconds between PRs")
+    fetch = sub.add_parser("fetch", help="Download PR review comments into results/<run_name>/")
+    fetch.add_argument("run_name")
+    fetch.add_argument("--golden", type=Path, default=GOLDEN_SOURCE, help="Golden comments file to copy")
+    transform = sub.add_parser("transform", help="Build raw_comments/ evaluation inputs")
+    transform.add_argument("run_name")
+    args = parser.parse_args()
+
+    if args.step == "trigger":
+        trigger_reviews(delay=args.delay)
+    elif args.step == "fetch":
+        fetch_comments(args.run_name, golden_source=args.golden)
+    else:
+        transform_comments(args.run_name)
+
+
+if __name__ == "__main__":
+    main()
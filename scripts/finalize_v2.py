@@ -6,34 +6,32 @@ Finalize Golden Comments v2 from revalidation results.
 2. Creates the final golden_comments_v2.json with all validated bugs
 """
 
+import argparse
 import json
 import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-BASE_DIR = Path(__file__).parent.parent
+from bug_table import BugTable
+from paths import BASE_DIR
+from validate_ground_truth import require_valid_tree
+
 VALIDATION_DIR = BASE_DIR / "results" / "ground_truth_validation" / "run_2026-01-15"
 MANIFEST_PATH = BASE_DIR / "manifest.json"
 OUTPUT_PATH = BASE_DIR / "results" / "golden_comments_v2.json"
 
-REPOS = ["sentry", "grafana", "keycloak", "discourse", "cal_dot_com"]
-
-# PR ranges per repo
-PR_RANGES = {
-    "sentry": range(6, 16),      # PRs 6-15
-    "grafana": range(1, 11),     # PRs 1-10
-    "keycloak": range(1, 11),    # PRs 1-10
-    "discourse": range(1, 11),   # PRs 1-10
-    "cal_dot_com": range(1, 11), # PRs 1-10
-}
-
 
 def load_manifest() -> dict[str, Any]:
     with open(MANIFEST_PATH) as f:
         return json.load(f)
 
 
+def get_pr_numbers(manifest: dict, repo: str) -> list[int]:
+    """PR numbers for a repo, ascending (repos and PRs come from the manifest)."""
+    return sorted(pr["number"] for pr in manifest["projects"][repo]["prs"])
+
+
 def load_revalidation_file(repo: str, pr_number: int) -> dict[str, Any] | None:
     filepath = VALIDATION_DIR / repo / f"pr_{pr_number}_revalidation.json"
     if not filepath.exists():
@@ -43,50 +41,59 @@ def load_revalidation_file(repo: str, pr_number: int) -> dict[str, Any] | None:
         return json.load(f)
 
 
-def generate_repo_summary(repo: str) -> dict[str, Any]:
-    """Generate revalidation summary for a repo."""
-    pr_numbers = list(PR_RANGES[repo])
+# Per-PR counts summed into revalidation_summary.json, in output order
+SUMMARY_COUNTS = (
+    "total_bugs_reviewed",
+    "confirmed",
+    "modified",
+    "rejected",
+    "false_positives_confirmed",
+    "false_positives_reversed",
+    "newly_discovered",
+)
+
+
+def summarize_pr(reval: dict[str, Any]) -> dict[str, int]:
+    """Verdict counts for one PR's revalidation file."""
+    counts = dict.fromkeys(SUMMARY_COUNTS, 0)
+    
+    for bug in reval.get("bug_verdicts", []):
+        counts["total_bugs_reviewed"] += 1
+        verdict = bug.get("verdict", "")
+        if verdict in ("confirmed", "modified", "rejected"):
+            counts[verdict] += 1
+    
+    for fp in reval.get("false_positive_verdicts", []):
+        verdict = fp.get("verdict", "")
+        if verdict == "confirmed_false_positive":
+            counts["false_positives_confirmed"] += 1
+        elif verdict == "actually_real_bug":
+            counts["false_positives_reversed"] += 1
     
+    counts["newly_discovered"] = len(reval.get("newly_discovered_bugs", []))
+    return counts
+
+
+def build_repo_summary(repo: str, pr_counts: dict[int, dict[str, int]]) -> dict[str, Any]:
+    """Repo summary from per-PR counts (keyed by PR number, ascending)."""
     summary = {
         "repo": repo,
         "revalidation_date": datetime.now().strftime("%Y-%m-%d"),
-        "prs_reviewed": [],
-        "total_bugs_reviewed": 0,
-        "confirmed": 0,
-        "modified": 0,
-        "rejected": 0,
-        "false_positives_confirmed": 0,
-        "false_positives_reversed": 0,
-        "newly_discovered": 0,
+        "prs_reviewed": list(pr_counts),
     }
-    
+    for field in SUMMARY_COUNTS:
+        summary[field] = sum(counts[field] for counts in pr_counts.values())
+    return summary
+
+
+def generate_repo_summary(repo: str, pr_numbers: list[int]) -> dict[str, Any]:
+    """Generate revalidation summary for a repo."""
+    pr_counts = {}
     for pr_number in pr_numbers:
         reval = load_revalidation_file(repo, pr_number)
-        if not reval:
-            continue
-        
-        summary["prs_reviewed"].append(pr_number)
-        
-        for bug in reval.get("bug_verdicts", []):
-            summary["total_bugs_reviewed"] += 1
-            verdict = bug.get("verdict", "")
-            if verdict == "confirmed":
-                summary["confirmed"] += 1
-            elif verdict == "modified":
-                summary["modified"] += 1
-            elif verdict == "rejected":
-                summary["rejected"] += 1
-        
-        for fp in reval.get("false_positive_verdicts", []):
-            verdict = fp.get("verdict", "")
-            if verdict == "confirmed_false_positive":
-                summary["false_positives_confirmed"] += 1
-            elif verdict == "actually_real_bug":
-                summary["false_positives_reversed"] += 1
-        
-        summary["newly_discovered"] += len(reval.get("newly_discovered_bugs", []))
-    
-    return summary
+        if reval:
+            pr_counts[pr_number] = summarize_pr(reval)
+    return build_repo_summary(repo, pr_counts)
 
 
 def save_repo_summary(repo: str, summary: dict[str, Any]) -> Path:
@@ -96,16 +103,107 @@ def save_repo_summary(repo: str, summary: dict[str, Any]) -> Path:
     return output_path
 
 
-def build_golden_comments_v2() -> dict[str, Any]:
-    """Build the final golden_comments_v2.json from all revalidation files."""
-    manifest = load_manifest()
+def _table_fields(bug_entry: dict[str, Any]) -> dict[str, Any]:
+    """Bug table columns taken from a golden v2 bug entry."""
+    return {
+        "bug_id": bug_entry["id"] if isinstance(bug_entry["id"], int) else None,
+        "file": bug_entry["file"],
+        "line": bug_entry["line"],
+        "severity": bug_entry["severity"],
+        "bug_type": bug_entry["bug_type"],
+    }
+
+
+def stats_from_counts(counts: dict[tuple[str, str, str], int]) -> dict[str, dict[str, int]]:
+    """By-verdict/type/severity stats from (verdict, bug_type, severity) counts."""
+    stats = {
+        "bugs_by_verdict": {"confirmed": 0, "modified": 0},
+        "bugs_by_type": {},
+        "bugs_by_severity": {},
+    }
+    for (verdict, bug_type, severity), count in counts.items():
+        if verdict in stats["bugs_by_verdict"]:
+            stats["bugs_by_verdict"][verdict] += count
+        stats["bugs_by_type"][bug_type] = stats["bugs_by_type"].get(bug_type, 0) + count
+        stats["bugs_by_severity"][severity] = stats["bugs_by_severity"].get(severity, 0) + count
+    return stats
+
+
+def aggregate_stats(table: BugTable) -> dict[str, dict[str, int]]:
+    """Compute the by-verdict/type/severity stats over every golden v2 bug in one pass."""
+    return stats_from_counts(table.group_count(["verdict", "bug_type", "severity"]))
+
+
+def golden_pr_entry(reval: dict[str, Any], pr_number: int, pr_title: str) -> tuple[dict | None, list[dict]]:
+    """One PR's golden v2 entry (None if it has no bugs) and its bug table rows.
     
-    output = {
+    ``pr_title`` is the fallback when the revalidation file has none.
+    """
+    bugs = []
+    rows = []
+    
+    # Collect confirmed/modified bugs only
+    for bug in reval.get("bug_verdicts", []):
+        verdict = bug.get("verdict", "")
+        if verdict in ("confirmed", "modified"):
+            bug_entry = {
+                "id": bug.get("bug_id"),
+                "file": bug.get("verified_file") or bug.get("file"),
+                "line": bug.get("verified_line") or bug.get("line"),
+                "description": bug.get("verified_description") or bug.get("original_description"),
+                "severity": bug.get("verified_severity") or bug.get("original_severity", "medium"),
+                "bug_type": bug.get("verified_bug_type") or bug.get("original_bug_type", "unknown"),
+            }
+            bugs.append(bug_entry)
+            rows.append({"verdict": verdict, "origin": "revalidation", **_table_fields(bug_entry)})
+    
+    # Add any newly discovered bugs
+    for new_bug in reval.get("newly_discovered_bugs", []):
+        bug_entry = {
+            "id": f"new_{len(bugs) + 1}",
+            "file": new_bug.get("file"),
+            "line": new_bug.get("line"),
+            "description": new_bug.get("description"),
+            "severity": new_bug.get("severity", "medium"),
+            "bug_type": new_bug.get("bug_type", "unknown"),
+            "newly_discovered": True
+        }
+        bugs.append(bug_entry)
+        rows.append({"verdict": "newly_discovered", "origin": "newly_discovered", **_table_fields(bug_entry)})
+    
+    # Add reversed false positives as bugs
+    for fp in reval.get("false_positive_verdicts", []):
+        if fp.get("verdict") == "actually_real_bug":
+            bug_entry = {
+                "id": f"fp_reversed_{len(bugs) + 1}",
+                "file": fp.get("file", ""),
+                "line": fp.get("line"),
+                "description": fp.get("original_comment"),
+                "severity": fp.get("severity", "medium"),
+                "bug_type": fp.get("bug_type", "unknown"),
+                "from_reversed_false_positive": True
+            }
+            bugs.append(bug_entry)
+            rows.append({"verdict": "actually_real_bug", "origin": "golden_false_positive", **_table_fields(bug_entry)})
+    
+    if not bugs:
+        return None, rows
+    pr_entry = {
+        "pr_number": pr_number,
+        "pr_title": reval.get("pr_title") or pr_title,
+        "bug_count": len(bugs),
+        "bugs": bugs
+    }
+    return pr_entry, rows
+
+
+def golden_header(total_repos: int) -> dict[str, Any]:
+    return {
         "version": "2.0",
         "generated_date": datetime.now().strftime("%Y-%m-%d"),
         "source": "ground_truth_validation/run_2026-01-15 + revalidation",
         "stats": {
-            "total_repos": len(REPOS),
+            "total_repos": total_repos,
             "total_prs": 0,
             "total_bugs": 0,
             "bugs_by_verdict": {"confirmed": 0, "modified": 0},
@@ -114,9 +212,15 @@ def build_golden_comments_v2() -> dict[str, Any]:
         },
         "repos": {}
     }
+
+
+def build_golden_comments_v2(manifest: dict[str, Any]) -> dict[str, Any]:
+    """Build the final golden_comments_v2.json from all revalidation files."""
+    table = BugTable()
+    output = golden_header(len(manifest["projects"]))
     
-    for repo in REPOS:
-        pr_numbers = list(PR_RANGES[repo])
+    for repo in manifest["projects"]:
+        pr_numbers = get_pr_numbers(manifest, repo)
         repo_data = {
             "pr_count": 0,
             "bug_count": 0,
@@ -133,80 +237,21 @@ def build_golden_comments_v2() -> dict[str, Any]:
             if not reval:
                 continue
             
-            pr_title = reval.get("pr_title") or pr_titles.get(pr_number, f"PR #{pr_number}")
-            
-            # Collect confirmed/modified bugs only
-            bugs = []
-            for bug in reval.get("bug_verdicts", []):
-                verdict = bug.get("verdict", "")
-                if verdict in ("confirmed", "modified"):
-                    bug_entry = {
-                        "id": bug.get("bug_id"),
-                        "file": bug.get("verified_file") or bug.get("file"),
-                        "line": bug.get("verified_line") or bug.get("line"),
-                        "description": bug.get("verified_description") or bug.get("original_description"),
-                        "severity": bug.get("verified_severity") or bug.get("original_severity", "medium"),
-                        "bug_type": bug.get("verified_bug_type") or bug.get("original_bug_type", "unknown"),
-                    }
-                    bugs.append(bug_entry)
-                    
-                    # Update stats
-                    output["stats"]["bugs_by_verdict"][verdict] = output["stats"]["bugs_by_verdict"].get(verdict, 0) + 1
-                    
-                    bug_type = bug_entry["bug_type"]
-                    output["stats"]["bugs_by_type"][bug_type] = output["stats"]["bugs_by_type"].get(bug_type, 0) + 1
-                    
-                    severity = bug_entry["severity"]
-                    output["stats"]["bugs_by_severity"][severity] = output["stats"]["bugs_by_severity"].get(severity, 0) + 1
-            
-            # Add any newly discovered bugs
-            for new_bug in reval.get("newly_discovered_bugs", []):
-                bug_entry = {
-                    "id": f"new_{len(bugs) + 1}",
-                    "file": new_bug.get("file"),
-                    "line": new_bug.get("line"),
-                    "description": new_bug.get("description"),
-                    "severity": new_bug.get("severity", "medium"),
-                    "bug_type": new_bug.get("bug_type", "unknown"),
-                    "newly_discovered": True
-                }
-                bugs.append(bug_entry)
-                
-                bug_type = bug_entry["bug_type"]
-                output["stats"]["bugs_by_type"][bug_type] = output["stats"]["bugs_by_type"].get(bug_type, 0) + 1
-                
-                severity = bug_entry["severity"]
-                output["stats"]["bugs_by_severity"][severity] = output["stats"]["bugs_by_severity"].get(severity, 0) + 1
+            pr_entry, rows = golden_pr_entry(reval, pr_number, pr_titles.get(pr_number, f"PR #{pr_number}"))
+            for row in rows:
+                table.append(repo=repo, pr=pr_number, **row)
             
-            # Add reversed false positives as bugs
-            for fp in reval.get("false_positive_verdicts", []):
-                if fp.get("verdict") == "actually_real_bug":
-                    bug_entry = {
-                        "id": f"fp_reversed_{len(bugs) + 1}",
-                        "file": fp.get("file", ""),
-                        "line": fp.get("line"),
-                        "description": fp.get("original_comment"),
-                        "severity": fp.get("severity", "medium"),
-                        "bug_type": fp.get("bug_type", "unknown"),
-                        "from_reversed_false_positive": True
-                    }
-                    bugs.append(bug_entry)
-            
-            if bugs:
-                pr_entry = {
-                    "pr_number": pr_number,
-                    "pr_title": pr_title,
-                    "bug_count": len(bugs),
-                    "bugs": bugs
-                }
+            if pr_entry:
                 repo_data["prs"].append(pr_entry)
-                repo_data["bug_count"] += len(bugs)
+                repo_data["bug_count"] += pr_entry["bug_count"]
                 repo_data["pr_count"] += 1
         
         output["repos"][repo] = repo_data
         output["stats"]["total_prs"] += repo_data["pr_count"]
         output["stats"]["total_bugs"] += repo_data["bug_count"]
     
+    output["stats"].update(aggregate_stats(table))
+    
     return output
 
 
@@ -247,22 +292,29 @@ def print_summary(repo_summaries: dict[str, dict], golden: dict) -> None:
 
 
 def main():
+    argparse.ArgumentParser(description="Finalize Golden Comments v2 from revalidation results.").parse_args()
+    
     print("Finalizing Golden Comments v2...")
     print(f"Reading from: {VALIDATION_DIR}")
     
+    # Refuse to build from malformed hand-edited files
+    require_valid_tree([VALIDATION_DIR])
+    
+    manifest = load_manifest()
+    
     # Step 1: Generate repo summaries
     print("\n--- Generating Repo Summaries ---")
     repo_summaries = {}
-    for repo in REPOS:
+    for repo in manifest["projects"]:
         print(f"\nProcessing {repo}...")
-        summary = generate_repo_summary(repo)
+        summary = generate_repo_summary(repo, get_pr_numbers(manifest, repo))
         output_path = save_repo_summary(repo, summary)
         repo_summaries[repo] = summary
         print(f"  Saved summary to: {output_path}")
     
     # Step 2: Build golden_comments_v2.json
     print("\n--- Building Golden Comments v2 ---")
-    golden = build_golden_comments_v2()
+    golden = build_golden_comments_v2(manifest)
     
     with open(OUTPUT_PATH, "w") as f:
         json.dump(golden, f, indent=2)
@@ -5,18 +5,18 @@ Usage: python3 scripts/generate_results_markdown.py <run_name> [baseline_run_nam
 Example: python3 scripts/generate_results_markdown.py run_2026-01-14-v2 run_2026-01-14
 """
 
-import json
-import os
 import sys
 from datetime import datetime
 
+from eval_format import load_eval
+from paths import run_dir
+from timings_format import latency_table, load_timings, pr_latency_table
+
 def load_eval_json(run_name: str) -> dict:
     """Load evaluation JSON for a run."""
-    path = os.path.expanduser(f"~/review-droid-benchmark/results/{run_name}/sentry_eval.json")
-    with open(path) as f:
-        return json.load(f)
+    return load_eval(run_dir(run_name) / "sentry_eval.json")
 
-def generate_results_md(run_name: str, eval_data: dict, baseline_data: dict = None) -> str:
+def generate_results_md(run_name: str, eval_data: dict, baseline_data: dict = None, timings: dict = None) -> str:
     """Generate RESULTS.md content."""
     
     lines = [
@@ -56,6 +56,14 @@ def generate_results_md(run_name: str, eval_data: dict, baseline_data: dict = No
             f"| **F-Score** | {summary['f_score']}% |",
         ])
     
+    if timings:
+        lines.extend(["", "## Review Latency", ""])
+        lines.extend(latency_table(timings, {eval_data.get("repo"): summary}))
+        repo_timings = timings["repos"].get(eval_data.get("repo"))
+        if repo_timings:
+            lines.extend(["", "### Per-PR Timings", ""])
+            lines.extend(pr_latency_table(repo_timings))
+    
     lines.extend([
         "",
         "## Per-PR Breakdown",
@@ -187,6 +195,7 @@ def generate_readme_md(run_name: str, eval_data: dict, config_notes: str = None)
         "├── sentry_eval.json                    # Full evaluation data",
         "├── golden_comments.json                # Golden comments for reference",
         "├── pr_*_comments.json                  # Raw PR comments from GitHub",
+        "├── review_timings.json                 # Per-PR review latency from the Actions API",
         "└── raw_comments/",
         "    ├── droid-sentry.json              # Consolidated droid comments",
         "    └── golden_sentry.json             # Golden comments in eval format",
@@ -212,9 +221,9 @@ def generate_readme_md(run_name: str, eval_data: dict, config_notes: str = None)
     return "\n".join(lines)
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python3 generate_results_markdown.py <run_name> [baseline_run_name]")
-        sys.exit(1)
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        print(__doc__.strip())
+        sys.exit(0 if len(sys.argv) > 1 else 1)
     
     run_name = sys.argv[1]
     baseline_name = sys.argv[2] if len(sys.argv) > 2 else None
@@ -224,15 +233,15 @@ def main():
     baseline_data = load_eval_json(baseline_name) if baseline_name else None
     
     # Generate RESULTS.md
-    results_md = generate_results_md(run_name, eval_data, baseline_data)
-    results_path = os.path.expanduser(f"~/review-droid-benchmark/results/{run_name}/RESULTS.md")
+    results_md = generate_results_md(run_name, eval_data, baseline_data, load_timings(run_dir(run_name)))
+    results_path = run_dir(run_name) / "RESULTS.md"
     with open(results_path, "w") as f:
         f.write(results_md)
     print(f"Generated: {results_path}")
     
     # Generate README.md
     readme_md = generate_readme_md(run_name, eval_data)
-    readme_path = os.path.expanduser(f"~/review-droid-benchmark/results/{run_name}/README.md")
+    readme_path = run_dir(run_name) / "README.md"
     with open(readme_path, "w") as f:
         f.write(readme_md)
     print(f"Generated: {readme_path}")
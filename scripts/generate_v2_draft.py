@@ -6,17 +6,19 @@ Reads all pr_{N}_completeness.json files and generates a consolidated
 golden_comments_v2_draft.json per repo for revalidation.
 """
 
+import argparse
 import json
 import os
 from pathlib import Path
 from typing import Any
 
-BASE_DIR = Path(__file__).parent.parent
+from bug_table import BugTable, resolve_found_by
+from paths import BASE_DIR
+from validate_ground_truth import require_valid_tree
+
 VALIDATION_DIR = BASE_DIR / "results" / "ground_truth_validation" / "run_2026-01-15"
 MANIFEST_PATH = BASE_DIR / "manifest.json"
 
-REPOS = ["sentry", "grafana", "keycloak", "discourse", "cal_dot_com"]
-
 
 def load_manifest() -> dict[str, Any]:
     with open(MANIFEST_PATH) as f:
@@ -42,83 +44,72 @@ def load_completeness_file(repo: str, pr_number: int) -> dict[str, Any] | None:
         return json.load(f)
 
 
-def get_pr_numbers_for_repo(repo: str) -> list[int]:
+def get_pr_numbers_for_repo(manifest: dict, repo: str) -> list[int]:
     """Get PR numbers for a repo based on manifest."""
-    manifest = load_manifest()
     prs = manifest["projects"][repo]["prs"]
     return sorted([pr["number"] for pr in prs])
 
 
-def generate_draft_for_repo(repo: str) -> dict[str, Any]:
-    """Generate draft golden comments v2 for a single repo."""
-    manifest = load_manifest()
-    pr_numbers = get_pr_numbers_for_repo(repo)
+def draft_pr_entry(completeness: dict[str, Any], pr_number: int, pr_title: str) -> dict[str, Any]:
+    """One PR's draft entry; ``pr_title`` is the fallback when the completeness file has none."""
+    # Extract ground truth bugs with source attribution
+    bugs = []
+    ground_truth_bugs = completeness.get("ground_truth_bugs", [])
+    droid_found = set(completeness.get("droid_metrics", {}).get("bugs_found", []))
+    golden_found = set(completeness.get("golden_metrics", {}).get("bugs_found", []))
+    
+    for bug in ground_truth_bugs:
+        bug_id = bug.get("id")
+        found_by = resolve_found_by(bug, droid_found, golden_found)
+        
+        bugs.append({
+            "id": bug_id,
+            "description": bug.get("description", ""),
+            "file": bug.get("file", ""),
+            "line": bug.get("line"),
+            "severity": bug.get("severity", "medium"),
+            "bug_type": bug.get("bug_type") or bug.get("type", "unknown"),
+            "found_by": found_by,
+            "details": bug.get("details", "")
+        })
     
-    draft = {
+    # Extract false positives
+    false_positives = completeness.get("golden_false_positives", [])
+    
+    return {
+        "pr_number": pr_number,
+        "pr_title": completeness.get("pr_title") or pr_title,
+        "bug_count": len(bugs),
+        "false_positive_count": len(false_positives),
+        "ground_truth_bugs": bugs,
+        "original_false_positives": false_positives
+    }
+
+
+def draft_header(repo: str) -> dict[str, Any]:
+    return {
         "repo": repo,
         "generated_from": "ground_truth_validation/run_2026-01-15",
         "total_bugs": 0,
         "total_false_positives": 0,
         "prs": []
     }
+
+
+def generate_draft_for_repo(manifest: dict, repo: str) -> dict[str, Any]:
+    """Generate draft golden comments v2 for a single repo."""
+    pr_numbers = get_pr_numbers_for_repo(manifest, repo)
+    draft = draft_header(repo)
     
     for pr_number in pr_numbers:
         completeness = load_completeness_file(repo, pr_number)
         if not completeness:
             continue
         
-        pr_title = completeness.get("pr_title") or get_pr_title(manifest, repo, pr_number)
-        
-        # Extract ground truth bugs with source attribution
-        bugs = []
-        ground_truth_bugs = completeness.get("ground_truth_bugs", [])
-        droid_found = set(completeness.get("droid_metrics", {}).get("bugs_found", []))
-        golden_found = set(completeness.get("golden_metrics", {}).get("bugs_found", []))
-        
-        for bug in ground_truth_bugs:
-            bug_id = bug.get("id")
-            
-            # Determine source
-            if bug.get("found_by"):
-                found_by = bug["found_by"]
-            else:
-                in_droid = bug_id in droid_found
-                in_golden = bug_id in golden_found
-                if in_droid and in_golden:
-                    found_by = "both"
-                elif in_droid:
-                    found_by = "droid_only"
-                elif in_golden:
-                    found_by = "golden_only"
-                else:
-                    found_by = "unknown"
-            
-            bugs.append({
-                "id": bug_id,
-                "description": bug.get("description", ""),
-                "file": bug.get("file", ""),
-                "line": bug.get("line"),
-                "severity": bug.get("severity", "medium"),
-                "bug_type": bug.get("bug_type") or bug.get("type", "unknown"),
-                "found_by": found_by,
-                "details": bug.get("details", "")
-            })
-        
-        # Extract false positives
-        false_positives = completeness.get("golden_false_positives", [])
-        
-        pr_entry = {
-            "pr_number": pr_number,
-            "pr_title": pr_title,
-            "bug_count": len(bugs),
-            "false_positive_count": len(false_positives),
-            "ground_truth_bugs": bugs,
-            "original_false_positives": false_positives
-        }
-        
+        pr_entry = draft_pr_entry(completeness, pr_number, get_pr_title(manifest, repo, pr_number))
         draft["prs"].append(pr_entry)
-        draft["total_bugs"] += len(bugs)
-        draft["total_false_positives"] += len(false_positives)
+        draft["total_bugs"] += pr_entry["bug_count"]
+        draft["total_false_positives"] += pr_entry["false_positive_count"]
     
     return draft
 
@@ -131,6 +122,27 @@ def save_draft(repo: str, draft: dict[str, Any]) -> Path:
     return output_path
 
 
+def build_draft_table(drafts: dict[str, dict]) -> BugTable:
+    """Load every draft bug into a bug table for aggregation."""
+    table = BugTable()
+    for repo, draft in drafts.items():
+        for pr in draft["prs"]:
+            for bug in pr["ground_truth_bugs"]:
+                table.append(
+                    repo=repo,
+                    pr=pr["pr_number"],
+                    bug_id=bug["id"],
+                    file=bug["file"],
+                    line=bug["line"],
+                    severity=bug["severity"],
+                    bug_type=bug["bug_type"],
+                    found_by=bug["found_by"],
+                    verdict="pending",
+                    origin="completeness",
+                )
+    return table
+
+
 def print_summary(drafts: dict[str, dict]) -> None:
     """Print summary statistics."""
     print("\n" + "=" * 60)
@@ -141,6 +153,9 @@ def print_summary(drafts: dict[str, dict]) -> None:
     total_fps = 0
     total_prs = 0
     
+    # Count by source for every repo in one pass
+    by_source = build_draft_table(drafts).group_count(["repo", "found_by"])
+    
     for repo, draft in drafts.items():
         bugs = draft["total_bugs"]
         fps = draft["total_false_positives"]
@@ -154,14 +169,9 @@ def print_summary(drafts: dict[str, dict]) -> None:
         print(f"  Total bugs: {bugs}")
         print(f"  False positives to re-check: {fps}")
         
-        # Count by source
-        both = sum(1 for pr in draft["prs"] for b in pr["ground_truth_bugs"] if b["found_by"] == "both")
-        droid_only = sum(1 for pr in draft["prs"] for b in pr["ground_truth_bugs"] if b["found_by"] == "droid_only")
-        golden_only = sum(1 for pr in draft["prs"] for b in pr["ground_truth_bugs"] if b["found_by"] == "golden_only")
-        
-        print(f"  Found by both: {both}")
-        print(f"  Droid-only (added): {droid_only}")
-        print(f"  Golden-only: {golden_only}")
+        print(f"  Found by both: {by_source.get((repo, 'both'), 0)}")
+        print(f"  Droid-only (added): {by_source.get((repo, 'droid_only'), 0)}")
+        print(f"  Golden-only: {by_source.get((repo, 'golden_only'), 0)}")
     
     print("\n" + "-" * 60)
     print(f"TOTAL: {total_prs} PRs, {total_bugs} bugs, {total_fps} false positives to re-check")
@@ -169,14 +179,20 @@ def print_summary(drafts: dict[str, dict]) -> None:
 
 
 def main():
+    argparse.ArgumentParser(description="Generate Golden Comments v2 draft files from the validation tree.").parse_args()
+    
     print("Generating Golden Comments v2 Draft files...")
     print(f"Reading from: {VALIDATION_DIR}")
     
+    # Refuse to build from malformed hand-edited files
+    require_valid_tree([VALIDATION_DIR])
+    
+    manifest = load_manifest()
     drafts = {}
     
-    for repo in REPOS:
+    for repo in manifest["projects"]:
         print(f"\nProcessing {repo}...")
-        draft = generate_draft_for_repo(repo)
+        draft = generate_draft_for_repo(manifest, repo)
         output_path = save_draft(repo, draft)
         drafts[repo] = draft
         print(f"  Saved to: {output_path}")
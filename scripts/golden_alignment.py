@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Align v1 golden comments to v2 golden bugs.
+
+Every v1 comment is mapped to the v2 bug it became, or marked as removed
+(confirmed false positive, rejected during revalidation, or unmatched).
+False positives and rejected bugs are aligned the same way as v2 bugs, since
+their recorded text is often a truncated or reworded copy of the v1 comment.
+
+Candidates come from MinHash signatures bucketed with LSH banding, plus the
+comment's own PR; only those candidates are scored exactly (IDF-weighted token
+overlap, PR and file/line agreement). Cost grows with the number of candidate
+pairs rather than v1 x v2, so the same code handles tens of thousands of
+comments.
+
+Usage: python3 scripts/golden_alignment.py [--v1-dir DIR] [--output PATH]
+       python3 scripts/golden_alignment.py --synthetic 20000
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+
+from minhash import LSHIndex, MinHasher, tokenize
+from paths import BASE_DIR
+
+VALIDATION_DIR = BASE_DIR / "results" / "ground_truth_validation" / "run_2026-01-15"
+GOLDEN_V2_PATH = BASE_DIR / "results" / "golden_comments_v2.json"
+V1_DIR = BASE_DIR / "repos" / "golden_comments" / "code_review_benchmarks"
+# Copies of the v1 files taken alongside each run
+V1_FALLBACK_DIR = BASE_DIR / "results" / "run_2026-01-15"
+OUTPUT_PATH = BASE_DIR / "results" / "golden_alignment_v1_v2.json"
+
+REPOS = ["sentry", "grafana", "keycloak", "discourse", "cal_dot_com"]
+
+# Buckets larger than this are dominated by generic tokens and skipped
+MAX_BUCKET = 64
+MATCH_THRESHOLD = 0.35
+
+
+@dataclass
+class Source:
+    """A v1 golden comment."""
+    repo: str
+    pr_title: str
+    comment: str
+    severity: str
+    pr_number: int | None = None
+    file: str | None = None
+    line: int | None = None
+
+
+@dataclass
+class Target:
+    """A v2 bug, a bug rejected during revalidation, or a confirmed false positive."""
+    repo: str
+    pr_number: int
+    bug_id: Any
+    status: str  # "kept", "rejected" or "false_positive"
+    texts: list[str]
+    file: str | None = None
+    line: int | None = None
+    tokens: list[set[str]] = field(default_factory=list)
+
+
+def _normalize_title(title: str) -> str:
+    return " ".join(title.lower().split())
+
+
+def _load_json(path: Path) -> Any:
+    with open(path) as f:
+        return json.load(f)
+
+
+def find_v1_path(repo: str, v1_dir: Path | None = None) -> Path | None:
+    """The v1 golden comments file for a repo, falling back to the run copy."""
+    for candidate in ([v1_dir / f"{repo}.json"] if v1_dir else []) + [
+        V1_DIR / f"{repo}.json",
+        V1_FALLBACK_DIR / repo / "golden_comments.json",
+    ]:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def load_v1_repo(repo: str, v1_dir: Path | None = None) -> list[dict]:
+    """Load v1 golden comments for a repo, falling back to the run copy."""
+    path = find_v1_path(repo, v1_dir)
+    if path is None:
+        raise FileNotFoundError(f"No v1 golden comments found for {repo}")
+    return _load_json(path)
+
+
+def load_alignment_inputs(
+    v2_data: dict,
+    v1_by_repo: dict[str, list[dict]],
+    validation_dir: Path = VALIDATION_DIR,
+) -> tuple[list[Source], list[Target]]:
+    """Collect v1 sources and v2 / rejected / false-positive targets."""
+    sources: list[Source] = []
+    targets: list[Target] = []
+
+    for repo, v1_prs in v1_by_repo.items():
+        titles: dict[str, int] = {}
+        original_descriptions: dict[tuple[int, Any], str] = {}
+        audit_locations: dict[str, tuple[str, int | None]] = {}
+
+        for path in sorted(validation_dir.glob(f"{repo}/pr_*_revalidation.json")):
+            reval = _load_json(path)
+            pr_number = reval["pr_number"]
+            titles[_normalize_title(reval.get("pr_title", ""))] = pr_number
+            for verdict in reval.get("bug_verdicts", []):
+                original_descriptions[(pr_number, verdict.get("bug_id"))] = verdict.get("original_description", "")
+                if verdict.get("verdict") == "rejected":
+                    targets.append(Target(
+                        repo=repo,
+                        pr_number=pr_number,
+                        bug_id=verdict.get("bug_id"),
+                        status="rejected",
+                        texts=[t for t in (verdict.get("original_description"), verdict.get("verified_description")) if t],
+                        file=verdict.get("verified_file") or verdict.get("file"),
+                        line=verdict.get("verified_line") or verdict.get("line"),
+                    ))
+            for fp in reval.get("false_positive_verdicts", []):
+                if fp.get("verdict") == "confirmed_false_positive":
+                    targets.append(Target(
+                        repo=repo,
+                        pr_number=pr_number,
+                        bug_id=None,
+                        status="false_positive",
+                        texts=[fp.get("original_comment", "")],
+                    ))
+
+        for path in validation_dir.glob(f"{repo}/pr_*_golden_audits.json"):
+            for audit in _load_json(path):
+                location = audit.get("audit", {}).get("bug_location")
+                if isinstance(location, list):
+                    location = location[0] if location else None
+                if isinstance(location, dict):
+                    audit_locations[audit["golden_comment"].strip()] = (location.get("file"), location.get("line"))
+
+        for pr in v2_data["repos"].get(repo, {}).get("prs", []):
+            titles.setdefault(_normalize_title(pr["pr_title"]), pr["pr_number"])
+            for bug in pr["bugs"]:
+                texts = [bug.get("description") or ""]
+                original = original_descriptions.get((pr["pr_number"], bug.get("id")))
+                if original:
+                    texts.append(original)
+                targets.append(Target(
+                    repo=repo,
+                    pr_number=pr["pr_number"],
+                    bug_id=bug.get("id"),
+                    status="kept",
+                    texts=texts,
+                    file=bug.get("file"),
+                    line=bug.get("line"),
+                ))
+
+        for pr in v1_prs:
+            pr_number = titles.get(_normalize_title(pr["pr_title"]))
+            for comment in pr.get("comments", []):
+                location = audit_locations.get(comment["comment"].strip(), (None, None))
+                sources.append(Source(
+                    repo=repo,
+                    pr_title=pr["pr_title"],
+                    comment=comment["comment"],
+                    severity=comment.get("severity", ""),
+                    pr_number=pr_number,
+                    file=location[0],
+                    line=location[1],
+                ))
+
+    return sources, targets
+
+
+def _weighted_overlap(a: set[str], b: set[str], idf: dict[str, float]) -> float:
+    """IDF-weighted overlap coefficient (robust to very different lengths)."""
+    if not a or not b:
+        return 0.0
+    shared = sum(idf.get(t, 1.0) for t in a & b)
+    return shared / min(sum(idf.get(t, 1.0) for t in a), sum(idf.get(t, 1.0) for t in b))
+
+
+def score_pair(source: Source, source_tokens: set[str], target: Target, idf: dict[str, float]) -> float:
+    text = max(_weighted_overlap(source_tokens, t, idf) for t in target.tokens)
+    score = 0.75 * text
+    if source.pr_number is not None and source.pr_number == target.pr_number:
+        score += 0.15
+    if source.file and target.file and source.file == target.file:
+        score += 0.05
+        if source.line is not None and target.line is not None and abs(source.line - target.line) <= 10:
+            score += 0.05
+    return score
+
+
+def align(
+    sources: list[Source],
+    targets: list[Target],
+    threshold: float = MATCH_THRESHOLD,
+) -> tuple[list[dict], dict[str, Any]]:
+    """Map each source to its best target; returns (records, stats)."""
+    start = time.perf_counter()
+    hasher = MinHasher()
+
+    target_tokens_all = []
+    for target in targets:
+        target.tokens = [set(tokenize(text)) for text in target.texts] or [set()]
+        target_tokens_all.append(set().union(*target.tokens))
+    source_tokens = [set(tokenize(s.comment)) for s in sources]
+
+    # Smoothed IDF over every document on both sides
+    doc_freq: Counter = Counter()
+    for tokens in source_tokens + target_tokens_all:
+        doc_freq.update(tokens)
+    n_docs = len(source_tokens) + len(target_tokens_all)
+    idf = {t: math.log((n_docs + 1) / (df + 1)) + 1.0 for t, df in doc_freq.items()}
+
+    # One LSH index per repo; a target is indexed once per text
+    indexes: dict[str, LSHIndex] = defaultdict(lambda: LSHIndex(max_bucket=MAX_BUCKET))
+    by_pr: dict[tuple[str, int], list[int]] = defaultdict(list)
+    for i, target in enumerate(targets):
+        for tokens in target.tokens:
+            indexes[target.repo].add(i, hasher.signature(tokens))
+        by_pr[(target.repo, target.pr_number)].append(i)
+
+    records = []
+    pairs_scored = 0
+    lsh_only_matches = 0
+    for source, tokens in zip(sources, source_tokens):
+        record = {
+            "repo": source.repo,
+            "pr_number": source.pr_number,
+            "pr_title": source.pr_title,
+            "v1_comment": source.comment,
+            "v1_severity": source.severity,
+        }
+        candidates = indexes[source.repo].query(hasher.signature(tokens)) if source.repo in indexes else set()
+        same_pr = set(by_pr.get((source.repo, source.pr_number), ()))
+        candidates |= same_pr
+        pairs_scored += len(candidates)
+
+        best, best_score = None, 0.0
+        for i in candidates:
+            score = score_pair(source, tokens, targets[i], idf)
+            if score > best_score:
+                best, best_score = i, score
+
+        if best is None or best_score < threshold:
+            records.append({**record, "status": "removed", "v2_pr_number": None, "v2_bug_id": None,
+                            "rejected_bug_id": None, "score": round(best_score, 3) if best is not None else None})
+            continue
+
+        target = targets[best]
+        if target.pr_number != source.pr_number:
+            lsh_only_matches += 1
+        records.append({
+            **record,
+            # Usually the source's own PR; differs on a cross-PR (LSH-only) match
+            "v2_pr_number": target.pr_number,
+            "status": target.status,
+            "v2_bug_id": target.bug_id if target.status == "kept" else None,
+            "rejected_bug_id": target.bug_id if target.status == "rejected" else None,
+            "score": round(best_score, 3),
+        })
+
+    stats = {
+        "sources": len(sources),
+        "targets": len(targets),
+        "pairs_scored": pairs_scored,
+        "all_pairs": len(sources) * len(targets),
+        "cross_pr_matches": lsh_only_matches,
+        "elapsed_seconds": round(time.perf_counter() - start, 3),
+    }
+    return records, stats
+
+
+def unmatched_v2_bugs(records: list[dict], v2_data: dict) -> list[dict]:
+    """v2 bugs that no v1 comment aligned to (added during validation)."""
+    matched = {(r["repo"], r["v2_pr_number"], r["v2_bug_id"]) for r in records if r["status"] == "kept"}
+    added = []
+    for repo, repo_data in v2_data["repos"].items():
+        for pr in repo_data["prs"]:
+            for bug in pr["bugs"]:
+                if (repo, pr["pr_number"], bug.get("id")) not in matched:
+                    added.append({"repo": repo, "pr_number": pr["pr_number"], "v2_bug_id": bug.get("id"),
+                                  "description": bug.get("description")})
+    return added
+
+
+def build_alignment(v2_data: dict, v1_dir: Path | None = None, repos: Sequence[str] = REPOS) -> dict[str, Any]:
+    """Align every v1 comment across ``repos`` and summarise per repo."""
+    v1_paths = {repo: find_v1_path(repo, v1_dir) for repo in repos}
+    v1_by_repo = {repo: load_v1_repo(repo, v1_dir) for repo in repos}
+    sources, targets = load_alignment_inputs(v2_data, v1_by_repo)
+    records, stats = align(sources, targets)
+    added = unmatched_v2_bugs(records, v2_data)
+
+    by_repo = {}
+    for repo in repos:
+        counts = Counter(r["status"] for r in records if r["repo"] == repo)
+        by_repo[repo] = {
+            "v1_comments": sum(counts.values()),
+            "kept": counts["kept"],
+            "rejected": counts["rejected"],
+            "false_positive": counts["false_positive"],
+            "removed": counts["removed"],
+            "v2_bugs": v2_data["repos"][repo]["bug_count"],
+            "v2_added": sum(1 for a in added if a["repo"] == repo),
+        }
+
+    # Where v1 came from, so reports can tell the original files from the run copies
+    v1_sources = {}
+    for repo, path in v1_paths.items():
+        try:
+            v1_sources[repo] = str(path.resolve().relative_to(BASE_DIR.resolve()))
+        except ValueError:
+            v1_sources[repo] = str(path)
+
+    return {"stats": stats, "by_repo": by_repo, "alignments": records, "v2_added": added,
+            "v1_sources": v1_sources, "v1_fallback": any(path.is_relative_to(V1_FALLBACK_DIR) for path in v1_paths.values())}
+
+
+def synthetic_benchmark(n_sources: int, seed: int = 7) -> dict[str, Any]:
+    """Time alignment on a synthetic corpus with ``n_sources`` v1 comments.
+
+    Documents are drawn from the real v2 vocabulary; each source is a noisy
+    excerpt of one target so the expected mapping is known.
+    """
+    rng = random.Random(seed)
+    v2_data = _load_json(GOLDEN_V2_PATH)
+    vocab = sorted({t for repo in v2_data["repos"].values() for pr in repo["prs"]
+                    for bug in pr["bugs"] for t in tokenize(bug.get("description", ""))})
+    n_prs = max(1, n_sources // 3)
+
+    targets, sources, expected = [], [], []
+    for i in range(n_sources):
+        pr_number = i % n_prs
+        words = rng.sample(vocab, 25)
+        targets.append(Target(repo="synthetic", pr_number=pr_number, bug_id=i, status="kept",
+                              texts=[" ".join(words)]))
+        excerpt = rng.sample(words, 8) + rng.sample(vocab, 2)
+        # A fifth of the sources carry a wrong PR so only LSH can recover them
+        source_pr = pr_number if rng.random() > 0.2 else (pr_number + 1) % n_prs
+        sources.append(Source(repo="synthetic", pr_title=str(source_pr), comment=" ".join(excerpt),
+                              severity="Medium", pr_number=source_pr))
+        expected.append(i)
+
+    records, stats = align(sources, targets)
+    correct = sum(1 for r, e in zip(records, expected) if r["v2_bug_id"] == e)
+    stats["accuracy"] = round(correct / n_sources, 4)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Align v1 golden comments to v2 bugs.")
+    parser.add_argument("--v1-dir", type=Path, default=None, help="Directory with v1 {repo}.json files")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Benchmark on N synthetic comments instead")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        stats = synthetic_benchmark(args.synthetic)
+        print(json.dumps(stats, indent=2))
+        return
+
+    alignment = build_alignment(_load_json(GOLDEN_V2_PATH), args.v1_dir)
+    with open(args.output, "w") as f:
+        json.dump(alignment, f, indent=2)
+
+    print(f"{'Repo':<12} {'v1':>4} {'kept':>5} {'rejected':>9} {'false_pos':>10} {'removed':>8} {'v2':>4} {'added':>6}")
+    for repo, s in alignment["by_repo"].items():
+        print(f"{repo:<12} {s['v1_comments']:>4} {s['kept']:>5} {s['rejected']:>9} {s['false_positive']:>10} "
+              f"{s['removed']:>8} {s['v2_bugs']:>4} {s['v2_added']:>6}")
+    stats = alignment["stats"]
+    print(f"\nScored {stats['pairs_scored']} of {stats['all_pairs']} possible pairs in {stats['elapsed_seconds']}s")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
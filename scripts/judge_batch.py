@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Message Batches submission for whole-run judging.
+
+Every judge request of a run is compiled into one asynchronous batch
+(custom_id = ``pr<N>-<comment index>``). The job polls until the batch
+ends, then downloads the results and maps them back by custom_id. Batch
+requests are billed at half the interactive price and are not subject to
+client-side concurrency limits, at the cost of latency (usually minutes, up
+to 24h).
+
+Progress is kept in a state file next to the run's outputs (batch id,
+request fingerprint, status, downloaded results), so a restarted run resumes
+polling the same batch instead of submitting a new one. A changed request
+set (different prompts, model or comments) starts a new batch, and requests
+that errored or expired are retried in a fresh batch on the next run.
+
+For local testing, ``standin`` serves the Message Batches endpoints over HTTP
+with a deterministic word-overlap "judge"; point the SDK at it with
+ANTHROPIC_BASE_URL.
+
+Usage: python3 scripts/judge_batch.py standin [--port 8765] [--polls 2] [--error-rate 0.0]
+Example: python3 scripts/judge_batch.py standin --port 8765 &
+         ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=test \\
+             python3 scripts/evaluate_sentry_run.py run_2026-01-14-v3 --batch --poll-interval=1
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+from judge_client import backoff_delay, classify_error, retry_after_seconds
+
+POLL_INTERVAL = 60.0
+MAX_BATCH_REQUESTS = 100_000
+MAX_POLL_ERRORS = 10
+
+
+class BatchError(Exception):
+    pass
+
+
+def custom_id(pr_number: int, index: int) -> str:
+    return f"pr{pr_number}-{index}"
+
+
+def batch_request(request_id: str, prompt: str, model: str, max_tokens: int = 500) -> dict:
+    return {
+        "custom_id": request_id,
+        "params": {"model": model, "max_tokens": max_tokens, "messages": [{"role": "user", "content": prompt}]},
+    }
+
+
+def fingerprint(prompts: dict[str, str], model: str) -> str:
+    digest = hashlib.sha256(model.encode())
+    for request_id in sorted(prompts):
+        digest.update(request_id.encode() + b"\0" + prompts[request_id].encode() + b"\0")
+    return digest.hexdigest()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class BatchJob:
+    """Submits (or resumes) one batch, polls it to completion and collects the results."""
+
+    def __init__(self, client: Any, state_path: str | Path, poll_interval: float = POLL_INTERVAL,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.client = client
+        self.state_path = Path(state_path)
+        self.poll_interval = poll_interval
+        self.sleep = sleep
+        self.state: dict[str, Any] = {}
+
+    def _save(self) -> None:
+        tmp = self.state_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.state, f, indent=2)
+        tmp.replace(self.state_path)
+
+    def _api(self, fn: Callable, *args, **kwargs) -> Any:
+        """Call a batches endpoint, retrying transient errors (polling can run for hours)."""
+        for attempt in range(1, MAX_POLL_ERRORS + 1):
+            try:
+                return fn(*args, **kwargs)
+            except Exception as exc:
+                if classify_error(exc) == "fatal" or attempt == MAX_POLL_ERRORS:
+                    raise
+                delay = retry_after_seconds(exc) or backoff_delay(attempt, cap=self.poll_interval or 1.0)
+                print(f"  batch API error ({type(exc).__name__}); retrying in {delay:.1f}s")
+                self.sleep(delay)
+
+    def run(self, prompts: dict[str, str], model: str, meta: dict[str, dict] | None = None) -> dict[str, dict]:
+        """custom_id -> result record ({"type", "text", "usage"} or {"type", "error"})."""
+        if len(prompts) > MAX_BATCH_REQUESTS:
+            raise BatchError(f"{len(prompts)} requests exceed the batch limit of {MAX_BATCH_REQUESTS}")
+        fp = fingerprint(prompts, model)
+        if self.state_path.exists():
+            previous = json.loads(self.state_path.read_text())
+            if previous.get("fingerprint") == fp and previous.get("batch_id"):
+                self.state = previous
+                results = self.state.get("results")
+                if results is None:
+                    print(f"Resuming batch {self.state['batch_id']} (submitted {self.state['submitted_at']})")
+                else:
+                    failed = [r for r in prompts if results.get(r, {}).get("type") != "succeeded"]
+                    if not failed:
+                        print(f"Batch {self.state['batch_id']}: results already downloaded")
+                        return results
+                    print(f"Retrying {len(failed)} failed request(s) of batch {self.state['batch_id']} in a new batch")
+                    carried = {r: v for r, v in results.items() if v.get("type") == "succeeded"}
+                    self.submit({r: prompts[r] for r in failed}, model, fp, meta or {}, carried,
+                                [*self.state.get("previous_batches", []), self.state["batch_id"]])
+            else:
+                print(f"Requests changed since batch {previous.get('batch_id')}; submitting a new batch")
+        if not self.state:
+            self.submit(prompts, model, fp, meta or {})
+        self.wait()
+        return self.collect()
+
+    def submit(self, prompts: dict[str, str], model: str, fp: str, meta: dict[str, dict],
+               carried: dict[str, dict] | None = None, previous_batches: list[str] | None = None) -> None:
+        """Submit ``prompts``; ``carried`` results (of earlier batches) are merged in on collect."""
+        requests = [batch_request(request_id, prompt, model) for request_id, prompt in prompts.items()]
+        batch = self._api(self.client.messages.batches.create, requests=requests)
+        self.state = {
+            "batch_id": batch.id,
+            "model": model,
+            "fingerprint": fp,
+            "submitted_at": _now(),
+            "requests": meta,
+            "previous_batches": previous_batches or [],
+            "carried_results": carried or {},
+            "processing_status": batch.processing_status,
+            "request_counts": None,
+            "results": None,
+        }
+        self._save()
+        print(f"Submitted batch {batch.id} with {len(requests)} requests")
+
+    def wait(self) -> None:
+        batch_id = self.state["batch_id"]
+        while True:
+            batch = self._api(self.client.messages.batches.retrieve, batch_id)
+            counts = batch.request_counts
+            self.state["processing_status"] = batch.processing_status
+            self.state["request_counts"] = {
+                name: getattr(counts, name, 0) for name in ("processing", "succeeded", "errored", "canceled", "expired")
+            }
+            self._save()
+            c = self.state["request_counts"]
+            print(f"  {batch_id}: {batch.processing_status} "
+                  f"({c['succeeded']} succeeded, {c['errored']} errored, {c['processing']} processing)")
+            if batch.processing_status == "ended":
+                return
+            self.sleep(self.poll_interval)
+
+    def collect(self) -> dict[str, dict]:
+        results = dict(self.state.get("carried_results", {}))
+        for entry in self._api(self.client.messages.batches.results, self.state["batch_id"]):
+            result = entry.result
+            if result.type == "succeeded":
+                message = result.message
+                results[entry.custom_id] = {
+                    "type": "succeeded",
+                    "text": message.content[0].text if message.content else "",
+                    "usage": {"input_tokens": message.usage.input_tokens, "output_tokens": message.usage.output_tokens},
+                }
+            else:
+                error = getattr(getattr(result, "error", None), "error", None)
+                results[entry.custom_id] = {"type": result.type, "error": getattr(error, "type", None)}
+        self.state["results"] = results
+        self.state["collected_at"] = _now()
+        self._save()
+        return results
+
+
+# ---------------------------------------------------------------------------
+# Local stand-in for the Message Batches endpoints
+# ---------------------------------------------------------------------------
+
+_WORD = re.compile(r"[a-z_][a-z0-9_]{2,}")
+
+
+def standin_verdict(prompt: str) -> dict:
+    """Deterministic judge: best word-overlap golden comment above a threshold."""
+    golden_part = prompt.split("GOLDEN COMMENTS", 1)[-1].split("DROID'S COMMENT:", 1)[0]
+    droid_part = prompt.split("DROID'S COMMENT:", 1)[-1].split("CODE CONTEXT", 1)[0].split("Does Droid's comment", 1)[0]
+    droid_words = set(_WORD.findall(droid_part.lower()))
+    best, best_score = None, 0.0
+    for line in golden_part.splitlines():
+        match = re.match(r"- \[(\w+)\] (.*)", line.strip())
+        if not match:
+            continue
+        words = set(_WORD.findall(match.group(2).lower()))
+        score = len(words & droid_words) / len(words | droid_words) if words | droid_words else 0.0
+        if score > best_score:
+            best, best_score = match, score
+    matches = best is not None and best_score >= 0.2
+    return {
+        "matches": matches,
+        "matched_golden_comment": f"[{best.group(1)}] {best.group(2)}" if matches else None,
+        "matched_severity": best.group(1) if matches else None,
+        "confidence": "high" if best_score >= 0.4 or best_score < 0.05 else "medium",
+        "reasoning": f"stand-in judge: word overlap {best_score:.2f}",
+    }
+
+
+class StandinBatches:
+    """In-memory batch store; a batch ends after ``polls`` retrieves."""
+
+    def __init__(self, polls: int = 2, error_rate: float = 0.0, seed: int = 0):
+        self.polls = polls
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.batches: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+    def create(self, requests: list[dict]) -> dict:
+        with self.lock:
+            batch_id = f"msgbatch_standin_{len(self.batches) + 1:04d}"
+            created = datetime.now(timezone.utc)
+            self.batches[batch_id] = {"requests": requests, "retrieves": 0, "created": created, "results": None}
+        return self.describe(batch_id, "")
+
+    def describe(self, batch_id: str, base_url: str) -> dict:
+        batch = self.batches[batch_id]
+        ended = batch["retrieves"] >= self.polls
+        if ended and batch["results"] is None:
+            batch["results"] = [self._result(r) for r in batch["requests"]]
+        n = len(batch["requests"])
+        errored = sum(r["result"]["type"] == "errored" for r in batch["results"] or [])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {"processing": 0 if ended else n, "succeeded": n - errored if ended else 0,
+                               "errored": errored, "canceled": 0, "expired": 0},
+            "created_at": batch["created"].isoformat(),
+            "expires_at": (batch["created"] + timedelta(hours=24)).isoformat(),
+            "ended_at": datetime.now(timezone.utc).isoformat() if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def _result(self, request: dict) -> dict:
+        if self.rng.random() < self.error_rate:
+            return {"custom_id": request["custom_id"],
+                    "result": {"type": "errored", "error": {"type": "error",
+                                                            "error": {"type": "api_error", "message": "stand-in error"}}}}
+        params = request["params"]
+        prompt = params["messages"][0]["content"]
+        text = json.dumps(standin_verdict(prompt))
+        return {"custom_id": request["custom_id"], "result": {"type": "succeeded", "message": {
+            "id": f"msg_{request['custom_id']}", "type": "message", "role": "assistant", "model": params["model"],
+            "content": [{"type": "text", "text": text}], "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": len(prompt) // 4, "output_tokens": len(text) // 4},
+        }}}
+
+
+def make_standin_handler(store: StandinBatches) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _base_url(self) -> str:
+            return f"http://{self.headers.get('Host', '127.0.0.1')}"
+
+        def do_POST(self):
+            if self.path.rstrip("/").split("?")[0] != "/v1/messages/batches":
+                return self._send(404, b'{"type":"error","error":{"type":"not_found_error","message":"not found"}}')
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            batch = store.create(body["requests"])
+            self._send(200, json.dumps(batch).encode())
+
+        def do_GET(self):
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5) or parts[3] not in store.batches:
+                return self._send(404, b'{"type":"error","error":{"type":"not_found_error","message":"not found"}}')
+            batch_id = parts[3]
+            with store.lock:
+                if len(parts) == 4:
+                    store.batches[batch_id]["retrieves"] += 1
+                    return self._send(200, json.dumps(store.describe(batch_id, self._base_url())).encode())
+                results = store.batches[batch_id]["results"]
+            if results is None:
+                return self._send(404, b'{"type":"error","error":{"type":"not_found_error","message":"not ended"}}')
+            self._send(200, "".join(json.dumps(r) + "\n" for r in results).encode(), "application/binary")
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve_standin(port: int = 8765, polls: int = 2, error_rate: float = 0.0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_standin_handler(StandinBatches(polls, error_rate)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Message Batches API.")
+    parser.add_argument("command", choices=["standin"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--polls", type=int, default=2, help="Retrieves before a batch ends")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that error")
+    args = parser.parse_args()
+
+    server = serve_standin(args.port, args.polls, args.error_rate)
+    print(f"Stand-in batch endpoint on http://127.0.0.1:{args.port} (Ctrl-C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Budget-aware scheduling of judge calls.
+
+Work items are the comments that need their own judge call (cluster
+representatives). Each gets a cost estimate from its prompt size and is
+ordered so that the most valuable judgments happen first:
+
+  1. PRs whose golden comments include the highest severity (then PRs with
+     more golden comments),
+  2. within a PR, comments whose file matches a known v2 bug location, then
+     comments with any path/line, then the rest.
+
+Judging stops cleanly before the first item whose estimate would exceed the
+token or dollar budget; actual usage reported by the judge is what gets
+charged. Estimates charge the call's full max_tokens of output and, for a
+cascade, every tier (full escalation). Input tokens are counted from the
+prompt's characters at a conservative CHARS_PER_TOKEN, which is still only an
+estimate: an unusually token-dense prompt can take actual spend slightly past
+the budget.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+from judge_cascade import call_cost
+
+SEVERITY_RANK = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+# Below the ~3.5 of prose so code-heavy prompts are not undercounted
+CHARS_PER_TOKEN = 3.0
+
+
+@dataclass
+class Budget:
+    max_usd: float | None = None
+    max_tokens: int | None = None
+    spent_usd: float = 0.0
+    spent_tokens: int = 0
+    calls: int = 0
+    stopped: str | None = None
+    # Set when judging was cut short by Ctrl-C rather than the budget
+    interrupted: bool = False
+
+    def fits(self, est_tokens: int, est_usd: float) -> bool:
+        if self.max_tokens is not None and self.spent_tokens + est_tokens > self.max_tokens:
+            return False
+        if self.max_usd is not None and self.spent_usd + est_usd > self.max_usd:
+            return False
+        return True
+
+    def charge(self, usage_log: Iterable[dict]) -> None:
+        """Charge the judge_usage entries of one verdict."""
+        for entry in usage_log:
+            self.spent_tokens += entry.get("input_tokens", 0) + entry.get("output_tokens", 0)
+            self.spent_usd += call_cost(entry["model"], entry.get("input_tokens", 0), entry.get("output_tokens", 0),
+                                        entry.get("batch", False)) or 0.0
+            self.calls += 1
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "max_usd": self.max_usd,
+            "max_tokens": self.max_tokens,
+            "spent_usd": round(self.spent_usd, 4),
+            "spent_tokens": self.spent_tokens,
+            "judge_calls": self.calls,
+            "stopped": self.stopped,
+            "interrupted": self.interrupted,
+        }
+
+
+@dataclass
+class WorkItem:
+    pr_number: int
+    comment_index: int
+    comment_id: Any
+    priority: tuple
+    est_tokens: int
+    est_usd: float
+    members: list[int] = field(default_factory=list)
+    # Set when the judge call failed permanently (retries exhausted, fatal API error)
+    error: str | None = None
+
+
+def estimate(prompt: str, models: list[str], max_output_tokens: int,
+             extra_input_tokens: int = 0) -> tuple[int, float]:
+    """(tokens, USD) upper estimate for judging ``prompt`` with every model in ``models`` (a full cascade)."""
+    input_tokens = math.ceil(len(prompt) / CHARS_PER_TOKEN) + extra_input_tokens
+    usd = sum(call_cost(model, input_tokens, max_output_tokens) or 0.0 for model in models)
+    return (input_tokens + max_output_tokens) * len(models), usd
+
+
+def pr_priority(golden_comments: list[dict]) -> tuple[int, int]:
+    ranks = [SEVERITY_RANK.get(str(g.get("severity", "")).lower(), len(SEVERITY_RANK)) for g in golden_comments]
+    return (min(ranks, default=len(SEVERITY_RANK)), -len(golden_comments))
+
+
+def location_rank(comment: dict, golden_files: set[str]) -> int:
+    path = comment.get("path")
+    if path and any(path == f or f.endswith("/" + path) or path.endswith("/" + f) for f in golden_files):
+        return 0
+    if path and isinstance(comment.get("line"), int):
+        return 1
+    return 2
+
+
+def plan_work(
+    prs: list[dict],
+    clusters_by_pr: dict[int, list[list[int]]],
+    golden_by_title: dict[str, list[dict]],
+    golden_files_by_title: dict[str, set[str]],
+    prompt_for: Callable[[dict, dict], str],
+    models: list[str],
+    max_output_tokens: int,
+    extra_input_tokens: int = 0,
+    skip: Callable[[dict, dict], bool] | None = None,
+) -> list[WorkItem]:
+    """One WorkItem per cluster representative, in judging order."""
+    items = []
+    for pr in prs:
+        golden = golden_by_title.get(pr["title"], [])
+        files = golden_files_by_title.get(pr["title"], set())
+        comments = pr.get("review_comments", [])
+        for cluster in clusters_by_pr.get(pr["number"], []):
+            comment = comments[cluster[0]]
+            if skip and skip(pr, comment):
+                continue
+            tokens, usd = estimate(prompt_for(pr, comment), models, max_output_tokens, extra_input_tokens)
+            items.append(WorkItem(
+                pr_number=pr["number"],
+                comment_index=cluster[0],
+                comment_id=comment.get("id"),
+                priority=(*pr_priority(golden), pr["number"], location_rank(comment, files), cluster[0]),
+                est_tokens=tokens,
+                est_usd=usd,
+                members=cluster[1:],
+            ))
+    items.sort(key=lambda item: item.priority)
+    return items
+
+
+def coverage(prs: list[dict], judged: dict[int, set[int]]) -> dict[str, Any]:
+    """Comment and PR coverage given the judged comment indices per PR."""
+    total = sum(len(pr.get("review_comments", [])) for pr in prs)
+    done = sum(len(judged.get(pr["number"], ())) for pr in prs)
+    complete = partial = untouched = 0
+    for pr in prs:
+        n, k = len(pr.get("review_comments", [])), len(judged.get(pr["number"], ()))
+        if k == n:
+            complete += 1
+        elif k:
+            partial += 1
+        else:
+            untouched += 1
+    return {
+        "comments_judged": done,
+        "comments_total": total,
+        "comment_coverage_pct": round(100 * done / total, 1) if total else 100.0,
+        "prs_complete": complete,
+        "prs_partial": partial,
+        "prs_untouched": untouched,
+    }
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Cheap-model-first cascade judging, and an agreement report against full
+strong-model runs.
+
+Each droid comment is judged by the first tier; the verdict escalates to the
+next tier when its confidence is below the tier's ``accept_confidence`` or
+(with ``escalate_on_match``) when it is a positive match. The last tier's
+verdict is always final.
+
+Tiers are configured as a JSON list (see DEFAULT_TIERS), e.g.
+  [{"model": "claude-3-5-haiku-20241022", "accept_confidence": "high", "escalate_on_match": true},
+   {"model": "claude-sonnet-4-20250514"}]
+
+Usage: python3 scripts/judge_cascade.py <cascade_eval.json> <strong_eval.json> [--json]
+Example: python3 scripts/judge_cascade.py results/run_X-cascade/sentry_eval.json results/run_X/sentry_eval.json
+"""
+
+import argparse
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+from eval_format import load_eval
+
+CONFIDENCE_RANK = {"low": 0, "medium": 1, "high": 2}
+
+# USD per million tokens (input, output)
+PRICES = {
+    "claude-3-5-haiku-20241022": (0.80, 4.00),
+    "claude-3-haiku-20240307": (0.25, 1.25),
+    "claude-sonnet-4-20250514": (3.00, 15.00),
+    "claude-opus-4-20250514": (15.00, 75.00),
+}
+# Message Batches are billed at half price
+BATCH_DISCOUNT = 0.5
+
+DEFAULT_TIERS = [
+    {"model": "claude-3-5-haiku-20241022", "accept_confidence": "high", "escalate_on_match": True},
+    {"model": "claude-sonnet-4-20250514"},
+]
+
+
+@dataclass
+class Tier:
+    model: str
+    # Verdicts below this confidence escalate to the next tier
+    accept_confidence: str = "high"
+    escalate_on_match: bool = True
+
+    def should_escalate(self, verdict: dict) -> bool:
+        if self.escalate_on_match and verdict.get("matches"):
+            return True
+        confidence = CONFIDENCE_RANK.get(str(verdict.get("confidence", "low")).lower(), 0)
+        return confidence < CONFIDENCE_RANK[self.accept_confidence]
+
+
+def load_tiers(path: str | Path | None = None) -> list[Tier]:
+    """Tiers from a JSON config file, or DEFAULT_TIERS."""
+    raw = json.loads(Path(path).read_text()) if path else DEFAULT_TIERS
+    tiers = [Tier(**entry) for entry in raw]
+    if not tiers:
+        raise ValueError("Cascade needs at least one tier")
+    for tier in tiers:
+        if tier.accept_confidence not in CONFIDENCE_RANK:
+            raise ValueError(f"Unknown accept_confidence {tier.accept_confidence!r} for {tier.model}")
+    return tiers
+
+
+def call_cost(model: str, input_tokens: int, output_tokens: int, batch: bool = False) -> float | None:
+    price = PRICES.get(model)
+    if price is None:
+        return None
+    cost = (input_tokens * price[0] + output_tokens * price[1]) / 1_000_000
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+def judge_cascade(
+    prompt: str,
+    tiers: list[Tier],
+    call: Callable[[str, str], tuple[dict, dict]],
+) -> dict:
+    """Run ``prompt`` through the tiers until one accepts.
+
+    ``call(prompt, model)`` returns ``(verdict, usage)`` where usage has
+    input_tokens/output_tokens. The returned verdict carries ``judge_model``,
+    ``judge_tier`` and a ``judge_usage`` entry per call made.
+    """
+    usage_log = []
+    for tier_index, tier in enumerate(tiers):
+        start = time.monotonic()
+        verdict, usage = call(prompt, tier.model)
+        usage_log.append({
+            "model": tier.model,
+            "input_tokens": usage.get("input_tokens", 0),
+            "output_tokens": usage.get("output_tokens", 0),
+            "latency_s": round(time.monotonic() - start, 3),
+            "matches": verdict.get("matches"),
+            "confidence": verdict.get("confidence"),
+        })
+        if tier_index == len(tiers) - 1 or not tier.should_escalate(verdict):
+            break
+    verdict = dict(verdict)
+    verdict["judge_model"] = tier.model
+    verdict["judge_tier"] = tier_index
+    verdict["judge_usage"] = usage_log
+    return verdict
+
+
+# ---------------------------------------------------------------------------
+# Agreement report
+# ---------------------------------------------------------------------------
+
+def _evaluation_key(pr: dict, evaluation: dict) -> tuple:
+    return (pr.get("pr_number"), evaluation.get("file"), evaluation.get("line"), evaluation.get("droid_comment"))
+
+
+def _judged(pr: dict):
+    """Evaluations that made their own judge calls (cluster members copy theirs)."""
+    for evaluation in pr.get("evaluations", []):
+        if "clustered_with" not in evaluation:
+            yield evaluation
+
+
+def _usage_totals(eval_data: dict, fallback_model: str | None = None,
+                  fallback_tokens: dict | None = None) -> dict[str, Any]:
+    """Sum cost and latency over judge calls recorded in an eval file.
+
+    Runs made before usage was recorded are estimated from ``fallback_tokens``
+    (per-evaluation input/output tokens from the other run) at
+    ``fallback_model`` prices; latency is then unknown.
+    """
+    cost, latency, calls, estimated = 0.0, 0.0, 0, False
+    for pr in eval_data.get("prs", []):
+        for evaluation in _judged(pr):
+            usage = evaluation.get("judge_usage")
+            if usage is None and fallback_tokens is not None:
+                tokens = fallback_tokens.get(_evaluation_key(pr, evaluation))
+                if tokens:
+                    cost += call_cost(fallback_model, *tokens) or 0.0
+                    calls += 1
+                    estimated = True
+                continue
+            for entry in usage or []:
+                cost += call_cost(entry["model"], entry["input_tokens"], entry["output_tokens"],
+                                  entry.get("batch", False)) or 0.0
+                latency += entry.get("latency_s", 0.0)
+                calls += 1
+    return {"cost_usd": round(cost, 4), "latency_s": None if estimated else round(latency, 1),
+            "calls": calls, "estimated": estimated}
+
+
+def agreement_report(cascade: dict, strong: dict, strong_model: str = DEFAULT_TIERS[-1]["model"]) -> dict[str, Any]:
+    """Compare a cascade run with a full strong-model run of the same comments."""
+    strong_verdicts = {
+        _evaluation_key(pr, e): bool(e.get("matches"))
+        for pr in strong.get("prs", []) for e in pr.get("evaluations", [])
+    }
+    first_call_tokens = {}
+    compared = agreed = 0
+    confusion = {"both_match": 0, "both_non_match": 0, "cascade_only_match": 0, "strong_only_match": 0}
+    by_tier: dict[int, dict[str, int]] = {}
+    disagreements = []
+    for pr in cascade.get("prs", []):
+        for evaluation in pr.get("evaluations", []):
+            key = _evaluation_key(pr, evaluation)
+            usage = evaluation.get("judge_usage") or []
+            if usage and "clustered_with" not in evaluation:
+                first_call_tokens[key] = (usage[0]["input_tokens"], usage[0]["output_tokens"])
+            if key not in strong_verdicts:
+                continue
+            ours, theirs = bool(evaluation.get("matches")), strong_verdicts[key]
+            compared += 1
+            agreed += ours == theirs
+            if ours == theirs:
+                confusion["both_match" if ours else "both_non_match"] += 1
+            else:
+                confusion["cascade_only_match" if ours else "strong_only_match"] += 1
+            tier_stats = by_tier.setdefault(evaluation.get("judge_tier", -1), {"verdicts": 0, "agreed": 0})
+            tier_stats["verdicts"] += 1
+            tier_stats["agreed"] += ours == theirs
+            if ours != theirs:
+                disagreements.append({
+                    "pr_number": pr.get("pr_number"),
+                    "file": evaluation.get("file"),
+                    "line": evaluation.get("line"),
+                    "cascade_matches": ours,
+                    "strong_matches": theirs,
+                    "judge_model": evaluation.get("judge_model"),
+                    "confidence": evaluation.get("confidence"),
+                })
+
+    cascade_usage = _usage_totals(cascade)
+    strong_usage = _usage_totals(strong, strong_model, first_call_tokens)
+    metrics = {}
+    for name in ("precision", "recall", "f_score"):
+        ours, theirs = cascade.get("summary", {}).get(name), strong.get("summary", {}).get(name)
+        if ours is not None and theirs is not None:
+            metrics[name] = {"cascade": ours, "strong": theirs, "delta": round(ours - theirs, 1)}
+
+    def saved(field: str) -> float | None:
+        a, b = cascade_usage[field], strong_usage[field]
+        return round(100 * (1 - a / b), 1) if a is not None and b else None
+
+    return {
+        "compared_verdicts": compared,
+        "agreement_pct": round(100 * agreed / compared, 1) if compared else None,
+        "confusion": confusion,
+        "agreement_by_tier": {str(k): v for k, v in sorted(by_tier.items())},
+        "cost": {"cascade": cascade_usage, "strong": strong_usage, "saved_pct": saved("cost_usd")},
+        "latency_saved_pct": saved("latency_s"),
+        "metrics": metrics,
+        "disagreements": disagreements,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Compared verdicts: {report['compared_verdicts']}")
+    print(f"Verdict agreement: {report['agreement_pct']}%")
+    c = report["confusion"]
+    print(f"  both match: {c['both_match']}, both non-match: {c['both_non_match']}, "
+          f"cascade-only match: {c['cascade_only_match']}, strong-only match: {c['strong_only_match']}")
+    for tier, stats in report["agreement_by_tier"].items():
+        print(f"  tier {tier}: {stats['agreed']}/{stats['verdicts']} agree")
+    cost = report["cost"]
+    note = " (strong cost estimated from cascade token counts)" if cost["strong"]["estimated"] else ""
+    print(f"\nCost: ${cost['cascade']['cost_usd']:.4f} cascade vs ${cost['strong']['cost_usd']:.4f} strong"
+          f" -> {cost['saved_pct']}% saved{note}")
+    if report["latency_saved_pct"] is not None:
+        print(f"Judge latency: {cost['cascade']['latency_s']}s vs {cost['strong']['latency_s']}s"
+              f" -> {report['latency_saved_pct']}% saved")
+    if report["metrics"]:
+        print("\nAccuracy vs strong-only run:")
+        for name, m in report["metrics"].items():
+            print(f"  {name:<10} {m['cascade']:>6}% vs {m['strong']:>6}% ({m['delta']:+})")
+    for d in report["disagreements"][:20]:
+        print(f"  PR #{d['pr_number']} {d['file']}:{d['line']}: cascade={d['cascade_matches']} "
+              f"strong={d['strong_matches']} ({d['judge_model']}, {d['confidence']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agreement report: cascade run vs full strong-model run.")
+    parser.add_argument("cascade_eval", type=Path)
+    parser.add_argument("strong_eval", type=Path)
+    parser.add_argument("--strong-model", default=DEFAULT_TIERS[-1]["model"],
+                        help="Model used for the strong run (for cost estimates when it has no usage)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    report = agreement_report(load_eval(args.cascade_eval), load_eval(args.strong_eval), args.strong_model)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
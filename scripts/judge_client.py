@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Resilient wrapper around the judge's ``client.messages.create`` call.
+
+- Classified retries: rate limits, overloads, 5xx, timeouts and connection
+  errors are retried with full-jitter exponential backoff, honouring
+  ``retry-after`` / ``retry-after-ms`` headers; other errors fail fast.
+- Hedged requests: once a call has run longer than the observed latency
+  percentile (HEDGE_PERCENTILE), a duplicate request is sent and the first
+  successful response wins.
+- Circuit breaker: after sustained failures, dispatch pauses for a cool-down
+  before a single probe call is let through.
+- Per-call timeouts: enforced client-side and passed to the SDK.
+
+Works with any object exposing ``messages.create(**kwargs)``, so it can be
+exercised against the local fault-injecting FakeClient below:
+
+Usage: python3 scripts/judge_client.py --simulate 400
+"""
+
+import argparse
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+MAX_ATTEMPTS = 6
+BASE_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+CALL_TIMEOUT = 120.0
+HEDGE_PERCENTILE = 95
+# Hedging needs this many observed latencies before it kicks in
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 500
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+
+class JudgeCallError(Exception):
+    """A judge call failed permanently (fatal error or retries exhausted)."""
+
+
+class CallTimeout(Exception):
+    """No response within the per-call timeout."""
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _headers(exc: BaseException) -> Any:
+    response = getattr(exc, "response", None)
+    return getattr(response, "headers", None) or getattr(exc, "headers", None) or {}
+
+
+def classify_error(exc: BaseException) -> str:
+    """Return "retryable" or "fatal" for an exception from the SDK (or a fake)."""
+    if isinstance(exc, CallTimeout):
+        return "retryable"
+    status = getattr(exc, "status_code", None)
+    if status is not None:
+        return "retryable" if status in RETRYABLE_STATUS or status >= 500 else "fatal"
+    name = type(exc).__name__
+    if "Timeout" in name or "Connection" in name or isinstance(exc, (TimeoutError, ConnectionError)):
+        return "retryable"
+    return "fatal"
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Server-requested delay from ``retry-after-ms`` or ``retry-after``, if any."""
+    headers = _headers(exc)
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return float(value) / 1000
+        value = headers.get("retry-after")
+    except AttributeError:
+        return None
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        # Malformed header: fall back to our own backoff rather than failing the call
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float = BASE_BACKOFF, cap: float = MAX_BACKOFF,
+                  rng: random.Random | None = None) -> float:
+    """Full-jitter exponential backoff for the given (1-based) retry attempt."""
+    rng = rng or random
+    return rng.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; half-opens after a cool-down."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return "open"
+
+    def acquire(self) -> None:
+        """Block until a call may be dispatched."""
+        while True:
+            with self._lock:
+                if self._opened_at is None:
+                    return
+                remaining = self.cooldown - (time.monotonic() - self._opened_at)
+                if remaining <= 0 and not self._probe_in_flight:
+                    self._probe_in_flight = True
+                    return
+            time.sleep(max(remaining, 0.01) if remaining > 0 else 0.01)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """End a call that says nothing about API health (a fatal 4xx): counts stay as they are."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """A transient failure (429, 5xx, overloaded, timeout)."""
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or (self._opened_at is None and self._failures >= self.failure_threshold):
+                if self._opened_at is None:
+                    self.times_opened += 1
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    attempts: int = 0
+    retries: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    timeouts: int = 0
+    failures: int = 0
+    errors_by_kind: dict = field(default_factory=dict)
+    # What the caller waited for (retries and hedging included)
+    latencies: list = field(default_factory=list)
+    # Per successful attempt: with hedging, and for the primary request alone
+    # (recorded even when a hedge answered first)
+    attempt_latencies: list = field(default_factory=list)
+    primary_latencies: list = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        p99 = percentile(self.attempt_latencies, 99)
+        primary_p99 = percentile(self.primary_latencies, 99)
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "errors_by_kind": dict(self.errors_by_kind),
+            "latency_p50": round(percentile(self.latencies, 50), 3),
+            "latency_p99": round(percentile(self.latencies, 99), 3),
+            "attempt_latency_p99": round(p99, 3),
+            "primary_latency_p99": round(primary_p99, 3),
+            # None when no hedge fired: any difference is then noise, not a cut
+            "p99_reduction_pct": round(max(0.0, 100 * (1 - p99 / primary_p99)), 1)
+            if primary_p99 and self.hedges else None,
+        }
+
+
+class ResilientClient:
+    """Drop-in ``messages.create`` with retries, hedging and a circuit breaker."""
+
+    def __init__(
+        self,
+        client: Any,
+        max_attempts: int = MAX_ATTEMPTS,
+        timeout: float = CALL_TIMEOUT,
+        hedge: bool = True,
+        hedge_percentile: float = HEDGE_PERCENTILE,
+        breaker: CircuitBreaker | None = None,
+        base_backoff: float = BASE_BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+        sleep=time.sleep,
+        rng: random.Random | None = None,
+    ):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.stats = CallStats()
+        self._recent = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="judge")
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def hedge_delay(self) -> float | None:
+        """Latency after which a hedge is sent, or None while warming up."""
+        with self._lock:
+            if not self.hedge or len(self._recent) < HEDGE_MIN_SAMPLES:
+                return None
+            return percentile(list(self._recent), self.hedge_percentile)
+
+    def _record_primary(self, started: float, future: Future) -> None:
+        if future.exception() is None:
+            with self._lock:
+                self.stats.primary_latencies.append(time.monotonic() - started)
+
+    def _submit(self, kwargs: dict) -> Future:
+        with self._lock:
+            self.stats.attempts += 1
+        return self._pool.submit(self.client.messages.create, **kwargs)
+
+    def _attempt(self, kwargs: dict) -> Any:
+        """One logical attempt: primary request plus an optional hedge."""
+        started = time.monotonic()
+        primary = self._submit(kwargs)
+        primary.add_done_callback(lambda f: self._record_primary(started, f))
+        pending = {primary}
+
+        delay = self.hedge_delay()
+        if delay is not None and delay < self.timeout:
+            done, _ = wait(pending, timeout=delay)
+            if not done:
+                with self._lock:
+                    self.stats.hedges += 1
+                pending.add(self._submit(kwargs))
+
+        first_error = None
+        while pending:
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        with self._lock:
+                            self.stats.hedge_wins += 1
+                    with self._lock:
+                        self._recent.append(time.monotonic() - started)
+                        self.stats.attempt_latencies.append(self._recent[-1])
+                    return future.result()
+                first_error = first_error or future.exception()
+        if first_error is not None and not pending:
+            raise first_error
+        with self._lock:
+            self.stats.timeouts += 1
+        raise CallTimeout(f"No response within {self.timeout}s")
+
+    def create(self, **kwargs) -> Any:
+        """Call ``messages.create`` with retries; raises JudgeCallError on give-up."""
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.monotonic()
+        with self._lock:
+            self.stats.calls += 1
+
+        for attempt in range(1, self.max_attempts + 1):
+            self.breaker.acquire()
+            try:
+                response = self._attempt(kwargs)
+            except Exception as exc:
+                kind = classify_error(exc)
+                # Bad requests and auth errors are not an outage; only transient errors trip the breaker
+                if kind == "fatal":
+                    self.breaker.release()
+                else:
+                    self.breaker.record_failure()
+                with self._lock:
+                    name = type(exc).__name__
+                    self.stats.errors_by_kind[name] = self.stats.errors_by_kind.get(name, 0) + 1
+                if kind == "fatal" or attempt == self.max_attempts:
+                    with self._lock:
+                        self.stats.failures += 1
+                    raise JudgeCallError(f"{type(exc).__name__} after {attempt} attempt(s): {exc}") from exc
+                delay = retry_after_seconds(exc)
+                if delay is None:
+                    delay = backoff_delay(attempt, self.base_backoff, self.max_backoff, self.rng)
+                with self._lock:
+                    self.stats.retries += 1
+                self.sleep(delay)
+                continue
+            self.breaker.record_success()
+            with self._lock:
+                self.stats.latencies.append(time.monotonic() - started)
+            return response
+
+        raise JudgeCallError("unreachable")
+
+
+# ---------------------------------------------------------------------------
+# Local fault-injecting fake client
+# ---------------------------------------------------------------------------
+
+class FakeAPIError(Exception):
+    """Mimics the SDK's APIStatusError (status_code + response.headers)."""
+
+    def __init__(self, status_code: int, headers: dict | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = type("Response", (), {"headers": headers or {}})()
+
+
+class FakeAPITimeoutError(Exception):
+    pass
+
+
+@dataclass
+class _FakeContent:
+    text: str
+
+
+@dataclass
+class _FakeResponse:
+    content: list
+
+
+# The 429 header forms seen in the wild, including a malformed one that must not break the call
+RETRY_AFTER_HEADERS = (
+    {"retry-after-ms": "20"},
+    {"retry-after": "0"},
+    {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"},
+    {"retry-after": "soon"},
+    {},
+)
+
+
+class FakeClient:
+    """A stand-in judge client with injectable latency and faults.
+
+    Latency is lognormal around ``median_latency`` with a ``slow_rate`` chance
+    of a ``slow_factor`` x straggler. Each call may instead raise a 429 (with
+    one of RETRY_AFTER_HEADERS), a 5xx, or a timeout, at the given rates. An ``outage`` of
+    (start, end) seconds since creation fails every call with 503.
+    """
+
+    def __init__(
+        self,
+        median_latency: float = 0.02,
+        slow_rate: float = 0.03,
+        slow_factor: float = 20.0,
+        rate_limit_rate: float = 0.02,
+        server_error_rate: float = 0.02,
+        timeout_rate: float = 0.0,
+        fatal_rate: float = 0.0,
+        outage: tuple[float, float] | None = None,
+        response_text: str = '{"matches": false, "matched_golden_comment": null, "matched_severity": null, '
+                             '"confidence": "high", "reasoning": "fake"}',
+        seed: int = 0,
+    ):
+        self.median_latency = median_latency
+        self.slow_rate = slow_rate
+        self.slow_factor = slow_factor
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.timeout_rate = timeout_rate
+        self.fatal_rate = fatal_rate
+        self.outage = outage
+        self.response_text = response_text
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._created = time.monotonic()
+        self.requests = 0
+        self.messages = self
+
+    def create(self, **kwargs) -> _FakeResponse:
+        with self._lock:
+            self.requests += 1
+            roll = self._rng.random()
+            latency = self.median_latency * self._rng.lognormvariate(0, 0.3)
+            if self._rng.random() < self.slow_rate:
+                latency *= self.slow_factor
+        if self.outage and self.outage[0] <= time.monotonic() - self._created < self.outage[1]:
+            time.sleep(latency / 4)
+            raise FakeAPIError(503)
+        if roll < self.rate_limit_rate:
+            time.sleep(latency / 4)
+            raise FakeAPIError(429, self._rng.choice(RETRY_AFTER_HEADERS))
+        roll -= self.rate_limit_rate
+        if roll < self.server_error_rate:
+            time.sleep(latency / 2)
+            raise FakeAPIError(500)
+        roll -= self.server_error_rate
+        if roll < self.timeout_rate:
+            time.sleep(latency)
+            raise FakeAPITimeoutError("request timed out")
+        roll -= self.timeout_rate
+        if roll < self.fatal_rate:
+            raise FakeAPIError(400)
+        time.sleep(latency)
+        return _FakeResponse(content=[_FakeContent(self.response_text)])
+
+
+def check_retry_after() -> None:
+    """Assert that every RETRY_AFTER_HEADERS form parses to a delay or None, never an exception."""
+    expected = (0.02, 0.0, 0.0, None, None)
+    for headers, want in zip(RETRY_AFTER_HEADERS, expected):
+        got = retry_after_seconds(FakeAPIError(429, headers))
+        assert got == want, f"retry_after_seconds({headers}) = {got!r}, expected {want!r}"
+
+
+def simulate(n_calls: int, concurrency: int = 8, seed: int = 0) -> dict[str, Any]:
+    """Compare a bare client with the resilient wrapper on the same faults."""
+    def run(make_caller) -> dict[str, Any]:
+        fake = FakeClient(seed=seed)
+        call, stats = make_caller(fake)
+        latencies, failures = [], 0
+        lock = threading.Lock()
+
+        def one(_):
+            nonlocal failures
+            start = time.monotonic()
+            try:
+                call(model="fake", max_tokens=10, messages=[])
+            except Exception:
+                with lock:
+                    failures += 1
+                return
+            with lock:
+                latencies.append(time.monotonic() - start)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(n_calls)))
+        result = {
+            "failed_calls": failures,
+            "requests_sent": fake.requests,
+            "latency_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "latency_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        }
+        if stats is not None:
+            result.update({k: v for k, v in stats().items() if k in ("retries", "hedges", "hedge_wins")})
+        return result
+
+    def bare(fake):
+        return fake.messages.create, None
+
+    def resilient(fake):
+        wrapper = ResilientClient(fake, timeout=2.0, base_backoff=0.01, max_backoff=0.2,
+                                  breaker=CircuitBreaker(cooldown=0.1), rng=random.Random(seed))
+        return wrapper.create, wrapper.stats.summary
+
+    def retries_only(fake):
+        wrapper = ResilientClient(fake, timeout=2.0, base_backoff=0.01, max_backoff=0.2, hedge=False,
+                                  breaker=CircuitBreaker(cooldown=0.1), rng=random.Random(seed))
+        return wrapper.create, wrapper.stats.summary
+
+    return {"bare": run(bare), "retries_only": run(retries_only), "retries_and_hedging": run(resilient)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exercise the resilient judge client against a fake API.")
+    parser.add_argument("--simulate", type=int, default=400, metavar="N", help="Number of simulated judge calls")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    check_retry_after()
+    results = simulate(args.simulate, args.concurrency)
+    print(f"{'Mode':<22} {'failed':>7} {'requests':>9} {'p50 ms':>8} {'p99 ms':>8} {'retries':>8} {'hedges':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<22} {r['failed_calls']:>7} {r['requests_sent']:>9} {r['latency_p50_ms']:>8} "
+              f"{r['latency_p99_ms']:>8} {r.get('retries', '-'):>8} {r.get('hedges', '-'):>7}")
+    base = results["retries_only"]["latency_p99_ms"]
+    hedged = results["retries_and_hedging"]["latency_p99_ms"]
+    if base:
+        print(f"\nHedging cut p99 by {100 * (1 - hedged / base):.1f}% ({base} ms -> {hedged} ms)")
+
+
+if __name__ == "__main__":
+    main()
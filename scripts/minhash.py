@@ -0,0 +1,108 @@
+"""
+MinHash signatures and LSH banding for near-duplicate text detection.
+
+Shared by golden_alignment.py (v1 -> v2 comment alignment) and
+comment_clustering.py (pre-judge clustering of droid comments).
+"""
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from typing import Iterable, Sequence
+
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+
+_MERSENNE = (1 << 61) - 1
+_rng = random.Random(1234)
+_PERMS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by can could does for from has have if in into is it its
+may might not of on or that the their then there these this to was when which while will
+with would should also than so such via without within no only any all
+""".split())
+
+_TOKEN_RE = re.compile(r"[A-Za-z][A-Za-z0-9]*|\d+")
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens; camelCase identifiers also yield their parts."""
+    tokens = []
+    for raw in _TOKEN_RE.findall(text or ""):
+        parts = _CAMEL_RE.split(raw)
+        words = [raw] + parts if len(parts) > 1 else [raw]
+        for word in words:
+            word = word.lower()
+            if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+                word = word[:-1]
+            if word not in STOPWORDS and len(word) > 1:
+                tokens.append(word)
+    return tokens
+
+
+def shingles(tokens: Sequence[str], k: int = 1) -> set:
+    """Word k-shingles (k=1 is the token set)."""
+    if k == 1:
+        return set(tokens)
+    if len(tokens) < k:
+        return {tuple(tokens)} if tokens else set()
+    return {tuple(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+
+
+class MinHasher:
+    """MinHash signatures with per-shingle permutation values memoised."""
+
+    def __init__(self):
+        self._hash_cache: dict = {}
+
+    def _hashes(self, shingle) -> tuple[int, ...]:
+        cached = self._hash_cache.get(shingle)
+        if cached is None:
+            key = shingle if isinstance(shingle, str) else "\x1f".join(shingle)
+            x = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little")
+            cached = tuple((a * x + b) % _MERSENNE for a, b in _PERMS)
+            self._hash_cache[shingle] = cached
+        return cached
+
+    def signature(self, items: Iterable) -> tuple[int, ...]:
+        unique = set(items)
+        if not unique:
+            return tuple([_MERSENNE] * NUM_PERM)
+        return tuple(map(min, zip(*(self._hashes(s) for s in unique))))
+
+
+def estimate_jaccard(a: Sequence[int], b: Sequence[int]) -> float:
+    """Jaccard similarity estimated from two MinHash signatures."""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+class LSHIndex:
+    """Banded LSH over MinHash signatures."""
+
+    def __init__(self, bands: int = BANDS, rows: int = ROWS, max_bucket: int | None = None):
+        self.bands = bands
+        self.rows = rows
+        # Buckets larger than this are dominated by generic tokens and skipped
+        self.max_bucket = max_bucket
+        self._buckets: dict[tuple, list] = defaultdict(list)
+
+    def _keys(self, signature: Sequence[int]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield (band, *signature[start:start + self.rows])
+
+    def add(self, item, signature: Sequence[int]) -> None:
+        for key in self._keys(signature):
+            self._buckets[key].append(item)
+
+    def query(self, signature: Sequence[int]) -> set:
+        candidates = set()
+        for key in self._keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket and (self.max_bucket is None or len(bucket) <= self.max_bucket):
+                candidates.update(bucket)
+        return candidates
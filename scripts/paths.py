@@ -0,0 +1,23 @@
+"""
+Repository path resolution shared by all scripts.
+
+Everything is resolved relative to the repository root (the parent of
+scripts/), or REVIEW_BENCH_ROOT when set, so scripts behave the same whether
+run directly, through bench.py, or from another working directory.
+"""
+
+import os
+from pathlib import Path
+
+BASE_DIR = Path(os.environ.get("REVIEW_BENCH_ROOT") or Path(__file__).resolve().parent.parent)
+RESULTS_DIR = BASE_DIR / "results"
+
+
+def run_dir(run_name: str) -> Path:
+    """results/<run_name>/"""
+    return RESULTS_DIR / run_name
+
+
+def raw_comments_dir(run_name: str) -> Path:
+    """results/<run_name>/raw_comments/, the evaluation inputs."""
+    return run_dir(run_name) / "raw_comments"
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Choose a small, stratified PR subset whose F-score predicts the full benchmark.
+
+Historical per-PR TP/FP/FN come from the ground-truth validation summaries
+and any ``*_eval.json`` under results/. Because only a handful of real runs
+exist, selection and error estimation also use simulated runs: each one
+applies a run-wide shift (like a droid-action change) and per-PR noise drawn
+from Beta posteriors of the historical rates.
+
+The subset keeps at least one PR per repo (and so per language), covers every
+bug type in golden_comments_v2.json, and is grown greedily then refined by
+swaps to minimise the error of
+
+    predicted full F = pooled subset F + bias
+
+on the training runs. Prediction error is reported on held-out simulated
+runs and on the real runs, next to random stratified subsets of the same size.
+The real run that seeds the simulation is only a fair check when another
+complete run exists: it is then predicted by a subset re-selected from that
+other run (leave-one-run-out). Otherwise its figure is marked in-sample.
+
+Usage:
+  python3 scripts/pr_subset.py [--size 10] [--runs 300] [--seed 0]
+  python3 scripts/pr_subset.py --predict <run_name>
+  python3 scripts/pr_subset.py --smoke <run_name>
+Example: python3 scripts/pr_subset.py --size 8
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from eval_format import load_eval
+from paths import BASE_DIR, run_dir
+
+VALIDATION_DIR = BASE_DIR / "results" / "ground_truth_validation" / "run_2026-01-15"
+GOLDEN_V2_PATH = BASE_DIR / "results" / "golden_comments_v2.json"
+OUTPUT_PATH = BASE_DIR / "results" / "pr_subset.json"
+
+LANGUAGES = {
+    "sentry": "Python",
+    "grafana": "Go",
+    "keycloak": "Java",
+    "discourse": "Ruby",
+    "cal_dot_com": "TypeScript",
+}
+
+DEFAULT_SIZE = 10
+DEFAULT_RUNS = 300
+# Run-wide multiplier on recall and FP rate in simulated runs
+RUN_SHIFT = (0.6, 1.4)
+SWAP_PASSES = 3
+
+PRKey = tuple[str, int]
+Counts = tuple[int, int, int]
+
+
+def f_score(tp: int, fp: int, fn: int) -> float:
+    return 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+
+
+def pooled_f(run: dict[PRKey, Counts], keys) -> float:
+    tp = fp = fn = 0
+    for key in keys:
+        a, b, c = run[key]
+        tp += a
+        fp += b
+        fn += c
+    return f_score(tp, fp, fn)
+
+
+def load_validation_run(validation_dir: Path = VALIDATION_DIR) -> dict[PRKey, Counts]:
+    """Per-PR droid TP/FP/FN from the validation summaries."""
+    run = {}
+    for path in sorted(validation_dir.glob("*/pr_*_summary.json")):
+        data = json.loads(path.read_text())
+        droid = data["droid_analysis"]
+        run[(path.parent.name, data["pr_number"])] = (
+            droid["true_positives"],
+            droid["false_positives"],
+            # droid_missed lists each missed bug; bugs_found_only_by_golden disagrees with it on a few PRs
+            len(data["coverage"]["droid_missed"]),
+        )
+    return run
+
+
+def load_eval_run(path: Path) -> dict[PRKey, Counts]:
+    """Per-PR TP/FP/FN from an evaluation output (e.g. sentry_eval.json)."""
+    data = load_eval(path)
+    repo = data.get("repo", "").removeprefix("droid-")
+    return {
+        (repo, pr["pr_number"]): (pr["metrics"]["tp"], pr["metrics"]["fp"], pr["metrics"]["fn"])
+        for pr in data.get("prs", [])
+    }
+
+
+def load_history() -> list[dict[str, Any]]:
+    """All historical runs: [{"name", "prs": {(repo, pr): (tp, fp, fn)}}]."""
+    history = [{"name": f"validation/{VALIDATION_DIR.name}", "prs": load_validation_run()}]
+    # One entry per run directory, so a run evaluated repo by repo counts as one run
+    by_run: dict[Path, dict[PRKey, Counts]] = {}
+    for path in sorted((BASE_DIR / "results").glob("*/*_eval.json")):
+        by_run.setdefault(path.parent, {}).update(load_eval_run(path))
+    for directory, prs in by_run.items():
+        history.append({"name": str(directory.relative_to(BASE_DIR)), "prs": prs})
+    return history
+
+
+def load_strata(v2_path: Path = GOLDEN_V2_PATH) -> dict[PRKey, dict[str, Any]]:
+    """Repo, language, title and bug types per PR from golden_comments_v2.json."""
+    v2 = json.loads(v2_path.read_text())
+    strata = {}
+    for repo, repo_data in v2["repos"].items():
+        for pr in repo_data["prs"]:
+            strata[(repo, pr["pr_number"])] = {
+                "repo": repo,
+                "language": LANGUAGES.get(repo, "unknown"),
+                "pr_title": pr.get("pr_title", ""),
+                "bug_types": sorted({bug.get("bug_type", "unknown") for bug in pr.get("bugs", [])}),
+            }
+    return strata
+
+
+def _binomial(n: int, p: float, rng: random.Random) -> int:
+    return sum(rng.random() < p for _ in range(n))
+
+
+def simulate_runs(base: dict[PRKey, Counts], n_runs: int, seed: int) -> list[dict[PRKey, Counts]]:
+    """Plausible alternative runs around ``base`` (see module docstring)."""
+    rng = random.Random(seed)
+    runs = []
+    for _ in range(n_runs):
+        shift = rng.uniform(*RUN_SHIFT)
+        run = {}
+        for key, (tp, fp, fn) in base.items():
+            recall = min(1.0, rng.betavariate(tp + 1, fn + 1) * shift)
+            fp_rate = min(1.0, rng.betavariate(fp + 1, tp + 1) / shift)
+            new_tp = _binomial(tp + fn, recall, rng)
+            comments = max(tp + fp, 1)
+            run[key] = (new_tp, _binomial(comments, fp_rate, rng), tp + fn - new_tp)
+        runs.append(run)
+    return runs
+
+
+class SubsetScorer:
+    """Prediction error of a subset over a fixed set of runs."""
+
+    def __init__(self, runs: list[dict[PRKey, Counts]], keys: list[PRKey]):
+        self.runs = runs
+        self.full = [pooled_f(run, keys) for run in runs]
+
+    def bias(self, subset) -> float:
+        return sum(full - pooled_f(run, subset) for run, full in zip(self.runs, self.full)) / len(self.runs)
+
+    def errors(self, subset, bias: float) -> list[float]:
+        return [abs(pooled_f(run, subset) + bias - full) for run, full in zip(self.runs, self.full)]
+
+    def mae(self, subset) -> float:
+        bias = self.bias(subset)
+        return sum(self.errors(subset, bias)) / len(self.runs)
+
+
+def _coverage_gap(subset, strata, all_types) -> int:
+    covered = {t for key in subset for t in strata[key]["bug_types"]}
+    return len(all_types - covered)
+
+
+def select_subset(keys: list[PRKey], strata: dict, scorer: SubsetScorer, size: int) -> list[PRKey]:
+    """Greedy forward selection under strata constraints, then swap refinement."""
+    repos = sorted({strata[k]["repo"] for k in keys})
+    all_types = {t for k in keys for t in strata[k]["bug_types"]}
+    cap = math.ceil(size / len(repos))
+    # Uncovered bug types and missing repos dominate the objective
+    penalty = 1.0
+
+    def objective(subset):
+        missing_repos = len(set(repos) - {strata[k]["repo"] for k in subset})
+        return scorer.mae(subset) + penalty * (missing_repos + _coverage_gap(subset, strata, all_types))
+
+    subset: list[PRKey] = []
+    while len(subset) < size:
+        counts = Counter(strata[k]["repo"] for k in subset)
+        candidates = [k for k in keys if k not in subset and counts[strata[k]["repo"]] < cap]
+        subset.append(min(candidates, key=lambda k: objective(subset + [k])))
+
+    best = objective(subset)
+    for _ in range(SWAP_PASSES):
+        improved = False
+        for i in range(len(subset)):
+            for candidate in keys:
+                if candidate in subset:
+                    continue
+                trial = subset[:i] + [candidate] + subset[i + 1:]
+                if max(Counter(strata[k]["repo"] for k in trial).values()) > cap:
+                    continue
+                score = objective(trial)
+                if score < best - 1e-12:
+                    subset, best, improved = trial, score, True
+        if not improved:
+            break
+    return sorted(subset)
+
+
+def random_stratified(keys: list[PRKey], strata: dict, size: int, rng: random.Random) -> list[PRKey]:
+    by_repo: dict[str, list[PRKey]] = {}
+    for key in keys:
+        by_repo.setdefault(strata[key]["repo"], []).append(key)
+    subset = [rng.choice(prs) for prs in by_repo.values()][:size]
+    rest = [k for k in keys if k not in subset]
+    return subset + rng.sample(rest, size - len(subset))
+
+
+def _select(base: dict[PRKey, Counts], keys: list[PRKey], strata: dict, size: int, n_runs: int,
+            seed: int) -> tuple[SubsetScorer, list[PRKey], float]:
+    """Training scorer, subset and bias for simulated runs seeded from ``base``."""
+    train = SubsetScorer(simulate_runs({k: base[k] for k in keys}, n_runs, seed), keys)
+    subset = select_subset(keys, strata, train, size)
+    return train, subset, train.bias(subset)
+
+
+def historical_check(history: list[dict[str, Any]], keys: list[PRKey], strata: dict, subset: list[PRKey],
+                     bias: float, size: int, n_runs: int, seed: int) -> list[dict[str, Any]]:
+    """Full vs predicted F on every real run that covers all PRs.
+
+    ``history[0]`` seeds the simulation, so checking the subset against it is
+    in-sample. When another complete run exists, the seed run is instead
+    predicted by a subset re-selected from that run.
+    """
+    complete = [h for h in history if all(k in h["prs"] for k in keys)]
+    checks = []
+    for h in complete:
+        entry = {"run": h["name"], "full_f": round(pooled_f(h["prs"], keys), 4)}
+        others = [o for o in complete if o is not h]
+        if h is not history[0]:
+            entry.update(predicted_f=round(pooled_f(h["prs"], subset) + bias, 4), in_sample=False)
+        elif others:
+            _, fold_subset, fold_bias = _select(others[0]["prs"], keys, strata, size, n_runs, seed)
+            entry.update(predicted_f=round(pooled_f(h["prs"], fold_subset) + fold_bias, 4), in_sample=False,
+                         selected_from=others[0]["name"])
+        else:
+            entry.update(predicted_f=round(pooled_f(h["prs"], subset) + bias, 4), in_sample=True)
+        checks.append(entry)
+    return checks
+
+
+def build_subset(size: int = DEFAULT_SIZE, n_runs: int = DEFAULT_RUNS, seed: int = 0) -> dict[str, Any]:
+    history = load_history()
+    strata = load_strata()
+    base = history[0]["prs"]
+    keys = sorted(k for k in base if k in strata)
+
+    train, subset, bias = _select(base, keys, strata, size, n_runs, seed)
+
+    held_out = SubsetScorer(simulate_runs({k: base[k] for k in keys}, n_runs, seed + 1), keys)
+    held_errors = held_out.errors(subset, bias)
+    real = historical_check(history, keys, strata, subset, bias, size, n_runs, seed)
+    rng = random.Random(seed + 2)
+    random_maes = []
+    for _ in range(50):
+        sample = random_stratified(keys, strata, size, rng)
+        sample_bias = train.bias(sample)
+        random_maes.append(sum(held_out.errors(sample, sample_bias)) / n_runs)
+
+    ordered = sorted(held_errors)
+    return {
+        "size": size,
+        "total_prs": len(keys),
+        "bias": round(bias, 4),
+        "prs": [{"repo": k[0], "pr_number": k[1], **{f: strata[k][f] for f in ("language", "pr_title", "bug_types")}}
+                for k in subset],
+        "prediction_error": {
+            "held_out_runs": n_runs,
+            "mae": round(sum(held_errors) / n_runs, 4),
+            "p90": round(ordered[int(0.9 * (n_runs - 1))], 4),
+            "max": round(ordered[-1], 4),
+            "random_stratified_mae": round(sum(random_maes) / len(random_maes), 4),
+        },
+        "historical_runs": real,
+        "coverage": {
+            "repos": sorted({strata[k]["repo"] for k in subset}),
+            "bug_types": sorted({t for k in subset for t in strata[k]["bug_types"]}),
+            "all_bug_types": sorted({t for k in keys for t in strata[k]["bug_types"]}),
+        },
+    }
+
+
+def predict(run_name: str, subset: dict[str, Any]) -> dict[str, Any]:
+    """Predicted full-benchmark F from a run's eval outputs for the subset PRs."""
+    available: dict[PRKey, Counts] = {}
+    for path in sorted(run_dir(run_name).glob("*_eval.json")):
+        available.update(load_eval_run(path))
+    keys = [(p["repo"], p["pr_number"]) for p in subset["prs"]]
+    missing = [k for k in keys if k not in available]
+    present = [k for k in keys if k in available]
+    result = {"run": run_name, "evaluated": len(present), "missing": [f"{r}#{n}" for r, n in missing]}
+    if present:
+        subset_f = pooled_f(available, present)
+        result["subset_f"] = round(subset_f, 4)
+        result["predicted_full_f"] = round(subset_f + subset["bias"], 4)
+        result["expected_error"] = subset["prediction_error"]["mae"]
+    return result
+
+
+def smoke(run_name: str, subset: dict[str, Any]) -> None:
+    """Trigger reviews for the subset PRs, then fetch and evaluate what the pipeline supports."""
+    from fetch_comments import PRS as SENTRY_PRS
+    from fetch_comments import fetch_comments, transform_comments, trigger_reviews
+
+    by_repo: dict[str, list[int]] = {}
+    for pr in subset["prs"]:
+        by_repo.setdefault(pr["repo"], []).append(pr["pr_number"])
+    for repo, prs in by_repo.items():
+        trigger_reviews(f"droid-code-review-evals/droid-{repo}", sorted(prs))
+
+    input("\nWait for the review workflows to finish (gh run list), then press Enter to fetch and evaluate...")
+    sentry_prs = sorted(p for p in by_repo.get("sentry", []) if p in SENTRY_PRS)
+    if sentry_prs:
+        fetch_comments(run_name, prs=sentry_prs)
+        transform_comments(run_name, prs=sentry_prs)
+        import evaluate_sentry_run
+        sys.argv = ["evaluate_sentry_run.py", run_name, f"--prs={','.join(map(str, sentry_prs))}"]
+        evaluate_sentry_run.main()
+    others = sorted(set(by_repo) - {"sentry"})
+    if others:
+        print(f"\nNo evaluator for {', '.join(others)} yet; add their *_eval.json to results/{run_name}/ "
+              f"and run --predict {run_name}")
+    print_prediction(predict(run_name, subset))
+
+
+def print_prediction(result: dict[str, Any]) -> None:
+    print(f"\nSubset PRs evaluated: {result['evaluated']}")
+    if result["missing"]:
+        print(f"Missing: {', '.join(result['missing'])}")
+    if "predicted_full_f" in result:
+        print(f"Subset F: {result['subset_f'] * 100:.1f}%")
+        print(f"Predicted full-benchmark F: {result['predicted_full_f'] * 100:.1f}% "
+              f"(expected error ±{result['expected_error'] * 100:.1f} pts)")
+
+
+def print_subset(subset: dict[str, Any]) -> None:
+    print(f"Selected {subset['size']} of {subset['total_prs']} PRs:")
+    for pr in subset["prs"]:
+        print(f"  {pr['repo']:<12} #{pr['pr_number']:<3} {pr['language']:<10} "
+              f"{', '.join(pr['bug_types']):<40} {pr['pr_title'][:50]}")
+    err = subset["prediction_error"]
+    print(f"\nBias correction: {subset['bias'] * 100:+.1f} pts")
+    print(f"Prediction error on {err['held_out_runs']} held-out simulated runs: "
+          f"MAE {err['mae'] * 100:.2f} pts, p90 {err['p90'] * 100:.2f}, max {err['max'] * 100:.2f}")
+    print(f"Random stratified subsets of the same size: MAE {err['random_stratified_mae'] * 100:.2f} pts")
+    for run in subset["historical_runs"]:
+        if run.get("in_sample", True):
+            note = " (in-sample: this run seeds the simulation, so this is not a held-out check)"
+        elif "selected_from" in run:
+            note = f" (held out; subset re-selected from {run['selected_from']})"
+        else:
+            note = " (held out)"
+        print(f"Historical {run['run']}: full F {run['full_f'] * 100:.1f}%, "
+              f"predicted {run['predicted_f'] * 100:.1f}%{note}")
+    cov = subset["coverage"]
+    print(f"Covers {len(cov['repos'])} repos and {len(cov['bug_types'])}/{len(cov['all_bug_types'])} bug types")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Choose a PR subset that predicts the full-benchmark F-score.")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Number of PRs in the subset")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="Simulated runs for training and held-out error")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH)
+    parser.add_argument("--predict", metavar="RUN_NAME", help="Predict full F from a run's subset evaluations")
+    parser.add_argument("--smoke", metavar="RUN_NAME", help="Trigger and evaluate only the saved subset")
+    args = parser.parse_args()
+
+    if args.predict or args.smoke:
+        subset = json.loads(args.output.read_text())
+        if args.smoke:
+            smoke(args.smoke, subset)
+        else:
+            print_prediction(predict(args.predict, subset))
+        return
+
+    subset = build_subset(args.size, args.runs, args.seed)
+    print_subset(subset)
+    with open(args.output, "w") as f:
+        json.dump(subset, f, indent=2)
+    print(f"\nSaved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
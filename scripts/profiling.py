@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+CPU and memory profiling for pipeline stages.
+
+``bench.py --profile <command> ...`` (or ``--profile=DIR``) runs the command
+as one profiled stage:
+
+  - cProfile: top functions by cumulative and own time (<stage>.txt, <stage>.prof)
+  - tracemalloc: peak traced memory and the top allocation sites
+  - a stack sampler: flamegraph-compatible collapsed stacks (<stage>.collapsed,
+    for flamegraph.pl or speedscope)
+  - wall/CPU time, peak memory and the git commit appended to history.jsonl
+
+Files go to profiles/<timestamp>_<stage>.* (override with --profile=DIR).
+``history`` prints the recorded timings per stage across commits, with the
+change against the previous entry, to spot regressions.
+
+Usage: python3 scripts/profiling.py history [--stage draft] [--last 20]
+Example: python3 scripts/bench.py --profile draft && python3 scripts/profiling.py history
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import pstats
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from paths import BASE_DIR
+
+PROFILE_DIR = BASE_DIR / "profiles"
+HISTORY_FILE = "history.jsonl"
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+TRACEMALLOC_FRAMES = 10
+
+
+class StackSampler:
+    """Samples one thread's Python stack on a timer; counts collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        skip = {__file__, threading.__file__, cProfile.__file__}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename not in skip:
+                    names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def git_commit() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BASE_DIR,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def format_report(stage: str, record: dict, profiler: cProfile.Profile,
+                  snapshot: tracemalloc.Snapshot) -> str:
+    out = io.StringIO()
+    out.write(f"Stage: {stage}\n")
+    out.write(f"Command: {' '.join(record['argv'])}\n")
+    out.write(f"Commit: {record['commit']}{' (dirty)' if record['dirty'] else ''}\n")
+    out.write(f"Wall: {record['wall_s']}s  CPU: {record['cpu_s']}s\n")
+    out.write(f"Peak traced memory: {record['peak_traced_mb']} MB  Max RSS: {record['max_rss_mb']} MB\n")
+    for sort, title in (("cumulative", "cumulative time"), ("tottime", "own time")):
+        out.write(f"\n=== Top {TOP_FUNCTIONS} functions by {title} ===\n")
+        stats = pstats.Stats(profiler, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(TOP_FUNCTIONS)
+    out.write(f"\n=== Top {TOP_ALLOCATIONS} allocation sites (live at stage end) ===\n")
+    for stat in snapshot.statistics("traceback")[:TOP_ALLOCATIONS]:
+        frame = stat.traceback[-1]
+        out.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+    return out.getvalue()
+
+
+@contextmanager
+def profile_stage(stage: str, out_dir: str | Path = PROFILE_DIR) -> Iterator[None]:
+    """Profile the enclosed block as ``stage``; writes the report files and a history entry."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    sampler = StackSampler(threading.get_ident())
+    profiler = cProfile.Profile()
+    wall, cpu = time.perf_counter(), time.process_time()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+
+        record = {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "stage": stage,
+            **git_commit(),
+            "argv": sys.argv,
+            "wall_s": round(wall, 3),
+            "cpu_s": round(cpu, 3),
+            "peak_traced_mb": round(peak / (1024 * 1024), 1),
+            "max_rss_mb": max_rss_mb(),
+            "samples": sum(sampler.stacks.values()),
+        }
+        prefix = out_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}_{stage}"
+        profiler.dump_stats(f"{prefix}.prof")
+        Path(f"{prefix}.txt").write_text(format_report(stage, record, profiler, snapshot))
+        Path(f"{prefix}.collapsed").write_text(sampler.collapsed())
+        with open(out_dir / HISTORY_FILE, "a") as f:
+            f.write(json.dumps(record) + "\n")
+        print(f"\nProfile [{stage}]: {record['wall_s']}s wall, {record['cpu_s']}s CPU, "
+              f"peak {record['peak_traced_mb']} MB traced / {record['max_rss_mb']} MB RSS -> {prefix}.txt",
+              file=sys.stderr)
+
+
+def split_profile_args(argv: list[str]) -> tuple[list[str], Path | None]:
+    """Remove --profile / --profile=DIR from argv; returns (argv, output dir or None)."""
+    rest, out_dir = [], None
+    for arg in argv:
+        if arg == "--profile":
+            out_dir = PROFILE_DIR
+        elif arg.startswith("--profile="):
+            out_dir = Path(arg.split("=", 1)[1])
+        else:
+            rest.append(arg)
+    return rest, out_dir
+
+
+def load_history(out_dir: Path = PROFILE_DIR) -> list[dict]:
+    path = out_dir / HISTORY_FILE
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+
+
+def print_history(records: list[dict], stage: str | None = None, last: int = 20) -> None:
+    by_stage: dict[str, list[dict]] = {}
+    for record in records:
+        if stage is None or record["stage"] == stage:
+            by_stage.setdefault(record["stage"], []).append(record)
+    if not by_stage:
+        print("No profiled stages recorded yet (run bench.py --profile <command>)")
+        return
+    for name, entries in sorted(by_stage.items()):
+        print(f"\n{name}")
+        print(f"  {'timestamp':<21} {'commit':<10} {'wall s':>8} {'change':>8} {'cpu s':>8} {'peak MB':>8} {'rss MB':>8}")
+        previous = None
+        for r in entries[-last:]:
+            change = f"{100 * (r['wall_s'] / previous - 1):+.0f}%" if previous else ""
+            commit = f"{r['commit'] or '-'}{'*' if r.get('dirty') else ''}"
+            print(f"  {r['timestamp']:<21} {commit:<10} {r['wall_s']:>8} {change:>8} {r['cpu_s']:>8} "
+                  f"{r['peak_traced_mb']:>8} {r['max_rss_mb']:>8}")
+            previous = r["wall_s"] or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show profiled stage timings across commits.")
+    parser.add_argument("command", choices=["history"])
+    parser.add_argument("--stage", help="Only this stage (bench.py command name)")
+    parser.add_argument("--last", type=int, default=20, help="Entries per stage")
+    parser.add_argument("--dir", type=Path, default=PROFILE_DIR, help=f"Profile directory (default: {PROFILE_DIR})")
+    args = parser.parse_args()
+
+    print_history(load_history(args.dir), args.stage, args.last)
+    print("\n(* = uncommitted changes)")
+
+
+if __name__ == "__main__":
+    main()
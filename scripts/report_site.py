@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Static HTML report site for every evaluation run under results/.
+
+Each ``results/<run>/*_eval.json`` (sentry_eval.json, sentry_eval_cascade.json,
+...) becomes one report: a run page with summary metrics and a per-PR table,
+and one drill-down page per PR listing every judged comment with its
+classification, verdict and judge reasoning, plus the missed golden comments.
+Reports are rendered in parallel worker processes.
+
+When the run has a review_timings.json (review_timings.py), run pages also
+show review latency percentiles and throughput beside precision and recall.
+
+The index page shows cross-run trend charts (inline SVG) and a per-PR F-score
+matrix, drawn from ``aggregate.json``, which holds the precomputed per-run and
+per-PR metrics. Rebuilds are incremental: a report is only re-rendered when
+its eval file (or this generator) changed; aggregates of unchanged reports
+are reused from ``.build_state.json``. Pages use relative links and inline
+CSS, so the site works offline straight from disk.
+
+Usage: python3 scripts/report_site.py [--out site] [--jobs N] [--force]
+Example: python3 scripts/report_site.py && open site/index.html
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from eval_format import load_eval
+from paths import BASE_DIR, RESULTS_DIR
+from timings_format import TIMINGS_FILE, load_timings
+
+DEFAULT_OUT = BASE_DIR / "site"
+STATE_FILE = ".build_state.json"
+CLASS_LABELS = {"tp": "True positive", "duplicate": "Duplicate", "fp": "False positive", "unmatched": "Unmatched"}
+
+CSS = """
+body { font-family: -apple-system, system-ui, sans-serif; margin: 2rem auto; max-width: 1100px; color: #222; }
+a { color: #0b5cad; }
+table { border-collapse: collapse; margin: 1rem 0; }
+th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f4f4f4; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+.tp { border-left: 4px solid #2e7d32; } .fp { border-left: 4px solid #c62828; }
+.duplicate { border-left: 4px solid #f9a825; } .unmatched { border-left: 4px solid #777; }
+.eval { margin: 1rem 0; padding: .5rem 1rem; background: #fafafa; }
+.meta { color: #666; font-size: .9em; }
+pre { white-space: pre-wrap; font-size: .9em; }
+.legend span { margin-right: 1rem; }
+"""
+SERIES_COLORS = {"precision": "#0b5cad", "recall": "#2e7d32", "f_score": "#c62828"}
+
+
+def generator_hash() -> str:
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def discover_reports(results_dir: Path = RESULTS_DIR) -> dict[str, Path]:
+    """Report id ("<run>/<eval file stem>") -> eval file, for every run under results/."""
+    return {
+        f"{path.parent.name}/{path.stem}": path
+        for path in sorted(results_dir.glob("*/*_eval*.json"))
+    }
+
+
+def report_hash(eval_path: Path) -> str:
+    """Content hash of a report's inputs: the eval file plus the run's review timings."""
+    digest = hashlib.sha256(eval_path.read_bytes())
+    timings = eval_path.parent / TIMINGS_FILE
+    if timings.exists():
+        digest.update(timings.read_bytes())
+    return digest.hexdigest()
+
+
+def slug(report_id: str) -> str:
+    return report_id.replace("/", "__")
+
+
+def page(title: str, body: str, depth: int = 0) -> str:
+    home = "../" * depth + "index.html"
+    return (f"<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>"
+            f"<style>{CSS}</style></head><body>\n<p class=\"meta\"><a href=\"{home}\">All runs</a></p>\n"
+            f"<h1>{html.escape(title)}</h1>\n{body}\n</body></html>\n")
+
+
+def classify(pr: dict) -> list[tuple[str, dict]]:
+    """(classification, evaluation) for every evaluation of a PR."""
+    key = lambda e: json.dumps(e, sort_keys=True)
+    labels = {}
+    for name, field in (("tp", "true_positives"), ("duplicate", "duplicates"), ("fp", "false_positives")):
+        for evaluation in pr.get(field, []):
+            labels.setdefault(key(evaluation), name)
+    return [(labels.get(key(e), "unmatched"), e) for e in pr.get("evaluations", [])]
+
+
+def pr_metrics(pr: dict) -> dict[str, Any]:
+    metrics = dict(pr.get("metrics") or {})
+    if "tp" not in metrics:
+        tp, fp, fn = len(pr.get("true_positives", [])), len(pr.get("false_positives", [])), len(pr.get("false_negatives", []))
+        metrics.update(tp=tp, fp=fp, fn=fn)
+    return metrics
+
+
+def f_score(tp: int, fp: int, fn: int) -> float:
+    return round(100 * 2 * tp / (2 * tp + fp + fn), 1) if tp else 0.0
+
+
+# ---------------------------------------------------------------------------
+# Per-report rendering (runs in worker processes)
+# ---------------------------------------------------------------------------
+
+def render_pr(report_id: str, pr: dict) -> str:
+    m = pr_metrics(pr)
+    parts = [
+        f"<p class=\"meta\"><a href=\"index.html\">{html.escape(report_id)}</a> &middot; "
+        f"{pr.get('golden_count', '?')} golden, {pr.get('droid_count', '?')} droid comments</p>",
+        f"<p>TP={m['tp']} FP={m['fp']} FN={m['fn']} &middot; F={f_score(m['tp'], m['fp'], m['fn'])}%</p>",
+        "<h2>Droid comments</h2>",
+    ]
+    for label, e in classify(pr):
+        verdict = "match" if e.get("matches") else "no match"
+        extra = []
+        if e.get("judge_model"):
+            extra.append(html.escape(e["judge_model"]))
+        if "clustered_with" in e:
+            extra.append(f"verdict shared with comment {html.escape(str(e['clustered_with']))}")
+        matched = ""
+        if e.get("matched_golden_comment"):
+            matched = f"<p><b>Matched golden:</b> {html.escape(str(e['matched_golden_comment']))}</p>"
+        parts.append(
+            f"<div class=\"eval {label}\"><p><b>{CLASS_LABELS[label]}</b> &middot; "
+            f"<code>{html.escape(str(e.get('file')))}:{html.escape(str(e.get('line')))}</code> &middot; "
+            f"{verdict} ({html.escape(str(e.get('confidence')))} confidence)"
+            f"{' &middot; ' + ', '.join(extra) if extra else ''}</p>"
+            f"<pre>{html.escape(e.get('droid_comment', ''))}</pre>{matched}"
+            f"<p class=\"meta\"><b>Judge reasoning:</b> {html.escape(str(e.get('reasoning', '')))}</p></div>"
+        )
+    if pr.get("unjudged"):
+        parts.append(f"<p class=\"meta\">{len(pr['unjudged'])} comment(s) not judged (budget)</p>")
+    parts.append("<h2>Missed golden comments</h2>")
+    if pr.get("false_negatives"):
+        parts.append("<table><tr><th>Severity</th><th>Golden comment</th></tr>" + "".join(
+            f"<tr><td>{html.escape(str(fn.get('severity')))}</td><td>{html.escape(fn.get('golden_comment', ''))}</td></tr>"
+            for fn in pr["false_negatives"]) + "</table>")
+    else:
+        parts.append("<p>None.</p>")
+    return page(f"PR #{pr['pr_number']}: {pr.get('pr_title', '')}", "\n".join(parts), depth=2)
+
+
+def render_report(report_id: str, eval_path: str, out_dir: str) -> dict[str, Any]:
+    """Render one report's pages; returns its aggregate row."""
+    data = load_eval(eval_path)
+    target = Path(out_dir) / "runs" / slug(report_id)
+    if target.exists():
+        shutil.rmtree(target)
+    target.mkdir(parents=True)
+
+    summary = data.get("summary", {})
+    prs = sorted(data.get("prs", []), key=lambda p: p["pr_number"])
+    rows, pr_rows = [], {}
+    for pr in prs:
+        m = pr_metrics(pr)
+        f = f_score(m["tp"], m["fp"], m["fn"])
+        pr_rows[str(pr["pr_number"])] = {"title": pr.get("pr_title", ""), "tp": m["tp"], "fp": m["fp"], "fn": m["fn"], "f_score": f}
+        (target / f"pr_{pr['pr_number']}.html").write_text(render_pr(report_id, pr))
+        rows.append(
+            f"<tr><td><a href=\"pr_{pr['pr_number']}.html\">#{pr['pr_number']}</a></td>"
+            f"<td>{html.escape(pr.get('pr_title', ''))}</td><td class=\"num\">{m['tp']}</td>"
+            f"<td class=\"num\">{m['fp']}</td><td class=\"num\">{m['fn']}</td><td class=\"num\">{f}%</td></tr>"
+        )
+    numbers = [p["pr_number"] for p in prs]
+    pr_range = f"#{min(numbers)}-{max(numbers)} ({len(numbers)} PRs)" if numbers else "none"
+    body = [
+        f"<p class=\"meta\">Repository: {html.escape(data.get('repo', 'unknown'))} &middot; PRs {pr_range} &middot; "
+        f"source <code>{html.escape(Path(eval_path).name)}</code></p>",
+        "<table><tr><th>Precision</th><th>Recall</th><th>F-score</th><th>TP</th><th>FP</th><th>FN</th><th>Judge calls</th></tr>"
+        f"<tr><td class=\"num\">{summary.get('precision', '-')}%</td><td class=\"num\">{summary.get('recall', '-')}%</td>"
+        f"<td class=\"num\">{summary.get('f_score', '-')}%</td><td class=\"num\">{summary.get('total_tp', '-')}</td>"
+        f"<td class=\"num\">{summary.get('total_fp', '-')}</td><td class=\"num\">{summary.get('total_fn', '-')}</td>"
+        f"<td class=\"num\">{summary.get('judge_calls', '-')}</td></tr></table>",
+    ]
+    timings = load_timings(Path(eval_path).parent) or {"repos": {}}
+    review = timings["repos"].get(data.get("repo"))
+    if review:
+        s = review["summary"]
+        lat = {f: s["latency"][f] for f in ("first_comment_s", "workflow_s", "total_s")}
+        cell = lambda v: f"<td class=\"num\">{v if v is not None else '-'}</td>"
+        body.append(
+            "<h2>Review latency</h2><table><tr><th></th><th>p50 (s)</th><th>p90 (s)</th><th>p95 (s)</th><th>max (s)</th></tr>"
+            + "".join(f"<tr><td>{label}</td>" + "".join(cell(lat[f][k]) for k in ("p50", "p90", "p95", "max")) + "</tr>"
+                      for label, f in (("First comment", "first_comment_s"), ("Workflow", "workflow_s"),
+                                       ("Trigger to done", "total_s")))
+            + "</table>"
+            f"<p class=\"meta\">{s['reviewed']}/{s['prs']} PRs reviewed, {s['comments']} comments, "
+            f"{s['throughput']['prs_per_hour'] or '-'} PRs/h &middot; source <code>{TIMINGS_FILE}</code></p>"
+        )
+    if summary.get("coverage"):
+        cov = summary["coverage"]
+        body.append(f"<p class=\"meta\">Partial run: {cov['comments_judged']}/{cov['comments_total']} comments judged</p>")
+    body.append("<h2>Pull requests</h2><table><tr><th>PR</th><th>Title</th><th>TP</th><th>FP</th><th>FN</th><th>F</th></tr>"
+                + "".join(rows) + "</table>")
+    (target / "index.html").write_text(page(report_id, "\n".join(body), depth=2))
+
+    run, variant = report_id.split("/", 1)
+    return {
+        "id": report_id,
+        "run": run,
+        "variant": variant,
+        "repo": data.get("repo"),
+        "precision": summary.get("precision"),
+        "recall": summary.get("recall"),
+        "f_score": summary.get("f_score"),
+        "tp": summary.get("total_tp"),
+        "fp": summary.get("total_fp"),
+        "fn": summary.get("total_fn"),
+        "judge_calls": summary.get("judge_calls"),
+        "first_comment_p50_s": review["summary"]["latency"]["first_comment_s"]["p50"] if review else None,
+        "total_p90_s": review["summary"]["latency"]["total_s"]["p90"] if review else None,
+        "prs_per_hour": review["summary"]["throughput"]["prs_per_hour"] if review else None,
+        "prs": pr_rows,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Index: trend charts + PR matrix from aggregate.json
+# ---------------------------------------------------------------------------
+
+def trend_svg(runs: list[dict], width: int = 720, height: int = 240) -> str:
+    pad_left, pad_bottom, pad_top = 40, 70, 10
+    plot_w, plot_h = width - pad_left - 10, height - pad_bottom - pad_top
+    n = len(runs)
+    x = lambda i: pad_left + (plot_w * i / (n - 1) if n > 1 else plot_w / 2)
+    y = lambda v: pad_top + plot_h * (1 - v / 100)
+    parts = [f"<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"{width}\" height=\"{height}\" font-size=\"10\">"]
+    for tick in (0, 25, 50, 75, 100):
+        parts.append(f"<line x1=\"{pad_left}\" x2=\"{width - 10}\" y1=\"{y(tick)}\" y2=\"{y(tick)}\" stroke=\"#eee\"/>"
+                     f"<text x=\"{pad_left - 4}\" y=\"{y(tick) + 3}\" text-anchor=\"end\">{tick}%</text>")
+    for i, run in enumerate(runs):
+        parts.append(f"<text transform=\"translate({x(i)},{height - pad_bottom + 12}) rotate(30)\">"
+                     f"{html.escape(run['id'])}</text>")
+    for series, color in SERIES_COLORS.items():
+        points = [(x(i), y(r[series])) for i, r in enumerate(runs) if isinstance(r.get(series), (int, float))]
+        if len(points) > 1:
+            parts.append(f"<polyline fill=\"none\" stroke=\"{color}\" stroke-width=\"2\" "
+                         f"points=\"{' '.join(f'{px:.1f},{py:.1f}' for px, py in points)}\"/>")
+        parts.extend(f"<circle cx=\"{px:.1f}\" cy=\"{py:.1f}\" r=\"3\" fill=\"{color}\"/>" for px, py in points)
+    parts.append("</svg>")
+    return "".join(parts)
+
+
+def cell_color(f: float) -> str:
+    # White (0%) to green (100%)
+    shade = int(255 - 130 * f / 100)
+    return f"rgb({shade},{min(255, shade + 60)},{shade})"
+
+
+def render_index(aggregate: dict) -> str:
+    runs = aggregate["runs"]
+    body = [f"<p class=\"meta\">{len(runs)} reports &middot; built {aggregate['generated_at']} &middot; "
+            f"data: <a href=\"aggregate.json\">aggregate.json</a></p>"]
+    if runs:
+        body.append("<h2>Trends</h2><p class=\"legend\">" + "".join(
+            f"<span style=\"color:{c}\">&#9632; {s.replace('_', '-')}</span>" for s, c in SERIES_COLORS.items()) + "</p>")
+        body.append(trend_svg(runs))
+    body.append("<h2>Runs</h2><table><tr><th>Report</th><th>Repo</th><th>Precision</th><th>Recall</th>"
+                "<th>F-score</th><th>TP</th><th>FP</th><th>FN</th><th>Judge calls</th>"
+                "<th>First comment p50 (s)</th><th>Total p90 (s)</th><th>PRs/h</th></tr>")
+    for r in runs:
+        body.append(
+            f"<tr><td><a href=\"runs/{slug(r['id'])}/index.html\">{html.escape(r['id'])}</a></td>"
+            f"<td>{html.escape(str(r.get('repo')))}</td>"
+            + "".join(f"<td class=\"num\">{r.get(k) if r.get(k) is not None else '-'}</td>"
+                      for k in ("precision", "recall", "f_score", "tp", "fp", "fn", "judge_calls",
+                                "first_comment_p50_s", "total_p90_s", "prs_per_hour"))
+            + "</tr>"
+        )
+    body.append("</table>")
+
+    pr_keys = sorted({(r.get("repo"), int(n)) for r in runs for n in r["prs"]}, key=lambda k: (str(k[0]), k[1]))
+    if pr_keys:
+        body.append("<h2>F-score by PR</h2><table><tr><th>PR</th>"
+                    + "".join(f"<th>{html.escape(r['id'])}</th>" for r in runs) + "</tr>")
+        for repo, number in pr_keys:
+            cells = []
+            for r in runs:
+                row = r["prs"].get(str(number)) if r.get("repo") == repo else None
+                if row is None:
+                    cells.append("<td></td>")
+                else:
+                    cells.append(f"<td class=\"num\" style=\"background:{cell_color(row['f_score'])}\">"
+                                 f"<a href=\"runs/{slug(r['id'])}/pr_{number}.html\">{row['f_score']}</a></td>")
+            body.append(f"<tr><td>{html.escape(str(repo))} #{number}</td>{''.join(cells)}</tr>")
+        body.append("</table>")
+    return page("Review benchmark runs", "\n".join(body))
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build(out_dir: Path = DEFAULT_OUT, jobs: int | None = None, force: bool = False,
+          results_dir: Path = RESULTS_DIR) -> dict[str, Any]:
+    """Render changed reports in parallel, then rewrite aggregate.json and the index."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state_path = out_dir / STATE_FILE
+    state = json.loads(state_path.read_text()) if state_path.exists() and not force else {}
+    if state.get("generator") != generator_hash():
+        state = {}
+    cached = state.get("reports", {})
+
+    reports = discover_reports(results_dir)
+    hashes = {rid: report_hash(path) for rid, path in reports.items()}
+    stale = [rid for rid in reports if cached.get(rid, {}).get("hash") != hashes[rid]]
+    removed = [rid for rid in cached if rid not in reports]
+
+    rows = {rid: cached[rid]["aggregate"] for rid in reports if rid not in stale}
+    if stale:
+        workers = min(jobs or os.cpu_count() or 1, len(stale))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {rid: pool.submit(render_report, rid, str(reports[rid]), str(out_dir)) for rid in stale}
+            for rid, future in futures.items():
+                rows[rid] = future.result()
+    for rid in removed:
+        shutil.rmtree(out_dir / "runs" / slug(rid), ignore_errors=True)
+
+    aggregate = {
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "runs": [rows[rid] for rid in sorted(rows)],
+    }
+    with open(out_dir / "aggregate.json", "w") as f:
+        json.dump(aggregate, f, indent=2)
+    (out_dir / "index.html").write_text(render_index(aggregate))
+    with open(state_path, "w") as f:
+        json.dump({"generator": generator_hash(),
+                   "reports": {rid: {"hash": hashes[rid], "aggregate": rows[rid]} for rid in reports}}, f, indent=2)
+    return {"reports": len(reports), "rendered": len(stale), "removed": len(removed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render all eval runs under results/ into a static HTML site.")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help=f"Output directory (default: {DEFAULT_OUT})")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render every report")
+    args = parser.parse_args()
+
+    stats = build(args.out, args.jobs, args.force)
+    print(f"{stats['reports']} reports: {stats['rendered']} rendered, "
+          f"{stats['reports'] - stats['rendered']} unchanged, {stats['removed']} removed")
+    print(f"Site: {args.out / 'index.html'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Review latency and throughput of the reviewer under test.
+
+``collect`` pairs each PR of a fetched run with the GitHub Actions workflow
+run that reviewed it, and combines that with the bot comment timestamps
+(``created_at``) already in the run's pr_N_comments.json files.
+
+Workflow runs are matched to PRs by ``pull_requests`` (pull_request events)
+or by display title (issue_comment events show the PR title). When a PR was
+reviewed more than once, the latest run created before its first comment is
+used. Per PR it records:
+
+  - triggered_at: the run's created_at, when GitHub received the trigger event
+  - workflow start (run_started_at) and end (updated_at of a completed run)
+  - first/last bot comment and the bot comment count
+  - queue_s, workflow_s, first_comment_s (trigger -> first comment), total_s
+
+Per repo it adds p50/p90/p95/max latencies and throughput. Throughput is
+reviewed PRs and comments per hour over the run's window (first trigger to
+last completion). The result is written to results/<run>/review_timings.json,
+next to the eval files, and ``report`` prints it beside each repo's precision
+and recall. RESULTS.md and the report site pick it up too.
+
+The API base comes from GITHUB_API_URL (default https://api.github.com). The
+token comes from GITHUB_TOKEN / GH_TOKEN, falling back to `gh auth token`.
+For local testing, ``mock`` serves the Actions runs and pulls endpoints,
+with workflow runs synthesized around a run's real comment timestamps.
+
+Usage: python3 scripts/review_timings.py collect <run_name> [--workflow NAME]
+       python3 scripts/review_timings.py report <run_name>
+       python3 scripts/review_timings.py mock <run_name> [--port 8766] [--seed 0]
+Example: python3 scripts/review_timings.py mock run_2026-01-15 --port 8766 &
+         GITHUB_API_URL=http://127.0.0.1:8766 python3 scripts/review_timings.py collect run_2026-01-15
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from eval_format import load_eval
+from fetch_comments import BOT_LOGIN, REPO
+from paths import BASE_DIR, run_dir
+from timings_format import TIMINGS_FILE, latency_table, load_timings
+
+API_URL = "https://api.github.com"
+MANIFEST_PATH = BASE_DIR / "manifest.json"
+REVIEW_EVENTS = {"issue_comment", "pull_request", "pull_request_target", "pull_request_review_comment"}
+LATENCY_FIELDS = ("queue_s", "workflow_s", "first_comment_s", "total_s")
+PERCENTILES = (50, 90, 95)
+_NEXT_LINK = re.compile(r'<([^>]+)>;\s*rel="next"')
+
+
+class TimingsError(Exception):
+    pass
+
+
+def parse_time(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def format_time(value: datetime | None) -> str | None:
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ") if value else None
+
+
+def seconds(start: datetime | None, end: datetime | None) -> float | None:
+    return round((end - start).total_seconds(), 1) if start and end else None
+
+
+# ---------------------------------------------------------------------------
+# GitHub API
+# ---------------------------------------------------------------------------
+
+def github_token() -> str | None:
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if token:
+        return token
+    try:
+        result = subprocess.run(["gh", "auth", "token"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip() or None
+
+
+class GitHubClient:
+    """Minimal REST client: JSON GETs with Link-header pagination."""
+
+    def __init__(self, api_url: str | None = None, token: str | None = None, timeout: float = 30.0):
+        self.api_url = (api_url or os.environ.get("GITHUB_API_URL") or API_URL).rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _get(self, url: str) -> tuple[Any, str | None]:
+        request = urllib.request.Request(url, headers={"Accept": "application/vnd.github+json",
+                                                       "X-GitHub-Api-Version": "2022-11-28"})
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                link = _NEXT_LINK.search(response.headers.get("Link") or "")
+                return json.load(response), link.group(1) if link else None
+        except urllib.error.HTTPError as e:
+            raise TimingsError(f"GET {url}: HTTP {e.code}") from e
+
+    def get(self, path: str, params: dict | None = None) -> Any:
+        query = f"?{urllib.parse.urlencode(params)}" if params else ""
+        return self._get(f"{self.api_url}{path}{query}")[0]
+
+    def paginate(self, path: str, params: dict, key: str) -> list[dict]:
+        """All items of a paginated list endpoint whose pages wrap the list in ``key``."""
+        items = []
+        url = f"{self.api_url}{path}?{urllib.parse.urlencode({'per_page': 100, **params})}"
+        while url:
+            page, url = self._get(url)
+            items.extend(page.get(key, []))
+        return items
+
+
+# ---------------------------------------------------------------------------
+# Collection
+# ---------------------------------------------------------------------------
+
+def comment_sources(run_name: str, repo: str = REPO) -> dict[str, tuple[str, dict[int, Path]]]:
+    """Repo name -> (owner/name, {pr: pr_N_comments.json}) for a fetched run.
+
+    Flat runs (fetch_comments.py) hold ``repo``'s files; multi-repo runs have
+    one subdirectory per manifest project.
+    """
+    base = run_dir(run_name)
+    files = lambda d: {int(p.name.split("_")[1]): p for p in d.glob("pr_*_comments.json")}
+    if files(base):
+        return {repo.split("/")[1]: (repo, files(base))}
+    manifest = {}
+    if MANIFEST_PATH.exists():
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+    org = manifest.get("destination_org", REPO.split("/")[0])
+    sources = {}
+    for sub in sorted(p for p in base.iterdir() if p.is_dir()) if base.is_dir() else []:
+        if files(sub):
+            name = manifest.get("projects", {}).get(sub.name, {}).get("destination_repo", f"droid-{sub.name}")
+            sources[name] = (f"{org}/{name}", files(sub))
+    return sources
+
+
+def bot_comment_times(path: Path) -> list[datetime]:
+    with open(path) as f:
+        comments = json.load(f)
+    return sorted(parse_time(c["created_at"]) for c in comments if c.get("user", {}).get("login") == BOT_LOGIN)
+
+
+def match_runs(runs: list[dict], prs: dict[int, dict], workflow: str | None = None) -> dict[int, dict]:
+    """PR number -> the workflow run that reviewed it. ``prs[n]`` has "title" and "first_comment"."""
+    candidates: dict[int, list[dict]] = {}
+    for run in runs:
+        if run.get("event") not in REVIEW_EVENTS or (workflow and workflow not in (run.get("name"), run.get("path"))):
+            continue
+        numbers = [p["number"] for p in run.get("pull_requests") or []]
+        if not numbers:
+            numbers = [n for n, pr in prs.items() if pr["title"] and run.get("display_title") == pr["title"]]
+        for n in numbers:
+            if n in prs:
+                candidates.setdefault(n, []).append(run)
+    matched = {}
+    for n, pr_runs in candidates.items():
+        first = prs[n]["first_comment"]
+        before = [r for r in pr_runs if first is None or parse_time(r["created_at"]) <= first]
+        matched[n] = max(before or pr_runs, key=lambda r: r["created_at"])
+    return matched
+
+
+def pr_timing(pr_number: int, run: dict | None, comments: list[datetime]) -> dict[str, Any]:
+    triggered = parse_time(run.get("created_at")) if run else None
+    started = parse_time(run.get("run_started_at")) if run else None
+    completed = parse_time(run.get("updated_at")) if run and run.get("status") == "completed" else None
+    first, last = (comments[0], comments[-1]) if comments else (None, None)
+    return {
+        "pr_number": pr_number,
+        "workflow_run_id": run.get("id") if run else None,
+        "workflow": run.get("name") if run else None,
+        "conclusion": run.get("conclusion") if run else None,
+        "triggered_at": format_time(triggered),
+        "workflow_started_at": format_time(started),
+        "workflow_completed_at": format_time(completed),
+        "first_comment_at": format_time(first),
+        "last_comment_at": format_time(last),
+        "comment_count": len(comments),
+        "queue_s": seconds(triggered, started),
+        "workflow_s": seconds(started, completed),
+        "first_comment_s": seconds(triggered, first),
+        "total_s": seconds(triggered, completed),
+    }
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linear-interpolated percentile (same as numpy's default)."""
+    if not values:
+        return None
+    values = sorted(values)
+    pos = (len(values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return round(values[lo] + (values[hi] - values[lo]) * (pos - lo), 1)
+
+
+def summarize(prs: list[dict]) -> dict[str, Any]:
+    latency = {}
+    for field in LATENCY_FIELDS:
+        values = [p[field] for p in prs if p[field] is not None]
+        latency[field] = {f"p{q}": percentile(values, q) for q in PERCENTILES}
+        latency[field]["max"] = max(values) if values else None
+        latency[field]["n"] = len(values)
+    starts = [parse_time(p["triggered_at"]) for p in prs if p["triggered_at"]]
+    ends = [parse_time(p["workflow_completed_at"] or p["last_comment_at"]) for p in prs
+            if p["workflow_completed_at"] or p["last_comment_at"]]
+    window = seconds(min(starts), max(ends)) if starts and ends else None
+    reviewed = sum(1 for p in prs if p["workflow_completed_at"] or p["comment_count"])
+    comments = sum(p["comment_count"] for p in prs)
+    hours = window / 3600 if window else None
+    return {
+        "prs": len(prs),
+        "matched": sum(1 for p in prs if p["workflow_run_id"] is not None),
+        "reviewed": reviewed,
+        "comments": comments,
+        "latency": latency,
+        "throughput": {
+            "window_s": window,
+            "prs_per_hour": round(reviewed / hours, 1) if hours else None,
+            "comments_per_hour": round(comments / hours, 1) if hours else None,
+        },
+    }
+
+
+def collect_repo(client: GitHubClient, full_repo: str, files: dict[int, Path],
+                 workflow: str | None = None) -> dict[str, Any]:
+    prs = {}
+    for n in sorted(files):
+        pull = client.get(f"/repos/{full_repo}/pulls/{n}")
+        comments = bot_comment_times(files[n])
+        prs[n] = {"title": pull.get("title"), "comments": comments, "first_comment": comments[0] if comments else None}
+    firsts = [p["first_comment"] for p in prs.values() if p["first_comment"]]
+    # Runs are listed newest first; bound the listing to the run's comment window
+    params = {"created": f">={(min(firsts) - timedelta(days=1)).date().isoformat()}"} if firsts else {}
+    runs = client.paginate(f"/repos/{full_repo}/actions/runs", params, "workflow_runs")
+    matched = match_runs(runs, prs, workflow)
+    rows = [pr_timing(n, matched.get(n), prs[n]["comments"]) for n in sorted(prs)]
+    return {"repo": full_repo, "workflow_runs_listed": len(runs), "prs": rows, "summary": summarize(rows)}
+
+
+def collect_run(run_name: str, client: GitHubClient | None = None, workflow: str | None = None,
+                repo: str = REPO) -> dict[str, Any]:
+    """Collect timings for every repo of a fetched run and write review_timings.json."""
+    sources = comment_sources(run_name, repo)
+    if not sources:
+        raise TimingsError(f"No pr_N_comments.json under {run_dir(run_name)}; fetch the run first")
+    client = client or GitHubClient(token=github_token())
+    data = {
+        "run": run_name,
+        "collected_at": format_time(datetime.now(timezone.utc)),
+        "api_url": client.api_url,
+        "repos": {name: collect_repo(client, full_repo, files, workflow)
+                  for name, (full_repo, files) in sources.items()},
+    }
+    with open(run_dir(run_name) / TIMINGS_FILE, "w") as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def quality_by_repo(run_name: str) -> dict[str, dict]:
+    """Repo name -> eval summary for each primary *_eval.json of the run."""
+    base = run_dir(run_name)
+    quality = {}
+    for path in sorted(base.glob("*_eval.json")) + sorted(base.glob("*/*_eval.json")):
+        data = load_eval(path)
+        quality.setdefault(data.get("repo"), data.get("summary", {}))
+    return quality
+
+
+# ---------------------------------------------------------------------------
+# Local mock of the Actions runs and pulls endpoints
+# ---------------------------------------------------------------------------
+
+def mock_repo_data(run_name: str, seed: int = 0) -> dict[str, dict]:
+    """owner/name -> {"pulls": {n: pull}, "runs": [workflow run, ...]} built around the run's comments.
+
+    Each PR gets a review run that starts 2-20s after its trigger and completes
+    5-40s after the last bot comment. Even PRs use pull_request events (with
+    ``pull_requests``), odd PRs issue_comment events (matched by title). Every
+    third PR also has an older, superseded review run, and each repo has an
+    unrelated CI run that must not be matched.
+    """
+    rng = random.Random(seed)
+    data = {}
+    for name, (full_repo, files) in comment_sources(run_name).items():
+        pulls, runs = {}, []
+        run_id = rng.randint(10**9, 2 * 10**9)
+        # PRs without bot comments are reviewed alongside the others
+        everything = [t for n in files for t in bot_comment_times(files[n])]
+        fallback = min(everything) if everything else datetime(2026, 1, 15, 21, 0, tzinfo=timezone.utc)
+        for n in sorted(files):
+            title = f"{name} PR #{n}: benchmark change"
+            pulls[n] = {"number": n, "title": title, "state": "open"}
+            comments = bot_comment_times(files[n])
+            first = comments[0] if comments else fallback + timedelta(seconds=rng.randint(0, 120))
+            triggered = first - timedelta(seconds=rng.randint(45, 240))
+            started = triggered + timedelta(seconds=rng.randint(2, 20))
+            completed = (comments[-1] if comments else started + timedelta(seconds=90)) + timedelta(seconds=rng.randint(5, 40))
+            attempts = [(triggered - timedelta(hours=2), started - timedelta(hours=2),
+                         completed - timedelta(hours=2))] if n % 3 == 0 else []
+            attempts.append((triggered, started, completed))
+            for created, run_started, updated in attempts:
+                run_id += rng.randint(1, 50)
+                runs.append({
+                    "id": run_id,
+                    "name": "Droid Code Review",
+                    "path": ".github/workflows/droid-review.yml",
+                    "display_title": title,
+                    "event": "pull_request" if n % 2 == 0 else "issue_comment",
+                    "status": "completed",
+                    "conclusion": "success",
+                    "pull_requests": [{"number": n}] if n % 2 == 0 else [],
+                    "created_at": format_time(created),
+                    "run_started_at": format_time(run_started),
+                    "updated_at": format_time(updated),
+                    "html_url": f"https://github.com/{full_repo}/actions/runs/{run_id}",
+                })
+        runs.append({"id": run_id + 1, "name": "CI", "path": ".github/workflows/ci.yml", "display_title": "main",
+                     "event": "push", "status": "completed", "conclusion": "success", "pull_requests": [],
+                     "created_at": runs[-1]["created_at"], "run_started_at": runs[-1]["run_started_at"],
+                     "updated_at": runs[-1]["updated_at"]})
+        runs.sort(key=lambda r: r["created_at"], reverse=True)
+        data[full_repo] = {"pulls": pulls, "runs": runs}
+    return data
+
+
+def make_mock_handler(data: dict[str, dict]) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: Any, link: str | None = None) -> None:
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            if link:
+                self.send_header("Link", link)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            query = dict(urllib.parse.parse_qsl(url.query))
+            parts = url.path.strip("/").split("/")
+            repo = data.get("/".join(parts[1:3])) if parts[0] == "repos" and len(parts) >= 4 else None
+            if repo is None:
+                return self._send(404, {"message": "Not Found"})
+            if parts[3:] == ["actions", "runs"]:
+                runs = repo["runs"]
+                if query.get("created", "").startswith(">="):
+                    runs = [r for r in runs if r["created_at"][:10] >= query["created"][2:]]
+                per_page, page = int(query.get("per_page", 30)), int(query.get("page", 1))
+                chunk = runs[(page - 1) * per_page:page * per_page]
+                link = None
+                if page * per_page < len(runs):
+                    next_query = urllib.parse.urlencode({**query, "page": page + 1})
+                    link = f'<http://{self.headers.get("Host")}{url.path}?{next_query}>; rel="next"'
+                return self._send(200, {"total_count": len(runs), "workflow_runs": chunk}, link)
+            if len(parts) == 5 and parts[3] == "pulls" and parts[4].isdigit() and int(parts[4]) in repo["pulls"]:
+                return self._send(200, repo["pulls"][int(parts[4])])
+            self._send(404, {"message": "Not Found"})
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve_mock(run_name: str, port: int = 8766, seed: int = 0) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_mock_handler(mock_repo_data(run_name, seed)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def print_report(run_name: str, timings: dict) -> None:
+    print(f"Review timings for {run_name} (collected {timings['collected_at']} from {timings['api_url']})\n")
+    print("\n".join(latency_table(timings, quality_by_repo(run_name))))
+    unmatched = [(name, p["pr_number"]) for name, repo in timings["repos"].items()
+                 for p in repo["prs"] if p["workflow_run_id"] is None]
+    if unmatched:
+        print(f"\nNo workflow run found for: {', '.join(f'{name} #{n}' for name, n in unmatched)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect and report reviewer latency and throughput per PR.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    collect = sub.add_parser("collect", help="Match workflow runs to PRs and write review_timings.json")
+    collect.add_argument("run_name")
+    collect.add_argument("--workflow", help="Only consider workflow runs with this name or path")
+    collect.add_argument("--api-url", help="GitHub API base (default: $GITHUB_API_URL or api.github.com)")
+    report = sub.add_parser("report", help="Latency percentiles and throughput beside precision/recall")
+    report.add_argument("run_name")
+    mock = sub.add_parser("mock", help="Serve a local mock of the Actions API for a fetched run")
+    mock.add_argument("run_name")
+    mock.add_argument("--port", type=int, default=8766)
+    mock.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "mock":
+        server = serve_mock(args.run_name, args.port, args.seed)
+        print(f"Mock Actions API for {args.run_name} on http://127.0.0.1:{args.port} (Ctrl-C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    if args.command == "collect":
+        try:
+            timings = collect_run(args.run_name, GitHubClient(args.api_url, github_token()), args.workflow)
+        except (TimingsError, OSError) as e:
+            raise SystemExit(f"Could not collect review timings: {e}")
+        print(f"Saved to {run_dir(args.run_name) / TIMINGS_FILE}\n")
+    else:
+        timings = load_timings(run_dir(args.run_name))
+        if timings is None:
+            raise SystemExit(f"No {TIMINGS_FILE} in {run_dir(args.run_name)}; run collect first")
+    print_report(args.run_name, timings)
+
+
+if __name__ == "__main__":
+    main()
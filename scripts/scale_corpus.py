@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Scale-test corpus for the ground-truth validation pipeline.
+
+``generate`` synthesizes a validation tree plus matching manifest.json under
+a separate root, at any number of repos x PRs. Every synthetic PR is a copy
+of a real PR's five files (completeness, revalidation, droid_validations,
+golden_audits, summary) from the checked-in tree, renumbered and retitled,
+so bug counts, text sizes and schemas are realistic and the tree passes
+validate_ground_truth.py.
+
+``bench`` runs generate_v2_draft.py and finalize_v2.py against that root
+(REVIEW_BENCH_ROOT) in fresh processes and reports wall time, validation
+files/sec and peak RSS per stage. The schema-validation cache is cleared
+before each stage unless --warm is given.
+
+``generate`` replaces the tree and manifest under <root>, so it refuses the
+checkout itself (or anything inside it) and any non-empty directory it did
+not create, as recorded by its marker file; --force overrides the latter.
+
+Usage: python3 scripts/scale_corpus.py generate <root> [--repos 50] [--prs 1000] [--seed 0] [--force]
+       python3 scripts/scale_corpus.py bench <root> [--repos 50 --prs 1000] [--warm] [--json]
+Example: python3 scripts/scale_corpus.py bench /tmp/scale --repos 50 --prs 1000
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from paths import BASE_DIR
+
+SOURCE_DIR = BASE_DIR / "results" / "ground_truth_validation" / "run_2026-01-15"
+RUN_SUBDIR = Path("results") / "ground_truth_validation" / "run_2026-01-15"
+KINDS = ("completeness", "revalidation", "droid_validations", "golden_audits", "summary")
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STAGES = (("draft", "generate_v2_draft.py"), ("finalize", "finalize_v2.py"))
+MARKER = ".scale_corpus.json"
+
+
+def load_templates(source_dir: Path = SOURCE_DIR) -> list[dict[str, Any]]:
+    """Every real PR that has all five files: {"repo", "pr_number", "title", kind: data}."""
+    templates = []
+    for repo_dir in sorted(p for p in source_dir.iterdir() if p.is_dir()):
+        for path in sorted(repo_dir.glob("pr_*_completeness.json")):
+            pr_number = int(path.name.split("_")[1])
+            files = {kind: repo_dir / f"pr_{pr_number}_{kind}.json" for kind in KINDS}
+            if not all(f.exists() for f in files.values()):
+                continue
+            template = {"repo": repo_dir.name, "pr_number": pr_number}
+            for kind, f in files.items():
+                template[kind] = f.read_text()
+            template["title"] = json.loads(template["revalidation"]).get("pr_title") or f"PR #{pr_number}"
+            templates.append(template)
+    return templates
+
+
+def repo_name(index: int) -> str:
+    return f"scale_repo_{index:03d}"
+
+
+def _write_repo(job: tuple[str, str, int, list[dict], int]) -> dict[str, Any]:
+    """Worker: write one synthetic repo's files; returns its manifest project entry."""
+    root, repo, n_prs, templates, seed = job
+    rng = random.Random(seed)
+    repo_dir = Path(root) / RUN_SUBDIR / repo
+    repo_dir.mkdir(parents=True, exist_ok=True)
+    prs = []
+    for pr_number in range(1, n_prs + 1):
+        template = rng.choice(templates)
+        title = f"{template['title']} ({repo} #{pr_number})"
+        for kind in KINDS:
+            data = json.loads(template[kind])
+            if isinstance(data, dict):
+                data["pr_number"] = pr_number
+                if "pr_title" in data:
+                    data["pr_title"] = title
+            with open(repo_dir / f"pr_{pr_number}_{kind}.json", "w") as f:
+                json.dump(data, f, indent=2)
+        sha = f"{rng.getrandbits(160):040x}"
+        prs.append({"number": pr_number, "title": title, "headRefName": f"scale-{pr_number}",
+                    "headRefOid": sha, "baseRefName": "main"})
+    return {
+        "source_repo": f"https://example.invalid/{repo}.git",
+        "default_branch": "main",
+        "head_sha": f"{rng.getrandbits(160):040x}",
+        "destination_repo": f"droid-{repo}",
+        # Newest first, like the real manifest
+        "prs": prs[::-1],
+    }
+
+
+def check_root(root: Path, force: bool = False) -> None:
+    """Refuse roots where generate would overwrite real data."""
+    root = root.resolve()
+    for protected in {BASE_DIR.resolve(), SCRIPTS_DIR.parent}:
+        if root == protected or protected in root.parents:
+            raise SystemExit(f"Refusing to generate into {root}: it is or is inside the checkout {protected}")
+    if root.exists() and any(root.iterdir()) and not (root / MARKER).exists() and not force:
+        raise SystemExit(f"Refusing to generate into non-empty {root}: no {MARKER} from an earlier generate "
+                         f"(pass --force to replace its results/ and manifest.json anyway)")
+
+
+def generate(root: Path, n_repos: int, n_prs: int, seed: int = 0, jobs: int | None = None,
+             force: bool = False) -> dict[str, Any]:
+    """Write the synthetic tree and manifest under ``root`` (replacing an earlier corpus)."""
+    check_root(root, force)
+    templates = load_templates()
+    if not templates:
+        raise SystemExit(f"No complete PR templates found under {SOURCE_DIR}")
+    shutil.rmtree(root / RUN_SUBDIR, ignore_errors=True)
+    shutil.rmtree(root / ".cache", ignore_errors=True)
+    start = time.perf_counter()
+    work = [(str(root), repo_name(i), n_prs, templates, seed * 100_003 + i) for i in range(n_repos)]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        projects = dict(zip((w[1] for w in work), pool.map(_write_repo, work)))
+    manifest = {
+        "created_at": "2026-01-15T00:00:00Z",
+        "source_org": "scale-test",
+        "destination_org": "scale-test",
+        "projects": projects,
+    }
+    with open(root / "manifest.json", "w") as f:
+        json.dump(manifest, f, indent=2)
+    (root / "results").mkdir(exist_ok=True)
+    with open(root / MARKER, "w") as f:
+        json.dump({"repos": n_repos, "prs": n_prs, "seed": seed}, f, indent=2)
+    return {
+        "repos": n_repos,
+        "prs": n_repos * n_prs,
+        "files": n_repos * n_prs * len(KINDS),
+        "templates": len(templates),
+        "seconds": round(time.perf_counter() - start, 1),
+    }
+
+
+def corpus_size(root: Path) -> tuple[int, int]:
+    """(validation files, bytes) in the corpus."""
+    files = size = 0
+    for entry in os.scandir(root / RUN_SUBDIR):
+        if entry.is_dir():
+            for f in os.scandir(entry.path):
+                if f.name.startswith("pr_"):
+                    files += 1
+                    size += f.stat().st_size
+    return files, size
+
+
+def run_stage(root: Path, script: str, warm: bool = False) -> dict[str, Any]:
+    """Run one pipeline script against ``root``; wall time and peak RSS of the process tree."""
+    if not warm:
+        shutil.rmtree(root / ".cache", ignore_errors=True)
+    env = {**os.environ, "REVIEW_BENCH_ROOT": str(root)}
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, str(SCRIPTS_DIR / script)], env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = proc.stderr.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    wall = time.perf_counter() - start
+    if proc.returncode:
+        raise SystemExit(f"{script} failed ({proc.returncode}):\n{stderr.decode()[-2000:]}")
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return {"wall_s": round(wall, 2), "cpu_s": round(usage.ru_utime + usage.ru_stime, 2),
+            "peak_rss_mb": round(rss_mb, 1)}
+
+
+def bench(root: Path, warm: bool = False) -> dict[str, Any]:
+    files, size = corpus_size(root)
+    results = {"files": files, "corpus_mb": round(size / (1024 * 1024), 1), "stages": {}}
+    for name, script in STAGES:
+        stage = run_stage(root, script, warm)
+        stage["files_per_s"] = round(files / stage["wall_s"]) if stage["wall_s"] else None
+        results["stages"][name] = stage
+        print(f"  {name:<9} {stage['wall_s']:>8}s wall {stage['cpu_s']:>8}s cpu "
+              f"{stage['files_per_s']:>8} files/s {stage['peak_rss_mb']:>8} MB peak RSS")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a scale-test validation corpus and benchmark draft/finalize.")
+    parser.add_argument("command", choices=["generate", "bench"])
+    parser.add_argument("root", type=Path, help="Corpus root (used as REVIEW_BENCH_ROOT)")
+    parser.add_argument("--repos", type=int, help="Repos to generate (bench: regenerate first)")
+    parser.add_argument("--prs", type=int, help="PRs per repo")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, help="Generator worker processes")
+    parser.add_argument("--warm", action="store_true", help="bench: keep the schema-validation cache between stages")
+    parser.add_argument("--json", action="store_true", help="bench: print results as JSON")
+    parser.add_argument("--force", action="store_true", help="generate: allow a non-empty root without a corpus marker")
+    args = parser.parse_args()
+
+    root = args.root.resolve()
+    if args.command == "generate" or args.repos or args.prs:
+        check_root(root, args.force)
+        root.mkdir(parents=True, exist_ok=True)
+        stats = generate(root, args.repos or 50, args.prs or 1000, args.seed, args.jobs, args.force)
+        print(f"Generated {stats['repos']} repos x {stats['prs'] // stats['repos']} PRs = {stats['files']:,} files "
+              f"from {stats['templates']} real PRs in {stats['seconds']}s under {root}")
+    if args.command == "bench":
+        if not (root / "manifest.json").exists():
+            raise SystemExit(f"No corpus under {root}; pass --repos/--prs or run generate first")
+        print(f"Benchmarking draft/finalize on {root} ({'warm' if args.warm else 'cold'} validation cache)")
+        results = bench(root, args.warm)
+        print(f"  corpus: {results['files']:,} files, {results['corpus_mb']} MB")
+        if args.json:
+            print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
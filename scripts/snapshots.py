@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Snapshot manager for the benchmark repos' source at manifest SHAs.
+
+Keeps one bare mirror per project (cloned from a local path, e.g. the
+augment-*.git mirrors from docs/SETUP.md) and hands out pooled, detached
+git worktrees at the project head_sha or a PR's headRefOid. Worktrees are
+reused across consumers, leased while in use, and evicted least-recently-used
+once the pool exceeds its disk budget. State changes are guarded by file
+locks, so several processes (or threads) can check out snapshots at once.
+
+Layout under SNAPSHOT_DIR (repos/snapshots/ by default):
+  mirrors/<project>.git        bare mirror
+  worktrees/<project>/<sha>/   pooled worktree
+  state.json                   sizes, last use and leases per worktree
+  paths/<project>-<sha>.json   cached file list for path lookups
+
+Usage:
+  python3 scripts/snapshots.py mirror [--source-dir repos]
+  python3 scripts/snapshots.py prefetch [--project sentry]
+  python3 scripts/snapshots.py checkout <project> <sha | pr:<number> | title:<text> | head>
+  python3 scripts/snapshots.py lookup <project> <target> <path> [line]
+  python3 scripts/snapshots.py status | gc [--budget-gb 20]
+Example: python3 scripts/snapshots.py lookup sentry "title:Enhanced Pagination" paginator.py 182
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+from code_context import read_lines
+from paths import BASE_DIR
+
+MANIFEST_PATH = BASE_DIR / "manifest.json"
+SOURCE_DIR = BASE_DIR / "repos"
+SNAPSHOT_DIR = Path(os.environ.get("REVIEW_BENCH_SNAPSHOTS") or BASE_DIR / "repos" / "snapshots")
+DISK_BUDGET_BYTES = 20 * 1024 ** 3
+
+
+class SnapshotError(Exception):
+    """A mirror or commit needed for a snapshot is unavailable."""
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def resolve_target(manifest: dict, project: str, target: str) -> str:
+    """Map "head", "pr:<number>", "title:<substring>" or a SHA to a commit SHA.
+
+    PR numbers are the manifest's (source repo) numbers; the validation tree
+    numbers sentry PRs differently, so prefer title: for those.
+    """
+    info = manifest["projects"][project]
+    if target == "head":
+        return info["head_sha"]
+    if target.startswith("pr:"):
+        number = int(target[3:])
+        for pr in info["prs"]:
+            if pr["number"] == number:
+                return pr["headRefOid"]
+        raise SnapshotError(f"{project} has no PR #{number} in the manifest")
+    if target.startswith("title:"):
+        needle = target[6:].lower()
+        matches = [pr for pr in info["prs"] if needle in pr["title"].lower()]
+        if len(matches) != 1:
+            raise SnapshotError(f"title:{target[6:]!r} matches {len(matches)} {project} PRs")
+        return matches[0]["headRefOid"]
+    return target
+
+
+def manifest_shas(manifest: dict, project: str) -> list[str]:
+    """Distinct SHAs a project needs: head_sha plus every PR head."""
+    info = manifest["projects"][project]
+    shas = [info["head_sha"]] + [pr["headRefOid"] for pr in info["prs"]]
+    return list(dict.fromkeys(shas))
+
+
+def _git(*args: str, cwd: Path | None = None) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SnapshotError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def _dir_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SnapshotManager:
+    """Bare mirrors plus a disk-budgeted pool of leased worktrees."""
+
+    def __init__(self, root: Path = SNAPSHOT_DIR, budget_bytes: int = DISK_BUDGET_BYTES,
+                 manifest: dict | None = None):
+        self.root = Path(root)
+        self.budget_bytes = budget_bytes
+        self.manifest = manifest if manifest is not None else load_manifest()
+        self._paths_cache: dict[tuple[str, str], dict[str, list[str]]] = {}
+        for sub in ("mirrors", "worktrees", "paths", "locks"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+
+    # -- locking and state ------------------------------------------------
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        """Exclusive lock across threads and processes."""
+        # Each open() is its own lock owner, so this also excludes other threads
+        with open(self.root / "locks" / f"{name}.lock", "w") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _read_state(self) -> dict[str, Any]:
+        path = self.root / "state.json"
+        if not path.exists():
+            return {"worktrees": {}}
+        return json.loads(path.read_text())
+
+    def _write_state(self, state: dict[str, Any]) -> None:
+        tmp = self.root / f"state.json.{os.getpid()}.tmp"
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, self.root / "state.json")
+
+    @staticmethod
+    def _prune_dead_leases(entry: dict) -> None:
+        entry["leases"] = {pid: n for pid, n in entry.get("leases", {}).items() if _pid_alive(int(pid))}
+
+    # -- mirrors ------------------------------------------------------------
+
+    def mirror_path(self, project: str) -> Path:
+        return self.root / "mirrors" / f"{project}.git"
+
+    def ensure_mirror(self, project: str, source: str | Path | None = None) -> Path:
+        """Clone (or refresh) the bare mirror for ``project`` from a local path."""
+        mirror = self.mirror_path(project)
+        if source is None:
+            repo_name = Path(self.manifest["projects"][project]["source_repo"]).name
+            source = SOURCE_DIR / repo_name
+        with self._lock(f"mirror-{project}"):
+            if mirror.exists():
+                _git("--git-dir", str(mirror), "fetch", "--prune", "origin")
+            else:
+                if not Path(source).exists():
+                    raise SnapshotError(f"No local source for {project} at {source}")
+                _git("clone", "--mirror", "--quiet", str(source), str(mirror))
+        return mirror
+
+    def has_commit(self, project: str, sha: str) -> bool:
+        try:
+            _git("--git-dir", str(self.mirror_path(project)), "cat-file", "-e", f"{sha}^{{commit}}")
+        except SnapshotError:
+            return False
+        return True
+
+    # -- worktrees ----------------------------------------------------------
+
+    def worktree_path(self, project: str, sha: str) -> Path:
+        return self.root / "worktrees" / project / sha
+
+    def acquire(self, project: str, target: str) -> Path:
+        """Lease a worktree at ``target`` (see resolve_target); pair with release()."""
+        sha = resolve_target(self.manifest, project, target)
+        mirror = self.mirror_path(project)
+        if not mirror.exists():
+            raise SnapshotError(f"No mirror for {project}; run: snapshots.py mirror")
+        if len(sha) < 40:
+            sha = _git("--git-dir", str(mirror), "rev-parse", f"{sha}^{{commit}}").strip()
+        key = f"{project}/{sha}"
+        path = self.worktree_path(project, sha)
+
+        # Creation is serialised per SHA so concurrent consumers share one worktree
+        with self._lock(f"wt-{project}-{sha}"):
+            while True:
+                size = None
+                if not path.exists():
+                    if not self.has_commit(project, sha):
+                        raise SnapshotError(f"{sha} is not in the {project} mirror")
+                    _git("--git-dir", str(mirror), "worktree", "prune")
+                    _git("--git-dir", str(mirror), "worktree", "add", "--detach", "--force", str(path), sha)
+                    size = _dir_size(path)
+                with self._lock("state"):
+                    # gc evicts under the state lock only, so the worktree must still exist
+                    # when the lease is registered; if gc got it in between, create it again
+                    if not path.exists():
+                        continue
+                    state = self._read_state()
+                    if key not in state["worktrees"] and size is None:
+                        size = _dir_size(path)
+                    entry = state["worktrees"].setdefault(key, {"path": str(path), "size": 0, "leases": {}})
+                    if size is not None:
+                        entry["size"] = size
+                    self._prune_dead_leases(entry)
+                    pid = str(os.getpid())
+                    entry["leases"][pid] = entry["leases"].get(pid, 0) + 1
+                    entry["last_used"] = time.time()
+                    self._write_state(state)
+                    return path
+
+    def release(self, project: str, sha_or_path: str | Path, gc: bool = True) -> None:
+        sha = Path(sha_or_path).name
+        key = f"{project}/{sha}"
+        with self._lock("state"):
+            state = self._read_state()
+            entry = state["worktrees"].get(key)
+            if entry:
+                pid = str(os.getpid())
+                if entry["leases"].get(pid, 0) > 1:
+                    entry["leases"][pid] -= 1
+                else:
+                    entry["leases"].pop(pid, None)
+                entry["last_used"] = time.time()
+                self._write_state(state)
+        if gc:
+            self.gc()
+
+    @contextmanager
+    def checkout(self, project: str, target: str) -> Iterator[Path]:
+        """Context manager yielding a leased worktree path."""
+        path = self.acquire(project, target)
+        try:
+            yield path
+        finally:
+            self.release(project, path)
+
+    def gc(self, budget_bytes: int | None = None) -> list[str]:
+        """Evict idle worktrees, least recently used first, until under budget."""
+        budget = self.budget_bytes if budget_bytes is None else budget_bytes
+        evicted = []
+        with self._lock("state"):
+            state = self._read_state()
+            for entry in state["worktrees"].values():
+                self._prune_dead_leases(entry)
+            total = sum(e["size"] for e in state["worktrees"].values())
+            idle = sorted((e.get("last_used", 0), key) for key, e in state["worktrees"].items() if not e["leases"])
+            for _, key in idle:
+                if total <= budget:
+                    break
+                project, sha = key.split("/", 1)
+                path = self.worktree_path(project, sha)
+                try:
+                    _git("--git-dir", str(self.mirror_path(project)), "worktree", "remove", "--force", str(path))
+                except SnapshotError:
+                    shutil.rmtree(path, ignore_errors=True)
+                total -= state["worktrees"].pop(key)["size"]
+                evicted.append(key)
+            self._write_state(state)
+        return evicted
+
+    def status(self) -> dict[str, Any]:
+        with self._lock("state"):
+            state = self._read_state()
+        worktrees = state["worktrees"]
+        return {
+            "root": str(self.root),
+            "budget_bytes": self.budget_bytes,
+            "used_bytes": sum(e["size"] for e in worktrees.values()),
+            "mirrors": sorted(p.stem for p in (self.root / "mirrors").glob("*.git")),
+            "worktrees": {k: {"size": e["size"], "leases": sum(e["leases"].values()),
+                              "last_used": e.get("last_used")} for k, e in worktrees.items()},
+        }
+
+    # -- path/line lookups --------------------------------------------------
+
+    def path_index(self, project: str, sha: str) -> dict[str, list[str]]:
+        """basename -> repo paths at ``sha``, cached in memory and on disk."""
+        key = (project, sha)
+        index = self._paths_cache.get(key)
+        if index is not None:
+            return index
+        cache_file = self.root / "paths" / f"{project}-{sha}.json"
+        if cache_file.exists():
+            index = json.loads(cache_file.read_text())
+        else:
+            listing = _git("--git-dir", str(self.mirror_path(project)), "ls-tree", "-r", "--name-only", "-z", sha)
+            index = {}
+            for repo_path in filter(None, listing.split("\0")):
+                index.setdefault(repo_path.rsplit("/", 1)[-1], []).append(repo_path)
+            tmp = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(index))
+            os.replace(tmp, cache_file)
+        self._paths_cache[key] = index
+        return index
+
+    def lookup_path(self, project: str, sha: str, path: str) -> str | None:
+        """Resolve a (possibly partial or differently rooted) path to a repo path."""
+        path = path.strip()
+        while path.startswith(("./", "/")):
+            path = path[1:] if path.startswith("/") else path[2:]
+        candidates = self.path_index(project, sha).get(path.rsplit("/", 1)[-1], [])
+        if path in candidates:
+            return path
+        # A unique suffix match wins, e.g. "api/paginator.py" -> "src/sentry/api/paginator.py"
+        suffix = [c for c in candidates if c.endswith("/" + path) or path.endswith("/" + c)]
+        if len(suffix) == 1:
+            return suffix[0]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def read_lines(self, worktree: Path, repo_path: str, start: int, end: int) -> list[str]:
+        """Lines start..end (1-based, inclusive) of a file in a worktree."""
+        return read_lines(Path(worktree) / repo_path, start, end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage source snapshots of the benchmark repos.")
+    parser.add_argument("--root", type=Path, default=SNAPSHOT_DIR)
+    parser.add_argument("--budget-gb", type=float, default=DISK_BUDGET_BYTES / 1024 ** 3)
+    sub = parser.add_subparsers(dest="command", required=True)
+    mirror = sub.add_parser("mirror", help="Create or refresh bare mirrors from local clones")
+    mirror.add_argument("--source-dir", type=Path, default=SOURCE_DIR)
+    mirror.add_argument("--project", action="append")
+    prefetch = sub.add_parser("prefetch", help="Create worktrees for every manifest SHA (within budget)")
+    prefetch.add_argument("--project", action="append")
+    checkout = sub.add_parser("checkout", help="Create (or reuse) a worktree and print its path")
+    checkout.add_argument("project")
+    checkout.add_argument("target")
+    lookup = sub.add_parser("lookup", help="Resolve a path at a target and print lines around a line")
+    lookup.add_argument("project")
+    lookup.add_argument("target")
+    lookup.add_argument("path")
+    lookup.add_argument("line", type=int, nargs="?")
+    lookup.add_argument("--context", type=int, default=5)
+    sub.add_parser("status", help="Show mirrors, worktrees and disk use")
+    sub.add_parser("gc", help="Evict idle worktrees until under budget")
+    args = parser.parse_args()
+
+    manager = SnapshotManager(args.root, int(args.budget_gb * 1024 ** 3))
+    projects = getattr(args, "project", None)
+    if isinstance(projects, str):
+        projects = [projects]
+    projects = projects or list(manager.manifest["projects"])
+
+    if args.command == "mirror":
+        for project in projects:
+            repo_name = Path(manager.manifest["projects"][project]["source_repo"]).name
+            try:
+                path = manager.ensure_mirror(project, args.source_dir / repo_name)
+            except SnapshotError as e:
+                print(f"{project}: {e}")
+                continue
+            print(f"{project}: {path}")
+    elif args.command == "prefetch":
+        for project in projects:
+            for sha in manifest_shas(manager.manifest, project):
+                try:
+                    path = manager.acquire(project, sha)
+                except SnapshotError as e:
+                    print(f"  {project} {sha[:10]}: {e}")
+                    continue
+                manager.release(project, path)
+                print(f"  {project} {sha[:10]}: {path}")
+    elif args.command == "checkout":
+        path = manager.acquire(args.project, args.target)
+        manager.release(args.project, path, gc=False)
+        print(path)
+    elif args.command == "lookup":
+        sha = resolve_target(manager.manifest, args.project, args.target)
+        with manager.checkout(args.project, args.target) as worktree:
+            repo_path = manager.lookup_path(args.project, Path(worktree).name, args.path)
+            if repo_path is None:
+                print(f"{args.path}: not found at {sha[:10]}")
+                return
+            print(f"{repo_path} @ {sha[:10]}")
+            if args.line:
+                start = max(1, args.line - args.context)
+                for offset, text in enumerate(manager.read_lines(worktree, repo_path, start, args.line + args.context)):
+                    marker = ">" if start + offset == args.line else " "
+                    print(f"{marker}{start + offset:6d}  {text}")
+    elif args.command == "status":
+        status = manager.status()
+        print(f"Root: {status['root']}")
+        print(f"Mirrors: {', '.join(status['mirrors']) or 'none'}")
+        print(f"Worktrees: {len(status['worktrees'])}, "
+              f"{status['used_bytes'] / 1024 ** 2:.1f} MB of {status['budget_bytes'] / 1024 ** 3:.1f} GB budget")
+        for key, entry in sorted(status["worktrees"].items()):
+            print(f"  {key[:60]:<60} {entry['size'] / 1024 ** 2:8.1f} MB  leases={entry['leases']}")
+    elif args.command == "gc":
+        evicted = manager.gc()
+        print(f"Evicted {len(evicted)} worktree(s)")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except SnapshotError as e:
+        raise SystemExit(f"Error: {e}")
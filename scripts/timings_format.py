@@ -0,0 +1,62 @@
+"""
+Reading and tabulating review_timings.json (written by review_timings.py).
+
+Kept free of the API client and mock server so report commands that only
+display timings (RESULTS.md, the report site) import nothing beyond the
+standard json/pathlib modules.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+TIMINGS_FILE = "review_timings.json"
+
+
+def load_timings(directory: Path) -> dict[str, Any] | None:
+    path = directory / TIMINGS_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _fmt(value: float | None, unit: str = "s") -> str:
+    if value is None:
+        return "-"
+    return f"{value / 60:.1f}m" if unit == "s" and value >= 600 else f"{value:g}{unit}"
+
+
+def _pct(summary: dict | None, key: str) -> str:
+    return f"{summary[key]}%" if summary and summary.get(key) is not None else "-"
+
+
+def latency_table(timings: dict, quality: dict[str, dict]) -> list[str]:
+    """Markdown table: per-repo precision/recall beside latency percentiles and throughput."""
+    lines = [
+        "| Repo | PRs | Precision | Recall | First comment p50 / p90 | Workflow p50 / p90 | Total p50 / p90 / p95 | PRs/h | Comments |",
+        "|------|-----|-----------|--------|-------------------------|--------------------|-----------------------|-------|----------|",
+    ]
+    for name, repo in timings["repos"].items():
+        s, q = repo["summary"], quality.get(name)
+        first, workflow, total = (s["latency"][f] for f in ("first_comment_s", "workflow_s", "total_s"))
+        lines.append(
+            f"| {name} | {s['reviewed']}/{s['prs']} | {_pct(q, 'precision')} | {_pct(q, 'recall')} | "
+            f"{_fmt(first['p50'])} / {_fmt(first['p90'])} | {_fmt(workflow['p50'])} / {_fmt(workflow['p90'])} | "
+            f"{_fmt(total['p50'])} / {_fmt(total['p90'])} / {_fmt(total['p95'])} | "
+            f"{_fmt(s['throughput']['prs_per_hour'], '')} | {s['comments']} |"
+        )
+    return lines
+
+
+def pr_latency_table(repo: dict) -> list[str]:
+    lines = [
+        "| PR # | Triggered | Queue | Workflow | First comment | Total | Comments | Conclusion |",
+        "|------|-----------|-------|----------|---------------|-------|----------|------------|",
+    ]
+    for p in repo["prs"]:
+        lines.append(
+            f"| {p['pr_number']} | {p['triggered_at'] or '-'} | {_fmt(p['queue_s'])} | {_fmt(p['workflow_s'])} | "
+            f"{_fmt(p['first_comment_s'])} | {_fmt(p['total_s'])} | {p['comment_count']} | {p['conclusion'] or '-'} |"
+        )
+    return lines
@@ -0,0 +1,566 @@
+#!/usr/bin/env python3
+"""
+Validate every file in the ground-truth validation tree against its schema.
+
+Each file kind (droid_validations, golden_audits, completeness, revalidation,
+summary) has a schema that is compiled once into nested checker functions.
+Large batches of files (PARALLEL_THRESHOLD or more, e.g. a cold cache on a
+scale corpus) are checked in parallel, and results are cached by content hash
+so unchanged files are not re-parsed on the next run.
+
+Usage: python3 scripts/validate_ground_truth.py [path ...] [--no-cache] [--workers N]
+Example: python3 scripts/validate_ground_truth.py results/ground_truth_validation
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from paths import BASE_DIR
+
+GROUND_TRUTH_DIR = BASE_DIR / "results" / "ground_truth_validation"
+CACHE_PATH = BASE_DIR / ".cache" / "ground_truth_schema_cache.json"
+
+# Below this many files to (re)check, the process pool costs more than it saves.
+# Measured: ~30 ms of pool start-up plus ~7 us/file of IPC against ~50 us/file
+# of validation, so a pool breaks even at ~900 files on 8 cores and ~1800 on 2;
+# the checked-in tree (~250 files) is always validated serially.
+PARALLEL_THRESHOLD = 2000
+
+FILE_PATTERN = re.compile(r"^pr_(\d+)_(droid_validations|golden_audits|completeness|revalidation|summary)\.json$")
+
+Checker = Callable[[Any, str, list], None]
+
+
+# ---------------------------------------------------------------------------
+# Schema building blocks
+# ---------------------------------------------------------------------------
+
+class Nullable:
+    def __init__(self, spec):
+        self.spec = spec
+
+
+class OneOf:
+    """A value from a fixed set (optionally case-insensitive for strings)."""
+
+    def __init__(self, *values, ignore_case: bool = False):
+        self.values = values
+        self.ignore_case = ignore_case
+
+
+class AnyOf:
+    """A value matching at least one of several specs."""
+
+    def __init__(self, *specs):
+        self.specs = specs
+
+
+class ListOf:
+    def __init__(self, item):
+        self.item = item
+
+
+class Obj:
+    """An object with required and optional keys; extra keys are allowed.
+
+    ``rules`` are ``(predicate, message)`` pairs evaluated on the whole object
+    once its fields have been checked.
+    """
+
+    def __init__(self, required: dict, optional: dict | None = None, rules: Iterable = ()):
+        self.required = required
+        self.optional = optional or {}
+        self.rules = tuple(rules)
+
+
+def _type_name(value: Any) -> str:
+    return "null" if value is None else type(value).__name__
+
+
+def compile_schema(spec) -> Checker:
+    """Compile a schema spec into a checker ``fn(value, path, errors)``."""
+    if isinstance(spec, Nullable):
+        inner = compile_schema(spec.spec)
+
+        def check_nullable(value, path, errors):
+            if value is not None:
+                inner(value, path, errors)
+        return check_nullable
+
+    if isinstance(spec, OneOf):
+        if spec.ignore_case:
+            allowed = frozenset(v.lower() for v in spec.values)
+
+            def check_one_of(value, path, errors):
+                if not isinstance(value, str) or value.lower() not in allowed:
+                    errors.append(f"{path}: expected one of {list(spec.values)}, got {value!r}")
+        else:
+            allowed = frozenset(spec.values)
+
+            def check_one_of(value, path, errors):
+                if value not in allowed:
+                    errors.append(f"{path}: expected one of {list(spec.values)}, got {value!r}")
+        return check_one_of
+
+    if isinstance(spec, AnyOf):
+        options = [compile_schema(s) for s in spec.specs]
+
+        def check_any_of(value, path, errors):
+            first_errors = None
+            for option in options:
+                option_errors = []
+                option(value, path, option_errors)
+                if not option_errors:
+                    return
+                if first_errors is None:
+                    first_errors = option_errors
+            errors.append(f"{path}: matches no allowed shape ({first_errors[0]})")
+        return check_any_of
+
+    if isinstance(spec, ListOf):
+        item = compile_schema(spec.item)
+
+        def check_list(value, path, errors):
+            if not isinstance(value, list):
+                errors.append(f"{path}: expected list, got {_type_name(value)}")
+                return
+            for i, element in enumerate(value):
+                item(element, f"{path}[{i}]", errors)
+        return check_list
+
+    if isinstance(spec, Obj):
+        required = [(key, compile_schema(s)) for key, s in spec.required.items()]
+        optional = [(key, compile_schema(s)) for key, s in spec.optional.items()]
+        rules = spec.rules
+
+        def check_obj(value, path, errors):
+            if not isinstance(value, dict):
+                errors.append(f"{path}: expected object, got {_type_name(value)}")
+                return
+            before = len(errors)
+            for key, checker in required:
+                if key not in value:
+                    errors.append(f"{path}: missing required key '{key}'")
+                else:
+                    checker(value[key], f"{path}.{key}", errors)
+            for key, checker in optional:
+                if key in value:
+                    checker(value[key], f"{path}.{key}", errors)
+            if len(errors) == before:
+                for predicate, message in rules:
+                    if not predicate(value):
+                        errors.append(f"{path}: {message}")
+        return check_obj
+
+    if isinstance(spec, tuple):
+        types = spec
+    else:
+        types = (spec,)
+    # bool is a subclass of int; never accept it where a number is expected
+    reject_bool = bool not in types
+    expected = " or ".join(t.__name__ for t in types)
+
+    def check_type(value, path, errors):
+        if not isinstance(value, types) or (reject_bool and isinstance(value, bool)):
+            errors.append(f"{path}: expected {expected}, got {_type_name(value)}")
+    return check_type
+
+
+# ---------------------------------------------------------------------------
+# Schemas per file kind
+# ---------------------------------------------------------------------------
+
+SEVERITY = OneOf("critical", "high", "medium", "low", ignore_case=True)
+CONFIDENCE = OneOf("high", "medium", "low")
+NUMBER = (int, float)
+LOCATION = Obj({"file": str, "line": Nullable(int)})
+
+METRICS = Obj(
+    {
+        "total_comments": int,
+        "valid_comments": int,
+        "bugs_found": ListOf(int),
+        "precision": Nullable(NUMBER),
+        "recall": Nullable(NUMBER),
+        "f1": Nullable(NUMBER),
+    }
+)
+
+ANALYSIS = Obj(
+    {
+        "total_comments": int,
+        "true_positives": int,
+        "false_positives": int,
+        "precision": Nullable(NUMBER),
+        "recall": Nullable(NUMBER),
+        "f1": Nullable(NUMBER),
+    }
+)
+
+SCHEMAS = {
+    "droid_validations": ListOf(Obj(
+        {
+            "comment_id": int,
+            "file": str,
+            "line": Nullable(int),
+            "droid_comment": str,
+            "validation": Obj(
+                {
+                    "is_valid_bug": bool,
+                    "confidence": CONFIDENCE,
+                    "severity": OneOf("critical", "high", "medium", "low", "none"),
+                    "bug_type": str,
+                    "reasoning": str,
+                },
+                {
+                    "impact": str,
+                    "code_evidence": str,
+                    "files_explored": ListOf(str),
+                },
+            ),
+        }
+    )),
+    "golden_audits": ListOf(Obj(
+        {
+            "golden_comment": str,
+            "severity": SEVERITY,
+            "audit": Obj(
+                {
+                    "is_real_bug": bool,
+                    "confidence": CONFIDENCE,
+                    "bug_location": Nullable(AnyOf(LOCATION, ListOf(LOCATION))),
+                    "matched_by_droid": bool,
+                    "reasoning": str,
+                },
+                {
+                    "is_specific": bool,
+                    "is_clear": bool,
+                    "clarity_score": int,
+                    "specificity_score": int,
+                    "droid_comment_id": Nullable((int, str)),
+                    "droid_comment_ids": ListOf((int, str)),
+                    "missing_details": ListOf(str),
+                    "vagueness_issues": ListOf(str),
+                    "code_evidence": str,
+                    "files_explored": ListOf(str),
+                },
+            ),
+        }
+    )),
+    "completeness": Obj(
+        {
+            "pr_number": int,
+            "ground_truth_bugs": ListOf(Obj(
+                {
+                    "id": int,
+                    "description": str,
+                    "file": str,
+                    "line": Nullable(int),
+                },
+                {
+                    "severity": Nullable(SEVERITY),
+                    "bug_type": Nullable(str),
+                    "type": Nullable(str),
+                    "found_by": Nullable(AnyOf(str, ListOf(str))),
+                    "details": str,
+                },
+            )),
+            "droid_metrics": METRICS,
+            "golden_metrics": METRICS,
+            "golden_false_positives": ListOf(Obj({"golden_comment": str, "reasoning": str})),
+            "droid_missed": ListOf(int),
+            "golden_missed": ListOf(int),
+        },
+        {"pr_title": str},
+        rules=[
+            (
+                lambda d: len({b["id"] for b in d["ground_truth_bugs"]}) == len(d["ground_truth_bugs"]),
+                "ground_truth_bugs ids must be unique",
+            ),
+            (
+                lambda d: {i for k in ("droid_metrics", "golden_metrics") for i in d[k]["bugs_found"]}
+                <= {b["id"] for b in d["ground_truth_bugs"]},
+                "bugs_found references an id that is not in ground_truth_bugs",
+            ),
+        ],
+    ),
+    "revalidation": Obj(
+        {
+            "pr_number": int,
+            "pr_title": str,
+            "revalidation_date": str,
+            "bug_verdicts": ListOf(Obj(
+                {
+                    "bug_id": int,
+                    "original_description": str,
+                    "file": str,
+                    "line": Nullable(int),
+                    "original_severity": SEVERITY,
+                    "verdict": OneOf("confirmed", "modified", "rejected"),
+                },
+                {
+                    "verified_file": Nullable(str),
+                    "verified_line": Nullable(int),
+                    "verified_severity": Nullable(OneOf("critical", "high", "medium", "low")),
+                    "verified_bug_type": Nullable(str),
+                    "verified_description": Nullable(str),
+                    "notes": str,
+                },
+                rules=[
+                    (
+                        lambda b: b["verdict"] == "rejected" or (
+                            b.get("verified_description") and b.get("verified_severity")
+                            and b.get("verified_bug_type")
+                        ),
+                        "confirmed/modified verdicts need verified_description, verified_severity and verified_bug_type",
+                    ),
+                ],
+            )),
+            "false_positive_verdicts": ListOf(Obj(
+                {
+                    "original_comment": str,
+                    "verdict": OneOf("confirmed_false_positive", "actually_real_bug"),
+                },
+                {"original_reasoning": str, "notes": str},
+            )),
+            "newly_discovered_bugs": ListOf(Obj(
+                {
+                    "description": str,
+                    "file": str,
+                    "line": Nullable(int),
+                    "severity": OneOf("critical", "high", "medium", "low"),
+                    "bug_type": str,
+                },
+                {"notes": str},
+            )),
+        },
+        rules=[
+            (
+                lambda d: len({b["bug_id"] for b in d["bug_verdicts"]}) == len(d["bug_verdicts"]),
+                "bug_verdicts bug_ids must be unique",
+            ),
+        ],
+    ),
+    "summary": Obj(
+        {
+            "pr_number": int,
+            "pr_title": str,
+            "ground_truth_bug_count": int,
+            "droid_analysis": ANALYSIS,
+            "golden_analysis": ANALYSIS,
+            "coverage": Obj(
+                {
+                    "bugs_found_by_both": int,
+                    "bugs_found_only_by_droid": int,
+                    "bugs_found_only_by_golden": int,
+                    "droid_missed": list,
+                    "golden_missed": list,
+                }
+            ),
+        }
+    ),
+}
+
+# Bump when SCHEMAS change so cached results are invalidated
+SCHEMA_VERSION = "1"
+
+COMPILED = {kind: compile_schema(spec) for kind, spec in SCHEMAS.items()}
+
+
+# ---------------------------------------------------------------------------
+# Validation
+# ---------------------------------------------------------------------------
+
+def file_kind(path: Path) -> tuple[int, str] | None:
+    """Return (pr_number, kind) for a per-PR validation file, else None."""
+    match = FILE_PATTERN.match(path.name)
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2)
+
+
+def validate_data(kind: str, data: Any, pr_number: int | None = None) -> list[str]:
+    """Validate already-loaded data for one file kind."""
+    errors: list[str] = []
+    COMPILED[kind](data, "$", errors)
+    if not errors and pr_number is not None and isinstance(data, dict):
+        if data.get("pr_number") != pr_number:
+            errors.append(f"$.pr_number: {data.get('pr_number')!r} does not match file name (pr_{pr_number})")
+    return errors
+
+
+def validate_bytes(kind: str, raw: bytes, pr_number: int | None = None) -> list[str]:
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError as e:
+        return [f"invalid JSON at line {e.lineno} column {e.colno}: {e.msg}"]
+    return validate_data(kind, data, pr_number)
+
+
+def _check_file(job: tuple[str, str, int, str]) -> tuple[str, str, list[str] | None]:
+    """Worker entry point: (path, kind, pr_number, cached hash) -> (path, digest, errors).
+
+    ``errors`` is None when the content still matches the cached hash: the
+    file was touched but not changed, so it is not validated again.
+    """
+    path, kind, pr_number, cached_hash = job
+    with open(path, "rb") as f:
+        raw = f.read()
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    if digest == cached_hash:
+        return path, digest, None
+    return path, digest, validate_bytes(kind, raw, pr_number)
+
+
+def find_validation_files(roots: Iterable[Path]) -> list[tuple[Path, int, str]]:
+    files = []
+    for root in roots:
+        candidates = [root] if root.is_file() else root.rglob("pr_*.json")
+        for path in candidates:
+            parsed = file_kind(path)
+            if parsed:
+                files.append((path, parsed[0], parsed[1]))
+    # Sorting on str avoids PurePath comparisons, which dominate at 100k+ files
+    return sorted(files, key=lambda f: str(f[0]))
+
+
+def load_cache(path: Path = CACHE_PATH) -> dict[str, Any]:
+    if not path.exists():
+        return {"schema_version": SCHEMA_VERSION, "files": {}}
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {"schema_version": SCHEMA_VERSION, "files": {}}
+    if cache.get("schema_version") != SCHEMA_VERSION:
+        return {"schema_version": SCHEMA_VERSION, "files": {}}
+    return cache
+
+
+def save_cache(cache: dict[str, Any], path: Path = CACHE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(cache, f)
+    os.replace(tmp_path, path)
+
+
+def validate_tree(
+    roots: Iterable[Path] = (GROUND_TRUTH_DIR,),
+    use_cache: bool = True,
+    workers: int | None = None,
+) -> dict[str, Any]:
+    """Validate all per-PR validation files under ``roots``.
+
+    Returns a report with ``errors`` (path -> list of messages) and counters.
+    A file is re-read and hashed only if its size/mtime changed, and
+    re-validated only if its content hash differs from the cached one.
+    """
+    start = time.perf_counter()
+    cache = load_cache() if use_cache else {"schema_version": SCHEMA_VERSION, "files": {}}
+    cached_files = cache["files"]
+
+    files = find_validation_files(roots)
+    errors: dict[str, list[str]] = {}
+    jobs = []
+    cache_hits = 0
+    # Cache keys are resolved paths; resolve each directory once, not each file
+    resolved_dirs: dict[Path, str] = {}
+    seen: dict[str, tuple[str, int, int]] = {}
+
+    for path, pr_number, kind in files:
+        if path.parent not in resolved_dirs:
+            resolved_dirs[path.parent] = str(path.parent.resolve())
+        key = os.path.join(resolved_dirs[path.parent], path.name)
+        st = path.stat()
+        seen[str(path)] = (key, st.st_size, st.st_mtime_ns)
+        entry = cached_files.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            cache_hits += 1
+            if entry["errors"]:
+                errors[str(path)] = entry["errors"]
+            continue
+        jobs.append((str(path), kind, pr_number, entry["hash"] if entry else ""))
+
+    if len(jobs) >= PARALLEL_THRESHOLD and (workers or os.cpu_count() or 1) > 1:
+        # Imported here: multiprocessing costs ~15 ms of startup for small trees
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_check_file, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+    else:
+        results = [_check_file(job) for job in jobs]
+
+    for path_str, digest, file_errors in results:
+        # Stat taken before the read: a write racing the check just forces a recheck next run
+        key, size, mtime_ns = seen[path_str]
+        if file_errors is None:
+            # Touched but unchanged content: keep the earlier verdict
+            file_errors = cached_files[key]["errors"]
+            cache_hits += 1
+        cached_files[key] = {
+            "hash": digest,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "errors": file_errors,
+        }
+        if file_errors:
+            errors[path_str] = file_errors
+
+    if use_cache:
+        save_cache(cache)
+
+    return {
+        "files_checked": len(files),
+        "files_validated": len(files) - cache_hits,
+        "cache_hits": cache_hits,
+        "errors": errors,
+        "elapsed_seconds": time.perf_counter() - start,
+    }
+
+
+def require_valid_tree(roots: Iterable[Path]) -> None:
+    """Exit with a report if any validation file under ``roots`` is malformed."""
+    report = validate_tree(roots)
+    if report["errors"]:
+        print_report(report)
+        sys.exit(1)
+
+
+def print_report(report: dict[str, Any]) -> None:
+    for path, file_errors in sorted(report["errors"].items()):
+        try:
+            display = Path(path).resolve().relative_to(BASE_DIR.resolve())
+        except ValueError:
+            display = path
+        print(f"\n{display}:")
+        for error in file_errors:
+            print(f"  {error}")
+    error_count = sum(len(e) for e in report["errors"].values())
+    print(
+        f"\n{report['files_checked']} files, {report['files_validated']} validated, "
+        f"{report['cache_hits']} cached, {len(report['errors'])} with errors ({error_count} total) "
+        f"in {report['elapsed_seconds'] * 1000:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate ground-truth validation files against their schemas.")
+    parser.add_argument("paths", nargs="*", type=Path, default=[GROUND_TRUTH_DIR])
+    parser.add_argument("--no-cache", action="store_true", help="Ignore and do not update the hash cache")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (1 = serial)")
+    args = parser.parse_args()
+
+    report = validate_tree(args.paths, use_cache=not args.no_cache, workers=args.workers)
+    print_report(report)
+    sys.exit(1 if report["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Watch the validation tree and keep the v2 outputs current during revalidation.
+
+On start every completeness and revalidation file is loaded once and all
+outputs are written (same content as generate_v2_draft.py + finalize_v2.py).
+After that, each changed file only recomputes its own PR entry:
+
+  pr_N_completeness.json  -> {repo}/golden_comments_v2_draft.json
+  pr_N_revalidation.json  -> {repo}/revalidation_summary.json + golden_comments_v2.json
+
+Each PR entry is kept pre-serialized, so rewriting an output re-encodes only
+the changed PR and joins the rest; files are replaced atomically (temp file +
+rename), so readers never see a partial file. A changed file that fails its
+schema check is reported and ignored until it is fixed.
+
+Changes are picked up with inotify on Linux, else by polling (--poll).
+Repos and PRs come from manifest.json at start; restart after editing it.
+
+Usage: python3 scripts/watch_v2.py [--poll] [--interval 0.5]
+Example: python3 scripts/watch_v2.py   # then edit pr_7_revalidation.json
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import re
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from finalize_v2 import (
+    MANIFEST_PATH,
+    OUTPUT_PATH,
+    VALIDATION_DIR,
+    build_repo_summary,
+    golden_header,
+    golden_pr_entry,
+    load_manifest,
+    stats_from_counts,
+    summarize_pr,
+)
+from generate_v2_draft import draft_header, draft_pr_entry
+from validate_ground_truth import file_kind, require_valid_tree, validate_data
+
+WATCHED_KINDS = ("completeness", "revalidation")
+# Extra wait after the first event so an editor's write + rename land in one rebuild
+DEBOUNCE_SECONDS = 0.05
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+# placeholder() values as json.dumps encodes them
+PLACEHOLDER_RE = re.compile(r'"\\u0000([^"]*)"')
+
+
+def fragment(entry: Any, depth: int) -> str:
+    """``entry`` as json.dump(indent=2) renders it ``depth`` levels deep."""
+    return json.dumps(entry, indent=2).replace("\n", "\n" + "  " * depth)
+
+
+def render_list(fragments: list[str], depth: int) -> str:
+    if not fragments:
+        return "[]"
+    pad = "  " * depth
+    return "[\n" + ",\n".join(pad + f for f in fragments) + "\n" + "  " * (depth - 1) + "]"
+
+
+def placeholder(name: str) -> str:
+    return f"\0{name}"
+
+
+def render(skeleton: dict, lists: dict[str, str]) -> list[str]:
+    """json.dumps(skeleton, indent=2) with each placeholder(name) value replaced by lists[name].
+
+    Returned as parts, so large outputs are written without joining them first.
+    """
+    parts = PLACEHOLDER_RE.split(json.dumps(skeleton, indent=2))
+    parts[1::2] = [lists[name] for name in parts[1::2]]
+    return parts
+
+
+def write_atomic(path: Path, parts: list[str]) -> None:
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w") as f:
+        f.writelines(parts)
+    os.replace(tmp_path, path)
+
+
+class RepoState:
+    """One repo's per-PR draft and golden entries, kept pre-serialized."""
+
+    def __init__(self, repo: str, project: dict):
+        self.repo = repo
+        self.pr_titles = {pr["number"]: pr["title"] for pr in project["prs"]}
+        self.pr_numbers = set(self.pr_titles)
+        # pr_number -> (entry, fragment); draft entries from completeness files
+        self.draft: dict[int, tuple[dict, str]] = {}
+        # pr_number -> summary counts; golden entry + fragment (None without bugs); stat counts
+        self.summary_counts: dict[int, dict[str, int]] = {}
+        self.golden: dict[int, tuple[dict | None, str | None]] = {}
+        self.stat_counts: dict[int, dict[tuple, int]] = {}
+        # (pr_count, bug_count, rendered prs list, merged stat counts); None after a revalidation change
+        self._golden_cache: tuple[int, int, str, dict[tuple, int]] | None = None
+
+    def title(self, pr_number: int) -> str:
+        return self.pr_titles.get(pr_number, f"PR #{pr_number}")
+
+    def update(self, pr_number: int, kind: str, data: Any | None) -> None:
+        """Replace one PR's entries from its file contents (None = file removed)."""
+        if kind == "completeness":
+            if data is None:
+                self.draft.pop(pr_number, None)
+            else:
+                entry = draft_pr_entry(data, pr_number, self.title(pr_number))
+                self.draft[pr_number] = (entry, fragment(entry, 2))
+            return
+
+        self._golden_cache = None
+        if data is None:
+            for entries in (self.summary_counts, self.golden, self.stat_counts):
+                entries.pop(pr_number, None)
+            return
+        self.summary_counts[pr_number] = summarize_pr(data)
+        entry, rows = golden_pr_entry(data, pr_number, self.title(pr_number))
+        self.golden[pr_number] = (entry, fragment(entry, 4) if entry else None)
+        counts: dict[tuple, int] = {}
+        for row in rows:
+            key = (row["verdict"], row["bug_type"], row["severity"])
+            counts[key] = counts.get(key, 0) + 1
+        self.stat_counts[pr_number] = counts
+
+    def render_draft(self) -> list[str]:
+        skeleton = draft_header(self.repo)
+        prs = [self.draft[n] for n in sorted(self.draft)]
+        skeleton["total_bugs"] = sum(entry["bug_count"] for entry, _ in prs)
+        skeleton["total_false_positives"] = sum(entry["false_positive_count"] for entry, _ in prs)
+        skeleton["prs"] = placeholder("prs")
+        return render(skeleton, {"prs": render_list([f for _, f in prs], 2)})
+
+    def render_summary(self) -> list[str]:
+        pr_counts = {n: self.summary_counts[n] for n in sorted(self.summary_counts)}
+        return [json.dumps(build_repo_summary(self.repo, pr_counts), indent=2)]
+
+    def golden_repo(self) -> tuple[int, int, str, dict[tuple, int]]:
+        """(pr_count, bug_count, rendered prs list, stat counts merged in PR order)."""
+        if self._golden_cache is None:
+            entries = [self.golden[n] for n in sorted(self.golden) if self.golden[n][0]]
+            counts: dict[tuple, int] = {}
+            for pr_number in sorted(self.stat_counts):
+                for key, count in self.stat_counts[pr_number].items():
+                    counts[key] = counts.get(key, 0) + count
+            self._golden_cache = (
+                len(entries),
+                sum(entry["bug_count"] for entry, _ in entries),
+                render_list([f for _, f in entries], 4),
+                counts,
+            )
+        return self._golden_cache
+
+
+class Outputs:
+    """Incremental v2 outputs for every repo in the manifest."""
+
+    def __init__(self, manifest: dict, validation_dir: Path = VALIDATION_DIR, output_path: Path = OUTPUT_PATH):
+        self.validation_dir = validation_dir
+        self.output_path = output_path
+        self.repos = {repo: RepoState(repo, project) for repo, project in manifest["projects"].items()}
+
+    def load_all(self) -> int:
+        loaded = 0
+        for repo, state in self.repos.items():
+            for pr_number in sorted(state.pr_numbers):
+                for kind in WATCHED_KINDS:
+                    path = self.validation_dir / repo / f"pr_{pr_number}_{kind}.json"
+                    if path.exists():
+                        with open(path) as f:
+                            state.update(pr_number, kind, json.load(f))
+                        loaded += 1
+        return loaded
+
+    def apply(self, path: Path) -> tuple[str, int, str] | None:
+        """Fold one changed file into the state; returns (repo, pr_number, kind) if it counted."""
+        parsed = file_kind(path)
+        repo = path.parent.name
+        if not parsed or parsed[1] not in WATCHED_KINDS or repo not in self.repos:
+            return None
+        pr_number, kind = parsed
+        state = self.repos[repo]
+        if pr_number not in state.pr_numbers:
+            print(f"  {repo} PR {pr_number}: not in manifest, ignored")
+            return None
+        data = None
+        if path.exists():
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"  {path}: {e}; keeping the previous version")
+                return None
+            errors = validate_data(kind, data, pr_number)
+            if errors:
+                print(f"  {path}: {len(errors)} schema error(s); keeping the previous version")
+                for error in errors[:5]:
+                    print(f"    {error}")
+                return None
+        state.update(pr_number, kind, data)
+        return repo, pr_number, kind
+
+    def write_draft(self, repo: str) -> Path:
+        path = self.validation_dir / repo / "golden_comments_v2_draft.json"
+        write_atomic(path, self.repos[repo].render_draft())
+        return path
+
+    def write_summary(self, repo: str) -> Path:
+        path = self.validation_dir / repo / "revalidation_summary.json"
+        write_atomic(path, self.repos[repo].render_summary())
+        return path
+
+    def write_golden(self) -> Path:
+        skeleton = golden_header(len(self.repos))
+        stats = skeleton["stats"]
+        lists = {}
+        counts: dict[tuple, int] = {}
+        for repo, state in self.repos.items():
+            pr_count, bug_count, prs_text, repo_counts = state.golden_repo()
+            skeleton["repos"][repo] = {"pr_count": pr_count, "bug_count": bug_count, "prs": placeholder(repo)}
+            lists[repo] = prs_text
+            stats["total_prs"] += pr_count
+            stats["total_bugs"] += bug_count
+            # Merged in repo order so key order matches a full finalize_v2.py run
+            for key, count in repo_counts.items():
+                counts[key] = counts.get(key, 0) + count
+        stats.update(stats_from_counts(counts))
+        write_atomic(self.output_path, render(skeleton, lists))
+        return self.output_path
+
+    def write_all(self) -> None:
+        for repo in self.repos:
+            self.write_draft(repo)
+            self.write_summary(repo)
+        self.write_golden()
+
+    def rebuild(self, changed: list[tuple[str, int, str]]) -> list[Path]:
+        """Rewrite only the outputs the changed files feed."""
+        written = []
+        for repo in sorted({repo for repo, _, kind in changed if kind == "completeness"}):
+            written.append(self.write_draft(repo))
+        reval_repos = sorted({repo for repo, _, kind in changed if kind == "revalidation"})
+        for repo in reval_repos:
+            written.append(self.write_summary(repo))
+        if reval_repos:
+            written.append(self.write_golden())
+        return written
+
+
+class InotifyWatcher:
+    """Changed-file events for a set of directories via inotify(7)."""
+
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+
+    def __init__(self, dirs: list[Path]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+            self.dirs[wd] = d
+
+    def _read(self, timeout: float | None) -> set[Path]:
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+        buf = os.read(self.fd, 1 << 16)
+        changed, offset = set(), 0
+        while offset < len(buf):
+            wd, _, _, length = EVENT_HEADER.unpack_from(buf, offset)
+            offset += EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name and wd in self.dirs:
+                changed.add(self.dirs[wd] / os.fsdecode(name))
+        return changed
+
+    def wait(self) -> set[Path]:
+        changed = self._read(None)
+        while True:
+            more = self._read(DEBOUNCE_SECONDS)
+            if not more:
+                return changed
+            changed |= more
+
+
+class PollingWatcher:
+    """Changed-file events by comparing size/mtime of the watched kinds every ``interval``."""
+
+    def __init__(self, dirs: list[Path], interval: float = 0.5):
+        self.dirs = dirs
+        self.interval = interval
+        self.seen = self._scan()
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        seen = {}
+        for d in self.dirs:
+            for entry in os.scandir(d):
+                if entry.name.endswith(("_completeness.json", "_revalidation.json")):
+                    st = entry.stat()
+                    seen[entry.path] = (st.st_size, st.st_mtime_ns)
+        return seen
+
+    def wait(self) -> set[Path]:
+        while True:
+            time.sleep(self.interval)
+            current = self._scan()
+            changed = {Path(p) for p in current.keys() | self.seen.keys() if current.get(p) != self.seen.get(p)}
+            self.seen = current
+            if changed:
+                return changed
+
+
+def make_watcher(dirs: list[Path], poll: bool, interval: float):
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(dirs)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); polling every {interval}s")
+    return PollingWatcher(dirs, interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally rebuild v2 drafts, summaries and golden_comments_v2.json on file changes.")
+    parser.add_argument("--poll", action="store_true", help="Poll file mtimes instead of using inotify")
+    parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds (with --poll)")
+    args = parser.parse_args()
+
+    print(f"Watching: {VALIDATION_DIR}")
+    manifest = load_manifest()
+    # Watch before reading anything, so a file saved while the tree is being
+    # validated and loaded shows up as a change instead of being missed
+    dirs = [VALIDATION_DIR / repo for repo in manifest["projects"] if (VALIDATION_DIR / repo).is_dir()]
+    watcher = make_watcher(dirs, args.poll, args.interval)
+    require_valid_tree([VALIDATION_DIR])
+
+    start = time.perf_counter()
+    outputs = Outputs(manifest)
+    loaded = outputs.load_all()
+    outputs.write_all()
+    print(f"Loaded {loaded} files from {len(outputs.repos)} repos and wrote all outputs "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    print(f"Waiting for changes ({type(watcher).__name__}); restart after editing {MANIFEST_PATH.name}. Ctrl-C to stop.")
+    try:
+        while True:
+            paths = watcher.wait()
+            start = time.perf_counter()
+            changed = [c for c in (outputs.apply(p) for p in sorted(paths)) if c]
+            if not changed:
+                continue
+            written = outputs.rebuild(changed)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            what = ", ".join(f"{repo} PR {n} {kind}" for repo, n, kind in changed)
+            print(f"[{datetime.now():%H:%M:%S}] {what} -> {len(written)} file(s) in {elapsed_ms:.1f} ms")
+    except KeyboardInterrupt:
+        print("\nStopped.")
+
+
+if __name__ == "__main__":
+    main()